@@ -0,0 +1,272 @@
+import sys
+from array import array
+from collections.abc import Mapping
+
+from gu_snapshot import NO_COLOR as SNAPSHOT_NO_COLOR
+
+NO_COLOR = (255, 255, 255)  # Drawn for Gu without a "color" field
+_UNSET = object()
+
+# -------------------------------
+# SNAPSHOT-BACKED COLUMN
+# -------------------------------
+class SnapshotColumn:
+    """
+    Catalog column that reads the Gu loaded from a snapshot straight from the
+    mapped file: entry i is decode(source[i]) until it is overwritten. Entries
+    set or appended later are kept in a dict, so only edited Gu cost Python objects.
+    """
+    __slots__ = ("source", "decode", "length", "values")
+
+    def __init__(self, source, decode):
+        self.source = source
+        self.decode = decode
+        self.length = len(source)
+        self.values = {}
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, i):
+        value = self.values.get(i, _UNSET)
+        if value is _UNSET:
+            return self.decode(self.source[i])
+        return value
+
+    def __setitem__(self, i, value):
+        self.values[i] = value
+
+    def append(self, value):
+        self.values[self.length] = value
+        self.length += 1
+
+# -------------------------------
+# GU RECORD VIEW
+# -------------------------------
+class GuRecord(Mapping):
+    """
+    Read-only, dict-compatible view of one Gu in a GuCatalog.
+    Holds only the catalog and the Gu's integer id; every field is read from
+    the catalog's columns, so `record.get("recipe", [])` keeps working.
+    """
+    __slots__ = ("catalog", "gu_id")
+
+    def __init__(self, catalog, gu_id):
+        self.catalog = catalog
+        self.gu_id = gu_id
+
+    def _fields(self):
+        catalog, i = self.catalog, self.gu_id
+        fields = {
+            "name": catalog.display_names[i],
+            "color": catalog.hex_colors[i],
+            "level": catalog.levels[i],
+            "effect": catalog.effects[i],
+            "recipe": list(catalog.recipes[i]),
+            "fusions": list(catalog.fusions[i]),
+            "affinity": catalog.affinities[i],
+            "family": catalog.families[i],
+        }
+        return {key: value for key, value in fields.items() if value is not None}
+
+    def __getitem__(self, field):
+        catalog, i = self.catalog, self.gu_id
+        if field == "level":
+            return catalog.levels[i]
+        if field == "recipe":
+            return list(catalog.recipes[i])
+        if field == "fusions":
+            return list(catalog.fusions[i])
+        column = catalog.text_columns.get(field)
+        value = column[i] if column is not None else None
+        if value is None:
+            raise KeyError(field)
+        return value
+
+    def __iter__(self):
+        return iter(self._fields())
+
+    def __len__(self):
+        return len(self._fields())
+
+    def __repr__(self):
+        return "GuRecord(%r)" % self._fields()
+
+    @property
+    def name(self):
+        return self.catalog.names[self.gu_id]
+
+    @property
+    def rgb(self):
+        return self.catalog.rgb_of(self.gu_id)
+
+# -------------------------------
+# GU CATALOG
+# -------------------------------
+class GuCatalog(Mapping):
+    """
+    Column store for the Gu database with a dict-compatible read API
+    (catalog[name] -> GuRecord, .get(), .items(), `in`), so code written against
+    gu_data.objects keeps working.
+
+    Each Gu has an integer id. Names and recipe/fusion strings are interned,
+    levels live in an array column and colours are parsed once into an
+    RGB byte column, so the render loop never re-parses hex strings. Gu can be
+    added, replaced or removed one at a time; ids of removed Gu are not reused.
+
+    A catalog built by from_snapshot() keeps the snapshot open as the backing
+    store of its text, recipe and fusion columns (see SnapshotColumn).
+    """
+    def __init__(self):
+        self.ids = {}                  # name -> id, in catalog order
+        self.names = []                # id -> name (None once removed)
+        self.levels = array('i')
+        self.colors = array('B')       # 3 bytes (r, g, b) per id
+        self.hex_colors = []
+        self.display_names = []
+        self.effects = []
+        self.affinities = []
+        self.families = []
+        self.recipes = []              # id -> tuple of interned ingredient names
+        self.fusions = []              # id -> tuple of interned fusion names
+        self.snapshot = None           # gu_snapshot.Snapshot backing the columns, if any
+        self._index_text_columns()
+
+    def _index_text_columns(self):
+        self.text_columns = {
+            "name": self.display_names, "color": self.hex_colors, "effect": self.effects,
+            "affinity": self.affinities, "family": self.families,
+        }
+
+    @classmethod
+    def from_objects(cls, objects):
+        catalog = cls()
+        for name, data in objects.items():
+            catalog.upsert(name, data)
+        return catalog
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """
+        Build a catalog backed by a memory-mapped gu_snapshot.Snapshot.
+        Only the names (for the name -> id table) are decoded up front, and
+        levels and colours are copied into their fixed-width arrays. Text,
+        recipe and fusion fields stay in the mapped file and are decoded when
+        read, so no per-Gu Python objects are built for them. The catalog keeps
+        the snapshot; do not close it while the catalog is in use.
+        """
+        catalog = cls()
+        n = len(snapshot)
+        names = [sys.intern(name) for name in snapshot.all_strings(n)]
+
+        catalog.ids.update(zip(names, range(n)))
+        catalog.names.extend(names)
+        catalog.levels.frombytes(snapshot.level.tobytes())
+
+        # Colours are packed 0xRRGGBB per uint32 in native byte order; a missing
+        # colour is stored as 0xFFFFFFFF, whose low bytes are NO_COLOR (white).
+        packed = snapshot.color.tobytes()
+        colors = bytearray(3 * n)
+        if sys.byteorder == "little":
+            colors[0::3], colors[1::3], colors[2::3] = packed[2::4], packed[1::4], packed[0::4]
+        else:
+            colors[0::3], colors[1::3], colors[2::3] = packed[1::4], packed[2::4], packed[3::4]
+        catalog.colors.frombytes(colors)
+
+        string = snapshot.string
+        def hex_color(color):
+            return None if color == SNAPSHOT_NO_COLOR else "#%06x" % color
+        def recipe(gu_id):
+            return tuple(sys.intern(string(i)) for i in snapshot.recipe_ids(gu_id))
+        def fusions(gu_id):
+            return tuple(sys.intern(string(i)) for i in snapshot.fusion_ids(gu_id))
+
+        catalog.hex_colors = SnapshotColumn(snapshot.color, hex_color)
+        catalog.display_names = SnapshotColumn(snapshot.display_name, string)
+        catalog.effects = SnapshotColumn(snapshot.effect, string)
+        catalog.affinities = SnapshotColumn(snapshot.affinity, string)
+        catalog.families = SnapshotColumn(snapshot.family, string)
+        catalog.recipes = SnapshotColumn(range(n), recipe)
+        catalog.fusions = SnapshotColumn(range(n), fusions)
+        catalog._index_text_columns()
+        catalog.snapshot = snapshot
+        return catalog
+
+    # --- Mapping API ---
+    def __getitem__(self, name):
+        return GuRecord(self, self.ids[name])
+
+    def __contains__(self, name):
+        return name in self.ids
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    # --- Column access ---
+    def id_of(self, name):
+        return self.ids.get(name)
+
+    def rgb_of(self, gu_id):
+        colors = self.colors
+        return colors[3 * gu_id], colors[3 * gu_id + 1], colors[3 * gu_id + 2]
+
+    def rgb(self, name):
+        return self.rgb_of(self.ids[name])
+
+    # --- Mutation ---
+    def upsert(self, name, data):
+        """
+        Add a Gu, or replace every field of an existing one in place (keeping its id).
+        Returns the Gu's id.
+        """
+        name = sys.intern(name)
+        hex_color = data.get("color")
+        if hex_color:
+            digits = hex_color.lstrip('#')
+            rgb = tuple(int(digits[i:i+2], 16) for i in (0, 2, 4))
+        else:
+            rgb = NO_COLOR
+        row = (
+            data.get("level", 1),
+            rgb,
+            hex_color,
+            data.get("name", name),
+            data.get("effect"),
+            data.get("affinity"),
+            data.get("family"),
+            tuple(sys.intern(ingredient) for ingredient in data.get("recipe", [])),
+            tuple(sys.intern(fusion) for fusion in data.get("fusions", [])),
+        )
+
+        gu_id = self.ids.get(name)
+        if gu_id is None:
+            gu_id = len(self.names)
+            self.ids[name] = gu_id
+            self.names.append(name)
+            self.levels.append(0)
+            self.colors.extend(rgb)
+            for column in (self.hex_colors, self.display_names, self.effects, self.affinities,
+                           self.families, self.recipes, self.fusions):
+                column.append(None)
+
+        (self.levels[gu_id], rgb, self.hex_colors[gu_id],
+         self.display_names[gu_id], self.effects[gu_id], self.affinities[gu_id],
+         self.families[gu_id], self.recipes[gu_id], self.fusions[gu_id]) = row
+        self.colors[3 * gu_id:3 * gu_id + 3] = array('B', rgb)
+        return gu_id
+
+    def remove(self, name):
+        """
+        Remove a Gu. Its id is left as a hole in the columns, with every field cleared.
+        """
+        gu_id = self.ids.pop(name)
+        self.names[gu_id] = None
+        self.levels[gu_id] = 0
+        self.colors[3 * gu_id:3 * gu_id + 3] = array('B', NO_COLOR)
+        for column in (self.hex_colors, self.display_names, self.effects, self.affinities, self.families):
+            column[gu_id] = None
+        self.recipes[gu_id] = ()
+        self.fusions[gu_id] = ()
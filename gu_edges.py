@@ -0,0 +1,235 @@
+import math
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; fall back to one calculate_arrow_points() call per edge.
+    np = None
+
+ARROW_SIZE = 15              # Length of the arrow head sides.
+ARROW_ANGLE = math.pi / 6    # 30 degrees between shaft and head sides.
+
+# -------------------------------
+# ARROW CALCULATION
+# -------------------------------
+def calculate_arrow_points(start_x, start_y, end_x, end_y, box_width, box_height, head_size=ARROW_SIZE):
+    """
+    Calculate points for drawing an arrow from one Gu to another so that
+    the arrow tip touches the target box edge.
+    """
+    # Calculate the angle between start and end points.
+    angle = math.atan2(end_y - start_y, end_x - start_x)
+
+    # Compute half-dimensions of the target box.
+    half_width = box_width / 2
+    half_height = box_height / 2
+
+    # Determine the intersection with the box edge.
+    if abs(math.cos(angle)) * half_height > abs(math.sin(angle)) * half_width:
+        # Intersects with left/right edge.
+        if end_x > start_x:
+            actual_end_x = end_x - half_width
+        else:
+            actual_end_x = end_x + half_width
+        actual_end_y = start_y + (actual_end_x - start_x) * math.tan(angle)
+    else:
+        # Intersects with top/bottom edge.
+        if end_y > start_y:
+            actual_end_y = end_y - half_height
+        else:
+            actual_end_y = end_y + half_height
+        actual_end_x = start_x + (actual_end_y - start_y) / math.tan(angle) if math.tan(angle) != 0 else end_x
+
+    # Calculate arrow head points.
+    point1_x = actual_end_x - head_size * math.cos(angle - ARROW_ANGLE)
+    point1_y = actual_end_y - head_size * math.sin(angle - ARROW_ANGLE)
+    point2_x = actual_end_x - head_size * math.cos(angle + ARROW_ANGLE)
+    point2_y = actual_end_y - head_size * math.sin(angle + ARROW_ANGLE)
+
+    return (start_x, start_y), (actual_end_x, actual_end_y), (point1_x, point1_y), (point2_x, point2_y)
+
+# -------------------------------
+# BATCHED ARROW GEOMETRY
+# -------------------------------
+def overlapping_rows(columns, offset_x, offset_y, clip, anchored=False):
+    """
+    Rows of the segments (columns 0-3: start x, start y, end x, end y) whose
+    bounding box overlaps the screen rectangle clip once moved by the camera
+    offset, or with anchored=True, that have an end inside clip. None if clip
+    is None. The test runs in unmoved coordinates, on whole columns with NumPy.
+    """
+    if clip is None:
+        return None
+    left, top, right, bottom = clip[0] - offset_x, clip[1] - offset_y, clip[2] - offset_x, clip[3] - offset_y
+    sx, sy, ex, ey = columns[:4]
+    if np is not None and isinstance(sx, np.ndarray):
+        if anchored:
+            return np.flatnonzero(((sx >= left) & (sx <= right) & (sy >= top) & (sy <= bottom))
+                                  | ((ex >= left) & (ex <= right) & (ey >= top) & (ey <= bottom)))
+        return np.flatnonzero((np.minimum(sx, ex) <= right) & (np.maximum(sx, ex) >= left)
+                              & (np.minimum(sy, ey) <= bottom) & (np.maximum(sy, ey) >= top))
+    if anchored:
+        return [row for row, (x1, y1, x2, y2) in enumerate(zip(sx, sy, ex, ey))
+                if (left <= x1 <= right and top <= y1 <= bottom) or (left <= x2 <= right and top <= y2 <= bottom)]
+    return [row for row, (x1, y1, x2, y2) in enumerate(zip(sx, sy, ex, ey))
+            if min(x1, x2) <= right and max(x1, x2) >= left and min(y1, y2) <= bottom and max(y1, y2) >= top]
+
+def translate_columns(columns, offset_x, offset_y, clip=None, rows=None, anchored=False):
+    """
+    Return the coordinate columns as lists moved by the camera offset, keeping
+    only the rows picked by overlapping_rows() if clip is given.
+    """
+    if rows is None:
+        rows = overlapping_rows(columns, offset_x, offset_y, clip, anchored)
+    moved = []
+    for i, column in enumerate(columns):
+        offset = offset_x if i % 2 == 0 else offset_y
+        if np is not None and isinstance(column, np.ndarray):
+            moved.append(((column if rows is None else column[rows]) + offset).tolist())
+        elif rows is None:
+            moved.append([value + offset for value in column])
+        else:
+            moved.append([column[row] + offset for row in rows])
+    return moved
+
+class ArrowBatch:
+    """
+    Shaft and head geometry for a list of edges, computed in one pass.
+
+    starts/ends are (x, y) screen positions of the ingredient and product Gu
+    and box_sizes the (width, height) of each product's box. Geometry is stored
+    as eight coordinate columns (start, tip, head point 1, head point 2), so
+    moving the camera is a translation of every column by the same offset.
+    """
+    def __init__(self, starts, ends, box_sizes, head_size=ARROW_SIZE):
+        if not starts:
+            self.columns = [[] for _ in range(8)]
+        elif np is not None:
+            self.columns = self._compute_vectorized(starts, ends, box_sizes, head_size)
+        else:
+            points = [calculate_arrow_points(sx, sy, ex, ey, w, h, head_size)
+                      for (sx, sy), (ex, ey), (w, h) in zip(starts, ends, box_sizes)]
+            self.columns = [list(column) for column in zip(*(
+                (s[0], s[1], e[0], e[1], p1[0], p1[1], p2[0], p2[1]) for s, e, p1, p2 in points))]
+
+    def __len__(self):
+        return len(self.columns[0])
+
+    @staticmethod
+    def _compute_vectorized(starts, ends, box_sizes, head_size):
+        start = np.asarray(starts, dtype=np.float64)
+        end = np.asarray(ends, dtype=np.float64)
+        half = np.asarray(box_sizes, dtype=np.float64) / 2
+        start_x, start_y = start[:, 0], start[:, 1]
+        end_x, end_y = end[:, 0], end[:, 1]
+        half_width, half_height = half[:, 0], half[:, 1]
+
+        angle = np.arctan2(end_y - start_y, end_x - start_x)
+        cos_a, sin_a, tan_a = np.cos(angle), np.sin(angle), np.tan(angle)
+
+        # Left/right edge intersection.
+        side_x = np.where(end_x > start_x, end_x - half_width, end_x + half_width)
+        side_y = start_y + (side_x - start_x) * tan_a
+        # Top/bottom edge intersection.
+        cap_y = np.where(end_y > start_y, end_y - half_height, end_y + half_height)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cap_x = np.where(tan_a != 0, start_x + (cap_y - start_y) / tan_a, end_x)
+
+        hits_side = np.abs(cos_a) * half_height > np.abs(sin_a) * half_width
+        tip_x = np.where(hits_side, side_x, cap_x)
+        tip_y = np.where(hits_side, side_y, cap_y)
+
+        point1_x = tip_x - head_size * np.cos(angle - ARROW_ANGLE)
+        point1_y = tip_y - head_size * np.sin(angle - ARROW_ANGLE)
+        point2_x = tip_x - head_size * np.cos(angle + ARROW_ANGLE)
+        point2_y = tip_y - head_size * np.sin(angle + ARROW_ANGLE)
+        return [start_x, start_y, tip_x, tip_y, point1_x, point1_y, point2_x, point2_y]
+
+    def translated(self, offset_x, offset_y, clip=None, anchored=False):
+        """
+        Return [(start, tip, point1, point2), ...] moved by the camera offset.
+        With clip=(left, top, right, bottom), only arrows whose shaft's bounding
+        box overlaps that screen rectangle are returned, or with anchored=True,
+        only arrows starting or ending inside it.
+        """
+        sx, sy, tx, ty, p1x, p1y, p2x, p2y = translate_columns(self.columns, offset_x, offset_y, clip,
+                                                               anchored=anchored)
+        return list(zip(zip(sx, sy), zip(tx, ty), zip(p1x, p1y), zip(p2x, p2y)))
+
+# -------------------------------
+# AGGREGATED EDGES
+# -------------------------------
+class EdgeBundles:
+    """
+    Edges merged for far-out views. The screen is cut into square cells of
+    cell_size pixels, and all edges joining the same two cells (either way)
+    become one bundle from the mean of their start points to the mean of their
+    end points, with the number of edges it stands for. Edges within a single
+    cell are dropped. As in ArrowBatch, panning is a translation of the columns.
+    """
+    def __init__(self, starts, ends, cell_size):
+        if not starts:
+            self.columns, self.counts = [[] for _ in range(4)], []
+        elif np is not None:
+            self.columns, self.counts = self._compute_vectorized(starts, ends, cell_size)
+        else:
+            self.columns, self.counts = self._compute(starts, ends, cell_size)
+
+    def __len__(self):
+        return len(self.counts)
+
+    @staticmethod
+    def _compute(starts, ends, cell_size):
+        sums = {}  # (first cell, second cell) -> [start x, start y, end x, end y, edge count], summed
+        for (sx, sy), (ex, ey) in zip(starts, ends):
+            start_cell = (int(sx // cell_size), int(sy // cell_size))
+            end_cell = (int(ex // cell_size), int(ey // cell_size))
+            if start_cell == end_cell:
+                continue
+            if end_cell < start_cell:  # Both directions share one bundle.
+                start_cell, end_cell = end_cell, start_cell
+                sx, sy, ex, ey = ex, ey, sx, sy
+            bundle = sums.get((start_cell, end_cell))
+            if bundle is None:
+                sums[(start_cell, end_cell)] = [sx, sy, ex, ey, 1]
+            else:
+                bundle[0] += sx
+                bundle[1] += sy
+                bundle[2] += ex
+                bundle[3] += ey
+                bundle[4] += 1
+        bundles = [sums[key] for key in sorted(sums)]
+        counts = [bundle[4] for bundle in bundles]
+        columns = [[bundle[i] / bundle[4] for bundle in bundles] for i in range(4)]
+        return columns, counts
+
+    @staticmethod
+    def _compute_vectorized(starts, ends, cell_size):
+        start = np.asarray(starts, dtype=np.float64)
+        end = np.asarray(ends, dtype=np.float64)
+        start_cell = np.floor_divide(start, cell_size).astype(np.int64)
+        end_cell = np.floor_divide(end, cell_size).astype(np.int64)
+
+        # Both directions share one bundle: order the two cells of every edge.
+        swap = ((end_cell[:, 0] < start_cell[:, 0])
+                | ((end_cell[:, 0] == start_cell[:, 0]) & (end_cell[:, 1] < start_cell[:, 1])))[:, None]
+        points = np.hstack((np.where(swap, end, start), np.where(swap, start, end)))
+        cells = np.hstack((np.where(swap, end_cell, start_cell), np.where(swap, start_cell, end_cell)))
+
+        keep = np.any(cells[:, :2] != cells[:, 2:], axis=1)
+        if not keep.any():
+            return [[] for _ in range(4)], []
+        _, bundle, counts = np.unique(cells[keep], axis=0, return_inverse=True, return_counts=True)
+        bundle = bundle.ravel()
+        points = points[keep]
+        columns = [np.bincount(bundle, weights=points[:, i]) / counts for i in range(4)]
+        return columns, counts.tolist()
+
+    def translated(self, offset_x, offset_y, clip=None, anchored=False):
+        """
+        Return [(start, end, edge count), ...] moved by the camera offset,
+        optionally only those picked by clip (see ArrowBatch.translated()).
+        """
+        rows = overlapping_rows(self.columns, offset_x, offset_y, clip, anchored)
+        sx, sy, ex, ey = translate_columns(self.columns, offset_x, offset_y, clip, rows)
+        counts = self.counts if rows is None else [self.counts[row] for row in rows]
+        return list(zip(zip(sx, sy), zip(ex, ey), counts))
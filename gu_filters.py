@@ -0,0 +1,205 @@
+import re
+from collections import OrderedDict
+from collections.abc import Mapping
+
+AFFINITY_SEPARATOR = re.compile(r"\s*(?:&|,)\s*")  # "Water, Light & Earth" -> Water / Light / Earth
+
+def affinity_tokens(affinity):
+    if not affinity:
+        return []
+    return [token for token in AFFINITY_SEPARATOR.split(affinity.strip()) if token]
+
+# -------------------------------
+# FILTER SELECTION
+# -------------------------------
+class FacetFilter:
+    """
+    The facets a user has switched on. Values within one facet are OR'ed
+    (level 2 or 3), facets are AND'ed (level 2-3 and "Moon" affinity).
+    An empty filter shows every Gu.
+    """
+    __slots__ = ("levels", "affinities", "families")
+
+    def __init__(self, levels=(), affinities=(), families=()):
+        self.levels = frozenset(levels)
+        self.affinities = frozenset(affinities)
+        self.families = frozenset(families)
+
+    def __bool__(self):
+        return bool(self.levels or self.affinities or self.families)
+
+    def __repr__(self):
+        return "FacetFilter(levels=%r, affinities=%r, families=%r)" % (
+            sorted(self.levels), sorted(self.affinities), sorted(self.families))
+
+    @property
+    def key(self):
+        return (self.levels, self.affinities, self.families)
+
+    def toggle_level(self, level):
+        return FacetFilter(self.levels ^ {level}, self.affinities, self.families)
+
+    def with_affinity(self, token):
+        return FacetFilter(self.levels, {token} if token else (), self.families)
+
+    def with_family(self, family):
+        return FacetFilter(self.levels, self.affinities, {family} if family else ())
+
+# -------------------------------
+# FILTERED VIEW
+# -------------------------------
+class FilteredView(Mapping):
+    """
+    Read-only subset of `objects` holding the Gu of one filter combination, in
+    catalog order. It can stand in for `objects` in calculate_positions() and
+    the drawing code; `edges` lists the recipe edges between its Gu.
+    """
+    def __init__(self, objects, graph, names, key):
+        self.objects = objects
+        self.graph = graph
+        self.names = names
+        self.name_set = frozenset(names)
+        self.key = key
+        self._edges = None
+        catalog_rgb = getattr(objects, "rgb", None)
+        if catalog_rgb is not None:
+            self.rgb = catalog_rgb
+
+    def __getitem__(self, name):
+        if name not in self.name_set:
+            raise KeyError(name)
+        return self.objects[name]
+
+    def __contains__(self, name):
+        return name in self.name_set
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def edges(self):
+        if self._edges is None:
+            name_set, recipe = self.name_set, self.graph.recipe
+            self._edges = [(ingredient, product) for product in self.names
+                           for ingredient in recipe.get(product, ()) if ingredient in name_set]
+        return self._edges
+
+# -------------------------------
+# BITSET INDEX
+# -------------------------------
+class FacetIndex:
+    """
+    Bitset index of the Gu database by level, affinity token and family.
+    Every Gu owns one bit; each facet value maps to a Python int with the bits
+    of its Gu set, so a filter is a few ORs and ANDs of big integers. The
+    resulting FilteredViews are cached per filter combination. After
+    graph.update(names), update(names) moves just those Gu between bitsets;
+    any other graph change rebuilds the index.
+    """
+    def __init__(self, graph, max_views=16):
+        self.graph = graph
+        self.max_views = max_views
+        self.rebuild()
+
+    def rebuild(self):
+        self.bits = {}        # Gu name -> bit
+        self.names = []       # bit -> Gu name (None once removed)
+        self.facets = {}      # Gu name -> (level, affinity tokens, family)
+        self.levels = {}
+        self.affinities = {}
+        self.families = {}
+        self.all = 0
+        self.views = OrderedDict()
+        for name in self.graph.objects:
+            self._add(name)
+        self.version = self.graph.version
+
+    def _add(self, name):
+        bit = self.bits.get(name)
+        if bit is None:
+            bit = self.bits[name] = len(self.names)
+            self.names.append(name)
+        data = self.graph.objects[name]
+        level = data.get("level", 1)
+        tokens = affinity_tokens(data.get("affinity"))
+        family = data.get("family")
+        mask = 1 << bit
+        self.levels[level] = self.levels.get(level, 0) | mask
+        for token in tokens:
+            self.affinities[token] = self.affinities.get(token, 0) | mask
+        if family:
+            self.families[family] = self.families.get(family, 0) | mask
+        self.all |= mask
+        self.facets[name] = (level, tokens, family)
+
+    def _remove(self, name):
+        facets = self.facets.pop(name, None)
+        if facets is None:
+            return
+        level, tokens, family = facets
+        clear = ~(1 << self.bits[name])
+        self.levels[level] &= clear
+        for token in tokens:
+            self.affinities[token] &= clear
+        if family:
+            self.families[family] &= clear
+        self.all &= clear
+        for index in (self.levels, self.affinities, self.families):
+            for value in [value for value, bits in index.items() if not bits]:
+                del index[value]
+
+    def update(self, names):
+        """
+        Re-index the given Gu after a single graph.update(names).
+        """
+        if self.version != self.graph.version - 1:
+            self.rebuild()
+            return
+        for name in names:
+            self._remove(name)
+            if name in self.graph.objects:
+                self._add(name)
+            elif name in self.bits:
+                self.names[self.bits.pop(name)] = None
+        self.views.clear()
+        self.version = self.graph.version
+
+    def _union(self, index, values):
+        bits = 0
+        for value in values:
+            bits |= index.get(value, 0)
+        return bits
+
+    def mask(self, facet_filter):
+        bits = self.all
+        if facet_filter.levels:
+            bits &= self._union(self.levels, facet_filter.levels)
+        if facet_filter.affinities:
+            bits &= self._union(self.affinities, facet_filter.affinities)
+        if facet_filter.families:
+            bits &= self._union(self.families, facet_filter.families)
+        return bits
+
+    def view(self, facet_filter):
+        """
+        Return the FilteredView for facet_filter, or None for an empty filter (every Gu).
+        """
+        if not facet_filter:
+            return None
+        if self.version != self.graph.version:
+            self.rebuild()
+        key = facet_filter.key
+        view = self.views.get(key)
+        if view is not None:
+            self.views.move_to_end(key)
+            return view
+        # Bit i of the mask is character i of its reversed binary string.
+        names = self.names
+        selected = [names[bit] for bit, char in enumerate(bin(self.mask(facet_filter))[:1:-1]) if char == "1"]
+        view = self.views[key] = FilteredView(self.graph.objects, self.graph, selected, key)
+        if len(self.views) > self.max_views:
+            self.views.popitem(last=False)
+        return view
@@ -0,0 +1,156 @@
+UNKNOWN_INGREDIENT = "???"  # Placeholder used in recipes for ingredients nobody knows yet.
+
+# -------------------------------
+# RECIPE GRAPH INDEX
+# -------------------------------
+class GuGraph:
+    """
+    Adjacency index over the Gu database, built once from `objects`.
+
+      - recipe[name]:     Gu ingredients of `name` (forward edges, deduplicated, recipe order).
+      - used_in[name]:    Gu whose recipe uses `name` (reverse edges, deduplicated).
+      - fusions[name]:    Gu listed in the "fusions" field of `name`.
+      - fused_from[name]: Gu whose "fusions" field lists `name`.
+      - related[name]:    recipe and fusion neighbours in both directions, as used by
+                          the ring layout.
+
+    Only names that exist in `objects` become edges; "???" and raw materials
+    such as "Spicy Wine" are skipped, but references to missing names are
+    remembered so the edge appears once that Gu is added. After mutating
+    `objects`, call update() with the changed names (or rebuild() for everything);
+    `version` is bumped each time so caches keyed by it are invalidated.
+    """
+    def __init__(self, objects):
+        self.objects = objects
+        self.version = -1
+        self.rebuild()
+
+    def rebuild(self):
+        self.recipe = {}
+        self.used_in = {}
+        self.fusions = {}
+        self.fused_from = {}
+        self.related = {}
+        self.missing = {}     # name not in objects -> Gu that reference it
+        self.missing_of = {}  # Gu -> names not in objects that it references
+        for name in self.objects:
+            self._add_node(name)
+        for name in self.objects:
+            self._link(name)
+        for name in self.objects:
+            self._relate(name)
+        self.version += 1
+
+    def update(self, names):
+        """
+        Re-index only the given Gu after they were added to, changed in or removed
+        from `objects`, together with the Gu whose edges point at them.
+        """
+        changed = set(names)
+        for name in list(changed):
+            if name in self.objects:
+                changed |= self.missing.pop(name, set())
+            elif name in self.recipe:
+                changed |= set(self.used_in[name]) | self.fused_from[name]
+
+        affected = set(changed)
+        for name in changed:
+            if name in self.recipe:
+                affected |= self.related[name]
+                self._unlink(name)
+        for name in changed:
+            if name not in self.objects:
+                for index in (self.recipe, self.used_in, self.fusions, self.fused_from, self.related):
+                    index.pop(name, None)
+            elif name not in self.recipe:
+                self._add_node(name)
+        for name in changed:
+            if name in self.objects:
+                self._link(name)
+                affected |= set(self.recipe[name]) | self.fusions[name]
+        for name in affected:
+            if name in self.objects:
+                self._relate(name)
+        self.version += 1
+
+    def _add_node(self, name):
+        self.recipe[name] = []
+        self.used_in[name] = []
+        self.fusions[name] = set()
+        self.fused_from[name] = set()
+        self.related[name] = set()
+
+    def _reference(self, name, target):
+        if target in self.objects:
+            return True
+        self.missing.setdefault(target, set()).add(name)
+        self.missing_of.setdefault(name, set()).add(target)
+        return False
+
+    def _link(self, name):
+        data = self.objects[name]
+        for ingredient in data.get("recipe", []):
+            if ingredient == UNKNOWN_INGREDIENT or not self._reference(name, ingredient):
+                continue
+            if ingredient not in self.recipe[name]:
+                self.recipe[name].append(ingredient)
+                self.used_in[ingredient].append(name)
+        for fusion in data.get("fusions", []):
+            if self._reference(name, fusion):
+                self.fusions[name].add(fusion)
+                self.fused_from[fusion].add(name)
+
+    def _unlink(self, name):
+        for ingredient in self.recipe[name]:
+            if ingredient in self.used_in:
+                self.used_in[ingredient].remove(name)
+        for fusion in self.fusions[name]:
+            if fusion in self.fused_from:
+                self.fused_from[fusion].discard(name)
+        self.recipe[name] = []
+        self.fusions[name] = set()
+        for target in self.missing_of.pop(name, ()):
+            referrers = self.missing.get(target)
+            if referrers is not None:
+                referrers.discard(name)
+                if not referrers:
+                    del self.missing[target]
+
+    def _relate(self, name):
+        self.related[name] = (set(self.recipe[name]) | set(self.used_in[name])
+                              | self.fusions[name] | self.fused_from[name])
+
+    def edges(self):
+        """
+        Yield every (ingredient, product) recipe edge once.
+        """
+        for product, ingredients in self.recipe.items():
+            for ingredient in ingredients:
+                yield ingredient, product
+
+    def walk_levels(self, start, adjacency):
+        """
+        Breadth-first walk from `start` along `adjacency` (self.recipe or self.used_in).
+        Returns a list of levels, each a list of names first reached at that depth.
+        Every Gu is visited once, so cyclic or self-referencing recipes terminate.
+        """
+        levels = []
+        visited = {start}
+        frontier = [start]
+        while frontier:
+            next_frontier = []
+            for name in frontier:
+                for neighbour in adjacency.get(name, ()):
+                    if neighbour not in visited:
+                        visited.add(neighbour)
+                        next_frontier.append(neighbour)
+            if next_frontier:
+                levels.append(next_frontier)
+            frontier = next_frontier
+        return levels
+
+    def ingredient_levels(self, name):
+        return self.walk_levels(name, self.recipe)
+
+    def product_levels(self, name):
+        return self.walk_levels(name, self.used_in)
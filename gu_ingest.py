@@ -0,0 +1,221 @@
+import csv
+import json
+import os
+import re
+import time
+
+# -------------------------------
+# RECORD VALIDATION
+# -------------------------------
+HEX_COLOR = re.compile(r"^#[0-9a-fA-F]{6}$")
+LIST_SEPARATOR = ";"   # Separates recipe/fusion entries inside one CSV cell
+TEXT_FIELDS = ("effect", "affinity", "family")
+
+class CatalogError(ValueError):
+    """
+    Raised for a catalog record that is missing or has malformed fields.
+    """
+    def __init__(self, source, line, message):
+        super().__init__("%s:%s: %s" % (source, line, message))
+        self.source = source
+        self.line = line
+
+def _as_list(value, field, source, line):
+    if value is None or value == "":
+        return []
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(LIST_SEPARATOR) if item.strip()]
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return list(value)
+    raise CatalogError(source, line, "%r must be a list of names" % field)
+
+def validate_record(record, source="<record>", line=0):
+    """
+    Check the fields main.py relies on (name, color, level, recipe, fusions) and
+    return (key, data) with data in the same shape as gu_data.objects entries.
+    CSV values arrive as strings, so levels are converted and list fields split
+    on LIST_SEPARATOR. The optional "key" field sets the catalog key when it
+    differs from the display name.
+    """
+    if not isinstance(record, dict):
+        raise CatalogError(source, line, "record must be an object")
+    name = record.get("name")
+    if not isinstance(name, str) or not name.strip():
+        raise CatalogError(source, line, "missing 'name'")
+    name = name.strip()
+    data = {"name": name}
+
+    color = record.get("color")
+    if color not in (None, ""):
+        if not isinstance(color, str) or not HEX_COLOR.match(color):
+            raise CatalogError(source, line, "'color' must look like #RRGGBB, got %r" % (color,))
+        data["color"] = color
+
+    level = record.get("level", 1)
+    try:
+        level = int(level)
+    except (TypeError, ValueError):
+        raise CatalogError(source, line, "'level' must be an integer, got %r" % (level,))
+    if level < 1:
+        raise CatalogError(source, line, "'level' must be at least 1, got %r" % (level,))
+    data["level"] = level
+
+    for field in TEXT_FIELDS:
+        value = record.get(field)
+        if value not in (None, ""):
+            data[field] = str(value)
+    data["recipe"] = _as_list(record.get("recipe"), "recipe", source, line)
+    data["fusions"] = _as_list(record.get("fusions"), "fusions", source, line)
+
+    key = record.get("key") or name
+    return key, data
+
+# -------------------------------
+# STREAMING READERS
+# -------------------------------
+# Readers yield (line, record) pairs. A record that cannot be decoded is
+# yielded as a CatalogError in its place, so iter_records() can skip it.
+def _decode_error(source, line, error):
+    return CatalogError(source, line, "invalid JSON: %s" % error)
+
+def _read_jsonl(f, source):
+    for line_number, line in enumerate(f, start=1):
+        if line.strip():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                record = _decode_error(source, line_number, e)
+            yield line_number, record
+
+def _read_csv(f, source):
+    reader = csv.DictReader(f)
+    for record in reader:
+        yield reader.line_num, record
+
+def _read_json(f, source, chunk_size=1 << 16):
+    """
+    Stream the objects of a top-level JSON array without loading the whole file.
+    A top-level object ({key: data}, the gu_data.objects shape) is read in one go.
+    Nothing after a malformed record can be trusted, so reading stops there.
+    """
+    decoder = json.JSONDecoder()
+    buffer = f.read(chunk_size).lstrip()
+    if buffer.startswith("{"):
+        try:
+            document = json.loads(buffer + f.read())
+        except json.JSONDecodeError as e:
+            yield 1, _decode_error(source, 1, e)
+            return
+        for index, (key, data) in enumerate(document.items(), start=1):
+            if isinstance(data, dict):
+                data = dict(data, key=key)
+            yield index, data
+        return
+    if not buffer.startswith("["):
+        yield 1, CatalogError(source, 1, "expected a JSON array or object")
+        return
+    buffer = buffer[1:]
+    index = 0
+    eof = False
+    while True:
+        buffer = buffer.lstrip().lstrip(",").lstrip()
+        if buffer.startswith("]"):
+            return
+        try:
+            record, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError as e:
+            if eof:
+                yield index + 1, _decode_error(source, index + 1, e)
+                return
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+            continue
+        index += 1
+        yield index, record
+        buffer = buffer[end:]
+
+def iter_records(path, errors=None):
+    """
+    Yield validated (key, data) pairs from a .jsonl, .csv or .json catalog file,
+    reading it incrementally. Invalid or undecodable records raise CatalogError,
+    unless an `errors` list is given, in which case the error is appended and
+    the record skipped.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    readers = {".jsonl": _read_jsonl, ".ndjson": _read_jsonl, ".csv": _read_csv, ".json": _read_json}
+    reader = readers.get(extension)
+    if reader is None:
+        raise ValueError("unsupported catalog format: %s" % path)
+    with open(path, newline="" if extension == ".csv" else None, encoding="utf-8") as f:
+        for line, record in reader(f, path):
+            try:
+                if isinstance(record, CatalogError):
+                    raise record
+                yield validate_record(record, path, line)
+            except CatalogError as e:
+                if errors is None:
+                    raise
+                errors.append(e)
+
+def iter_batches(records, batch_size):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+# -------------------------------
+# INCREMENTAL LOADING
+# -------------------------------
+def apply_batch(objects, graph, batch):
+    """
+    Store a batch of (key, data) records in `objects` (a dict or GuCatalog) and
+    re-index only those Gu in the graph.
+    """
+    upsert = getattr(objects, "upsert", None)
+    for key, data in batch:
+        if upsert is not None:
+            upsert(key, data)
+        else:
+            objects[key] = data
+    graph.update(key for key, _ in batch)
+
+class CatalogLoader:
+    """
+    Feeds a catalog file into `objects` and its graph a batch at a time.
+    step() applies batches until its time budget is spent, so the viewer can
+    call it once per frame and keep drawing while a large catalog loads;
+    each applied batch bumps the graph version and shows up on the next frame.
+    """
+    def __init__(self, path, objects, graph, batch_size=500):
+        self.path = path
+        self.objects = objects
+        self.graph = graph
+        self.errors = []
+        self.loaded = 0
+        self.done = False
+        self._batches = iter_batches(iter_records(path, self.errors), batch_size)
+
+    def step(self, time_budget=0.008, on_batch=None):
+        """
+        Apply batches for up to time_budget seconds. Returns True while more remain.
+        on_batch(names) is called after each batch is re-indexed, so indexes that
+        follow the graph with update(names) can keep up one graph version at a time.
+        """
+        deadline = time.perf_counter() + time_budget
+        while not self.done:
+            batch = next(self._batches, None)
+            if batch is None:
+                self.done = True
+                break
+            apply_batch(self.objects, self.graph, batch)
+            self.loaded += len(batch)
+            if on_batch is not None:
+                on_batch([key for key, _ in batch])
+            if time.perf_counter() >= deadline:
+                break
+        return not self.done
@@ -0,0 +1,252 @@
+from bisect import bisect_right, insort
+
+# -------------------------------
+# LAYERED LAYOUT SETTINGS
+# -------------------------------
+# A Sugiyama-style layered layout: nodes on horizontal layers, edges pointing
+# down, node order chosen to reduce crossings, x coordinates packed tightly.
+ORDER_SWEEPS = 8      # Up/down median sweeps of the crossing reduction (at most)
+ORDER_PATIENCE = 2    # Stop after this many sweeps without fewer crossings
+COORD_SWEEPS = 4      # Up/down passes of the coordinate assignment
+DUMMY_WIDTH = 40      # Room reserved for a long edge passing through a layer
+DUMMY_WEIGHT = 4      # How much harder long edges are pulled straight than real nodes
+
+class LayoutCancelled(Exception):
+    """
+    Raised inside a layout when its `cancelled()` callback returns True.
+    """
+
+def check_cancelled(cancelled):
+    if cancelled is not None and cancelled():
+        raise LayoutCancelled()
+
+# -------------------------------
+# CYCLE REMOVAL
+# -------------------------------
+def dfs_postorder(names, successors):
+    """
+    Iterative depth-first walk over `names` (in order) along successors(name).
+    Returns (postorder, back_edges): every name once, after all the names it
+    leads to except through a back edge, and the set of (name, successor) edges
+    that close a cycle. Dropping the back edges leaves a DAG whose topological
+    order is the reversed postorder. Deterministic for a given input order.
+    """
+    postorder = []
+    back_edges = set()
+    state = {}  # name -> 1 while on the DFS stack, 2 once finished
+    for start in names:
+        if start in state:
+            continue
+        state[start] = 1
+        stack = [(start, iter(successors(start)))]
+        while stack:
+            name, children = stack[-1]
+            for child in children:
+                child_state = state.get(child)
+                if child_state is None:
+                    state[child] = 1
+                    stack.append((child, iter(successors(child))))
+                    break
+                if child_state == 1:
+                    back_edges.add((name, child))
+            else:
+                stack.pop()
+                state[name] = 2
+                postorder.append(name)
+    return postorder, back_edges
+
+# -------------------------------
+# CROSSING REDUCTION
+# -------------------------------
+def count_crossings(upper_positions, lower_positions, edges):
+    """
+    Number of crossings between two adjacent layers: inversions among the lower
+    ends of the edges sorted by their upper end, counted on a sorted list.
+    """
+    pairs = sorted((upper_positions[u], lower_positions[v]) for u, v in edges)
+    seen = []
+    crossings = 0
+    for _, lower in pairs:
+        # Edges seen so far whose lower end is right of this one cross it.
+        crossings += len(seen) - bisect_right(seen, lower)
+        insort(seen, lower)
+    return crossings
+
+def _sort_key(i, positions):
+    # Median of the neighbour positions, then their barycenter, then the current place.
+    if not positions:
+        return (i, i, i)
+    if len(positions) == 1:
+        return (positions[0], positions[0], i)
+    values = sorted(positions)
+    middle = len(values) // 2
+    median = values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+    return (median, sum(values) / len(values), i)
+
+def order_layers(rows, up, down, cancelled=None):
+    """
+    Reorder each row (a list of node ids per layer, top to bottom) to reduce
+    edge crossings. Sweeps alternate down and up; each node moves to the median
+    position of its neighbours in the row just swept (barycenter breaks ties,
+    nodes without neighbours keep their place), and the ordering with the
+    fewest crossings seen is returned.
+    """
+    def crossings(rows):
+        total = 0
+        for upper, lower in zip(rows, rows[1:]):
+            upper_positions = {node: i for i, node in enumerate(upper)}
+            lower_positions = {node: i for i, node in enumerate(lower)}
+            total += count_crossings(upper_positions, lower_positions,
+                                     [(u, v) for u in upper for v in down[u]])
+        return total
+
+    rows = [list(row) for row in rows]
+    best, best_crossings = [list(row) for row in rows], crossings(rows)
+    stale = 0
+    for sweep in range(ORDER_SWEEPS):
+        if not best_crossings or stale >= ORDER_PATIENCE:
+            break
+        check_cancelled(cancelled)
+        if sweep % 2 == 0:
+            layer_range, neighbours = range(1, len(rows)), up
+            fixed_offset = -1
+        else:
+            layer_range, neighbours = range(len(rows) - 2, -1, -1), down
+            fixed_offset = 1
+        for layer in layer_range:
+            fixed = {node: i for i, node in enumerate(rows[layer + fixed_offset])}
+            keys = [(_sort_key(i, [fixed[other] for other in neighbours[node]]), node)
+                    for i, node in enumerate(rows[layer])]
+            keys.sort()
+            rows[layer] = [node for _, node in keys]
+        total = crossings(rows)
+        if total < best_crossings:
+            best, best_crossings = [list(row) for row in rows], total
+            stale = 0
+        else:
+            stale += 1
+    return best
+
+# -------------------------------
+# COORDINATE ASSIGNMENT
+# -------------------------------
+def pack_row(ideal, widths, weights):
+    """
+    X coordinates for one ordered row: as close as possible (weighted least
+    squares) to `ideal`, in order, neighbours at least half their widths apart.
+    Shifting each node by the room its left neighbours need turns this into
+    isotonic regression, solved exactly by pooling adjacent violators.
+    """
+    offsets = []
+    offset = 0.0
+    previous = widths[0] if widths else 0.0
+    sums, totals, counts = [], [], []  # Pooled blocks: weighted sum, weight, node count
+    for target, width, weight in zip(ideal, widths, weights):
+        offset += (previous + width) / 2 if offsets else 0.0
+        previous = width
+        offsets.append(offset)
+        block_sum, block_weight, count = (target - offset) * weight, weight, 1
+        while sums and sums[-1] * block_weight > block_sum * totals[-1]:
+            block_sum += sums.pop()
+            block_weight += totals.pop()
+            count += counts.pop()
+        sums.append(block_sum)
+        totals.append(block_weight)
+        counts.append(count)
+    xs = []
+    for block_sum, block_weight, count in zip(sums, totals, counts):
+        xs.extend([block_sum / block_weight] * count)
+    return [x + offset for x, offset in zip(xs, offsets)]
+
+def assign_coordinates(rows, up, down, widths, weights, cancelled=None):
+    """
+    Return {node: x}. Rows start packed around 0; each pass then pulls every
+    node towards the mean x of its neighbours in the layer above (down passes)
+    or below (up passes) and re-packs the row, and two last passes balance both sides.
+    """
+    x = {}
+    for row in rows:
+        x.update(zip(row, pack_row([0.0] * len(row), [widths[node] for node in row], [weights[node] for node in row])))
+
+    both = [up_nodes + down_nodes for up_nodes, down_nodes in zip(up, down)]
+    row_widths = [[widths[node] for node in row] for row in rows]
+    row_weights = [[weights[node] for node in row] for row in rows]
+
+    def relax(layers, neighbours):
+        check_cancelled(cancelled)
+        for layer in layers:
+            row = rows[layer]
+            ideal = []
+            for node in row:
+                others = neighbours[node]
+                if len(others) == 1:
+                    ideal.append(x[others[0]])
+                elif others:
+                    ideal.append(sum([x[other] for other in others]) / len(others))
+                else:
+                    ideal.append(x[node])
+            x.update(zip(row, pack_row(ideal, row_widths[layer], row_weights[layer])))
+
+    for sweep in range(COORD_SWEEPS):
+        if sweep % 2 == 0:
+            relax(range(1, len(rows)), up)
+        else:
+            relax(range(len(rows) - 2, -1, -1), down)
+    relax(range(len(rows)), both)
+    relax(range(len(rows) - 1, -1, -1), both)
+    return x
+
+# -------------------------------
+# LAYERED LAYOUT
+# -------------------------------
+def layered_positions(layers, edges, anchor, center_x, center_y, node_width, layer_height, cancelled=None):
+    """
+    Lay out a layered graph and return {name: (x, y)}.
+
+      - layers: {layer number: [names in initial order]}; every name on one layer.
+      - edges:  (upper, lower) pairs with layer(upper) < layer(lower).
+      - anchor: name placed at center_x; layer 0 is at center_y.
+
+    Edges spanning several layers get a dummy node on each layer in between, so
+    they take part in crossing reduction and keep a lane free; only the named
+    nodes are returned. `cancelled` is polled between sweeps (see LayoutCancelled).
+    """
+    numbers = sorted(layers)
+    if not numbers:
+        return {}
+    first = numbers[0]
+    rows = [[] for _ in range(numbers[-1] - first + 1)]
+    ids, names, node_layer = {}, [], []
+    for number in numbers:
+        for name in layers[number]:
+            ids[name] = len(names)
+            names.append(name)
+            node_layer.append(number - first)
+            rows[number - first].append(ids[name])
+
+    up = [[] for _ in names]
+    down = [[] for _ in names]
+    for upper, lower in edges:
+        chain = [ids[upper]]
+        for layer in range(node_layer[ids[upper]] + 1, node_layer[ids[lower]]):
+            dummy = len(up)
+            up.append([])
+            down.append([])
+            node_layer.append(layer)
+            rows[layer].append(dummy)
+            chain.append(dummy)
+        chain.append(ids[lower])
+        for a, b in zip(chain, chain[1:]):
+            down[a].append(b)
+            up[b].append(a)
+
+    rows = order_layers(rows, up, down, cancelled)
+    real = len(names)
+    widths = [node_width if node < real else DUMMY_WIDTH for node in range(len(up))]
+    weights = [1 if node < real else DUMMY_WEIGHT for node in range(len(up))]
+    x = assign_coordinates(rows, up, down, widths, weights, cancelled)
+
+    # Offsets from the anchor, so the anchor lands exactly on center_x.
+    origin = x[ids[anchor]] if anchor in ids else 0.0
+    return {name: (center_x + (x[i] - origin), center_y + (node_layer[i] + first) * layer_height)
+            for i, name in enumerate(names)}
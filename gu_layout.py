@@ -0,0 +1,558 @@
+from collections import defaultdict, OrderedDict
+import math
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; ring costs are then summed in plain loops.
+    np = None
+
+from gu_graph import GuGraph
+from gu_layered import check_cancelled, dfs_postorder, layered_positions
+
+# -------------------------------
+# LAYOUT SETTINGS
+# -------------------------------
+# Everything here is pure Python: no pygame, no display, no mutation of `objects`,
+# so layouts can be computed from batch tools, tests and workers.
+CENTER_X = 640            # Default world center (middle of the 1280x720 window)
+CENTER_Y = 360
+distance_mapping = {4: 100, 3: 220, 2: 340, 1: 460}  # Ring radius per Gu level
+VERTICAL_SPACING = 150    # Vertical space between Gu levels in fusion line view
+HORIZONTAL_SPACING = 200  # Horizontal space between Gu in the same level
+NODE_SPACING = 100        # Minimum distance between neighbouring Gu on a ring track
+TRACK_SPACING = 70        # Distance between the concentric tracks of a crowded ring
+
+def ring_radius(data):
+    """
+    Return the ring radius for a Gu entry from its level (falling back to its own "radius").
+    """
+    return distance_mapping.get(data.get("level", 1), data.get("radius", 0))
+
+# -------------------------------
+# FUSION LINE LAYOUT
+# -------------------------------
+def get_fusion_line_elements(objects, selected_gu, graph=None):
+    """
+    Get all Gu related to the selected one in the fusion hierarchy.
+    Returns a dict with levels (negative for ingredients, positive for products).
+    Ingredients and products are read from the graph index, so each Gu is
+    expanded once even if recipes are cyclic.
+    """
+    if graph is None:
+        graph = GuGraph(objects)
+    elements = defaultdict(list)
+    elements[0] = [selected_gu]  # Center level
+
+    # Get ingredients (upward)
+    for depth, names in enumerate(graph.ingredient_levels(selected_gu), start=1):
+        elements[-depth].extend(names)
+
+    # Get products (downward)
+    for depth, names in enumerate(graph.product_levels(selected_gu), start=1):
+        elements[depth].extend(names)
+    return elements
+
+def fusion_line_layers(elements, graph):
+    """
+    Longest-path layering of a fusion line: returns ({layer: [names]}, edges)
+    for layered_positions(). Every Gu of `elements` gets exactly one layer, on
+    the side of the selected Gu where the walks met it first. Ingredients sit
+    one row above the highest product they are used in, products one row below
+    their lowest ingredient, so every recipe arrow on the line points down.
+    Recipe cycles are broken by leaving out their back edges; Gu cut off from
+    the selected Gu (by a filter) keep the depth they were found at.
+    """
+    root = elements[0][0]
+    depth = {}
+    for level in sorted(elements, key=abs):  # -1 before 1: ingredient side wins ties
+        for name in elements[level]:
+            depth.setdefault(name, level)
+
+    products_of = defaultdict(list)
+    ingredients_of = defaultdict(list)
+    for product in depth:
+        for ingredient in dict.fromkeys(graph.recipe.get(product, ())):
+            if ingredient in depth and ingredient != product:
+                products_of[ingredient].append(product)
+                ingredients_of[product].append(ingredient)
+
+    layer = {root: 0}
+    above = [name for name in depth if depth[name] < 0]
+    below = [name for name in depth if depth[name] > 0]
+
+    # Ingredients: postorder puts every product before the ingredients it is made from.
+    # The selected Gu stays on layer 0 and every ingredient is at depth -1 or above it,
+    # so the walk never enters it; a cycle through it could otherwise move it up.
+    def up_successors(name):
+        return [product for product in products_of[name] if depth[product] < 0]
+    postorder, back_edges = dfs_postorder(above, up_successors)
+    for name in postorder:
+        layer[name] = min([depth[name]] + [layer[product] - 1 for product in up_successors(name)
+                                           if (name, product) not in back_edges])
+
+    # Products: reversed postorder from the selected Gu is a topological order.
+    def down_successors(name):
+        return [product for product in products_of[name] if depth[product] > 0]
+    postorder, back_edges = dfs_postorder([root] + below, down_successors)
+    for name in reversed(postorder):
+        if name != root:
+            layer[name] = max([depth[name]] + [layer[ingredient] + 1 for ingredient in ingredients_of[name]
+                                               if depth[ingredient] >= 0 and (ingredient, name) not in back_edges])
+
+    layers = defaultdict(list)
+    for name in depth:
+        layers[layer[name]].append(name)
+    edges = [(ingredient, product) for ingredient, products in products_of.items() for product in products
+             if layer[ingredient] < layer[product]]
+    return layers, edges
+
+def calculate_fusion_line_positions(elements, center_x, center_y, graph=None, cancelled=None):
+    """
+    Calculate positions for Gu in fusion view: a layered layout with the
+    selected Gu at (center_x, center_y), ingredients above and products below,
+    each Gu shown once. With the graph, rows come from fusion_line_layers() and
+    are ordered to reduce arrow crossings; without it, each level of `elements`
+    is one row in discovery order. `cancelled` is polled as in layered_positions().
+    """
+    if graph is not None:
+        layers, edges = fusion_line_layers(elements, graph)
+    else:
+        seen = set()
+        layers = {}
+        for level in sorted(elements, key=abs):
+            layers[level] = [name for name in dict.fromkeys(elements[level]) if name not in seen]
+            seen.update(layers[level])
+        edges = []
+    # Gu in fusion view are packed at 80% of the ring layout's horizontal spacing.
+    return layered_positions(layers, edges, elements[0][0], center_x, center_y,
+                             HORIZONTAL_SPACING * 0.8, VERTICAL_SPACING, cancelled)
+
+# -------------------------------
+# POSITION CALCULATION
+# -------------------------------
+def track_capacity(radius):
+    """
+    How many Gu fit on a circle of `radius` at least NODE_SPACING apart.
+    """
+    return max(1, int(2 * math.pi * radius / NODE_SPACING))
+
+def ring_tracks(count, radius):
+    """
+    Number of concentric tracks, TRACK_SPACING apart, a ring of `count` Gu needs.
+    Outer tracks are longer and hold more Gu.
+    """
+    tracks = 1
+    capacity = track_capacity(radius)
+    while capacity < count:
+        capacity += track_capacity(radius + tracks * TRACK_SPACING)
+        tracks += 1
+    return tracks
+
+def track_slots(count, radius, tracks):
+    """
+    Return `count` (angle, radius) slots spread over the tracks in proportion to
+    their capacity, each track's slots evenly around the circle from the top,
+    sorted by angle so consecutive Gu stay angular neighbours.
+    """
+    capacities = [track_capacity(radius + track * TRACK_SPACING) for track in range(tracks)]
+    total = sum(capacities)
+    quotas = [count * capacity // total for capacity in capacities]
+    for track in range(count - sum(quotas)):
+        quotas[track] += 1
+    slots = sorted((slot / quota, track, slot) for track, quota in enumerate(quotas) for slot in range(quota))
+    top = -math.pi / 2
+    return [(top + 2 * math.pi * fraction, radius + track * TRACK_SPACING) for fraction, track, _ in slots]
+
+def ring_radii(grouped_objects, objects):
+    """
+    Return {level: (radius, tracks)}. Rings that spill into extra tracks push
+    every ring outside them outwards by the same amount, so tracks never overlap.
+    """
+    radii = {}
+    shift = 0
+    base_radii = {level: ring_radius(objects[names[0]]) for level, names in grouped_objects.items()}
+    for level in sorted(base_radii, key=lambda level: (base_radii[level], -level)):
+        radius = base_radii[level] + shift
+        tracks = ring_tracks(len(grouped_objects[level]), radius)
+        radii[level] = (radius, tracks)
+        shift += (tracks - 1) * TRACK_SPACING
+    return radii
+
+def _neighbour_edges(names, relationships, placed, center_x, center_y):
+    """
+    Edges from the ring to Gu already placed, as parallel lists:
+    (index of the ring Gu, angle of the neighbour around the center, its distance).
+    Neighbours are visited in sorted order so the float sums are reproducible.
+    """
+    owners, angles, distances = [], [], []
+    for i, name in enumerate(names):
+        related = relationships.get(name)
+        if not related:
+            continue
+        for rel in sorted(related):
+            pos = placed.get(rel)
+            if pos is None:
+                continue
+            dx, dy = pos[0] - center_x, pos[1] - center_y
+            owners.append(i)
+            angles.append(math.atan2(dy, dx))
+            distances.append(math.hypot(dx, dy))
+    return owners, angles, distances
+
+def _barycenters(count, owners, angles):
+    """
+    Circular mean angle of each ring Gu's placed neighbours (None without any).
+    """
+    if np is not None and owners:
+        owner_array = np.array(owners)
+        angle_array = np.array(angles)
+        sum_x = np.bincount(owner_array, np.cos(angle_array), minlength=count)
+        sum_y = np.bincount(owner_array, np.sin(angle_array), minlength=count)
+        has_neighbours = np.bincount(owner_array, minlength=count) > 0
+        means = np.arctan2(sum_y, sum_x).tolist()
+        return [mean if has else None for mean, has in zip(means, has_neighbours.tolist())]
+    sum_x = [0.0] * count
+    sum_y = [0.0] * count
+    has_neighbours = [False] * count
+    for i, angle in zip(owners, angles):
+        sum_x[i] += math.cos(angle)
+        sum_y[i] += math.sin(angle)
+        has_neighbours[i] = True
+    return [math.atan2(sum_y[i], sum_x[i]) if has_neighbours[i] else None for i in range(count)]
+
+def _best_rotation(slot_angles, slot_radii, owners, angles, distances):
+    """
+    Rotation (in radians) of the whole ring that minimises the summed squared
+    length of its edges to placed Gu. For a slot at angle t and radius r and a
+    neighbour at angle a and distance d, the squared length is
+    r^2 + d^2 - 2 r d cos(t + phi - a), so the optimum phi is minus the argument
+    of sum(r d e^(i (t - a))): one pass over the edges, no search over angles.
+    """
+    if not owners:
+        return 0.0
+    if np is not None:
+        owner_array = np.array(owners)
+        delta = np.array(slot_angles)[owner_array] - np.array(angles)
+        weight = np.array(slot_radii)[owner_array] * np.array(distances)
+        real, imag = float(np.dot(weight, np.cos(delta))), float(np.dot(weight, np.sin(delta)))
+    else:
+        real = imag = 0.0
+        for i, angle, distance in zip(owners, angles, distances):
+            weight = slot_radii[i] * distance
+            real += weight * math.cos(slot_angles[i] - angle)
+            imag += weight * math.sin(slot_angles[i] - angle)
+    if abs(real) < 1e-9 and abs(imag) < 1e-9:
+        return 0.0  # Neighbours all around: every rotation is as good.
+    return -math.atan2(imag, real)
+
+def place_ring(names, radius, relationships, placed, center_x=CENTER_X, center_y=CENTER_Y, tracks=None):
+    """
+    Place the Gu of one level ring and return {name: (x, y)}.
+    `placed` holds the positions of the rings laid out before this one. Gu are
+    ordered around the ring by the mean angle of their placed neighbours (Gu
+    without any follow in catalog order), spread in that order over `tracks`
+    concentric tracks (see track_slots()), and the ring is then rotated to the
+    angle that brings it closest to its neighbours. Deterministic for a given
+    catalog order.
+    """
+    count = len(names)
+    if not count:
+        return {}
+    if tracks is None:
+        tracks = ring_tracks(count, radius)
+
+    owners, angles, distances = _neighbour_edges(names, relationships, placed, center_x, center_y)
+    barycenters = _barycenters(count, owners, angles)
+    # Sort by angle measured clockwise from the top, where the first slot is;
+    # rounding keeps ties between equal means in catalog order.
+    top = -math.pi / 2
+    order = sorted(range(count), key=lambda i: (
+        barycenters[i] is None,
+        round((barycenters[i] - top) % (2 * math.pi), 9) if barycenters[i] is not None else 0.0,
+        i))
+
+    slot_angles = [0.0] * count
+    slot_radii = [0.0] * count
+    for i, (angle, slot_radius) in zip(order, track_slots(count, radius, tracks)):
+        slot_angles[i] = angle
+        slot_radii[i] = slot_radius
+
+    rotation = _best_rotation(slot_angles, slot_radii, owners, angles, distances)
+    ring_positions = {}
+    for i in order:
+        angle = slot_angles[i] + rotation
+        ring_positions[names[i]] = (center_x + slot_radii[i] * math.cos(angle),
+                                    center_y + slot_radii[i] * math.sin(angle))
+    return ring_positions
+
+def group_by_level(objects):
+    grouped_objects = {}
+    for name, data in objects.items():
+        level = data.get("level", 1)
+        grouped_objects.setdefault(level, []).append(name)
+    return grouped_objects
+
+def calculate_positions(objects, graph=None, center_x=CENTER_X, center_y=CENTER_Y, cancelled=None):
+    # First, group objects by level
+    grouped_objects = group_by_level(objects)
+
+    # Recipe and fusion relationships come from the graph index
+    if graph is None:
+        graph = GuGraph(objects)
+    relationships = graph.related
+
+    object_positions = {}
+
+    # Process each level; rings are placed against the higher levels already laid out
+    radii = ring_radii(grouped_objects, objects)
+    for level, names in sorted(grouped_objects.items(), reverse=True):
+        check_cancelled(cancelled)  # A background job can be dropped between rings
+        radius, tracks = radii[level]
+        object_positions.update(place_ring(names, radius, relationships, object_positions,
+                                           center_x, center_y, tracks))
+
+    return object_positions
+
+class GuLayout:
+    """
+    World-space ring layout of the Gu database.
+    calculate_positions() is only run when the graph version changes, so the
+    render loop, hit-testing and camera code can all read the same positions.
+    After a small edit, update() re-lays out just the rings it touched instead.
+
+    With a filtered view set (see gu_filters), only the Gu in the view are laid
+    out; the last few views' layouts are kept, so switching filters back is instant.
+
+    `positions` lays out on demand. To keep layout off the render thread, read
+    cached() instead and run compute() elsewhere (see gu_worker), handing the
+    result back to store() on the thread that owns the layout.
+    """
+    def __init__(self, graph, center_x=CENTER_X, center_y=CENTER_Y, max_views=8):
+        self.graph = graph
+        self.center_x = center_x
+        self.center_y = center_y
+        self.version = None
+        self.levels = {}  # name -> level it was laid out at
+        self.radii = {}   # level -> (radius, tracks) it was laid out with
+        self._positions = {}
+        self.view = None
+        self.max_views = max_views
+        self.view_positions = OrderedDict()  # view key -> (view, positions)
+
+    def set_view(self, view):
+        """
+        Lay out only the Gu of `view` (a FilteredView), or every Gu if view is None.
+        """
+        self.view = view
+
+    @property
+    def positions(self):
+        positions = self.cached()
+        if positions is None:
+            self.store(self.key, self.compute(self.view))
+            positions = self.cached()
+        return positions
+
+    @property
+    def key(self):
+        """
+        What the current layout is computed from: (graph version, view).
+        """
+        return (self.graph.version, self.view)
+
+    def cached(self):
+        """
+        Return the positions of the current view if they are laid out, else None. Never computes.
+        """
+        view = self.view
+        if view is None:
+            return self._positions if self.version == self.graph.version else None
+        entry = self.view_positions.get(view.key)
+        if entry is None or entry[0] is not view:
+            # Views are rebuilt when the catalog changes, so a new view object means new contents.
+            return None
+        self.view_positions.move_to_end(view.key)
+        return entry[1]
+
+    def compute(self, view=None, cancelled=None):
+        """
+        Lay out every Gu, or only those of `view`, and return the result for
+        store(). Reads the graph but changes nothing, so it can run on a worker thread.
+        """
+        objects = view if view is not None else self.graph.objects
+        positions = calculate_positions(objects, self.graph, self.center_x, self.center_y, cancelled)
+        if view is not None:
+            return positions, None, None
+        levels = {name: data.get("level", 1) for name, data in objects.items()}
+        return positions, levels, ring_radii(group_by_level(objects), objects)
+
+    def store(self, key, result):
+        """
+        Cache a compute() result made for `key`. Returns False (and stores
+        nothing) if the graph has changed since.
+        """
+        version, view = key
+        if version != self.graph.version:
+            return False
+        positions, levels, radii = result
+        if view is None:
+            self._positions, self.levels, self.radii = positions, levels, radii
+            self.version = version
+        else:
+            self.view_positions[view.key] = (view, positions)
+            self.view_positions.move_to_end(view.key)
+            if len(self.view_positions) > self.max_views:
+                self.view_positions.popitem(last=False)
+        return True
+
+    def update(self, names):
+        """
+        Re-lay out only the level rings that hold, or held, the given Gu, after a
+        single graph.update(names). The other rings keep their positions so the
+        view does not jump; each re-laid ring is still placed against the higher
+        levels, as in calculate_positions(). Falls back to a full layout on the
+        next read if the layout missed any other graph change, or if the edit
+        changed a ring's track count and so moved the rings outside it.
+        """
+        if self.version is None or self.version != self.graph.version - 1:
+            return
+        objects = self.graph.objects
+        affected = set()
+        for name in names:
+            old_level = self.levels.pop(name, None)
+            if old_level is not None:
+                affected.add(old_level)
+            if name in objects:
+                level = objects[name].get("level", 1)
+                self.levels[name] = level
+                affected.add(level)
+
+        grouped_objects = group_by_level(objects)
+        radii = ring_radii(grouped_objects, objects)
+        if any(radii.get(level) != self.radii.get(level) for level in set(radii) | set(self.radii)
+               if level not in affected):
+            return
+
+        # A new dict, so caches keyed on the positions object are refreshed.
+        positions = {name: pos for name, pos in self._positions.items()
+                     if name in self.levels and self.levels[name] not in affected}
+        relationships = self.graph.related
+        for level in sorted(affected, reverse=True):
+            ring = grouped_objects.get(level)
+            if not ring:
+                continue
+            placed = {name: pos for name, pos in positions.items() if self.levels[name] > level}
+            radius, tracks = radii[level]
+            positions.update(place_ring(ring, radius, relationships, placed, self.center_x, self.center_y, tracks))
+        self._positions = positions
+        self.radii = radii
+        self.version = self.graph.version
+
+class FusionLineCache:
+    """
+    Bounded LRU cache of fusion-line views.
+    Each entry holds the element tree from get_fusion_line_elements() and the
+    positions from calculate_fusion_line_positions(), keyed by the selected Gu,
+    the graph version and the filtered view (if any), so stale entries are never
+    returned after a mutation. With a view set, Gu outside it are left out of
+    every level of the line.
+
+    The render loop looks up the shown line every frame, so stats() counts a
+    hit or miss only for the first lookup of each new key (a change of
+    selection, filter or graph version), not for every repeated lookup.
+    """
+    def __init__(self, graph, center_x=CENTER_X, center_y=CENTER_Y, max_entries=16):
+        self.graph = graph
+        self.center_x = center_x
+        self.center_y = center_y
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.last_key = None   # Key of the previous lookup, so repeats are not counted
+        self.view = None
+
+    def set_view(self, view):
+        self.view = view
+
+    def get(self, selected_gu):
+        """
+        Return (elements, positions) for the fusion line of selected_gu.
+        """
+        entry = self.cached(selected_gu)
+        if entry is None:
+            entry = self.compute(selected_gu, self.view)
+            self.store(self.key(selected_gu), entry)
+        return entry
+
+    def key(self, selected_gu):
+        view = self.view
+        return (selected_gu, self.graph.version, view.key if view is not None else None)
+
+    def cached(self, selected_gu):
+        """
+        Return the cached (elements, positions) of selected_gu, or None. Never computes.
+        """
+        key = self.key(selected_gu)
+        entry = self.entries.get(key)
+        if key != self.last_key:
+            self.last_key = key
+            if entry is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def compute(self, selected_gu, view=None, cancelled=None):
+        """
+        Build (elements, positions) for the fusion line of selected_gu, keeping
+        only the Gu of `view`. Changes nothing, so it can run on a worker thread.
+        """
+        elements = get_fusion_line_elements(self.graph.objects, selected_gu, self.graph)
+        if view is not None:
+            for level, names in elements.items():
+                if level != 0:
+                    elements[level] = [name for name in names if name in view]
+        positions = calculate_fusion_line_positions(elements, self.center_x, self.center_y, self.graph, cancelled)
+        return elements, positions
+
+    def store(self, key, entry):
+        """
+        Cache a compute() result made for `key`. Returns False (and stores
+        nothing) if the graph has changed since.
+        """
+        version = self.graph.version
+        if key[1] != version:
+            return False
+        # Entries from an older graph version can never be hit again.
+        for stale_key in [k for k in self.entries if k[1] != version]:
+            del self.entries[stale_key]
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return True
+
+    def positions(self, selected_gu):
+        return self.get(selected_gu)[1]
+
+    def update(self, names):
+        """
+        Carry cached fusion lines over to the graph version after
+        graph.update(names), dropping only the lines that contain one of those
+        Gu or one of their neighbours (whose line the edit may have joined).
+        Filtered lines are always dropped, since the edit may change the filter's Gu.
+        """
+        touched = set(names)
+        for name in names:
+            touched |= self.graph.related.get(name, set())
+        version = self.graph.version
+        for key in list(self.entries):
+            entry = self.entries.pop(key)
+            if key[1] == version - 1 and key[2] is None and touched.isdisjoint(entry[1]):
+                self.entries[(key[0], version, None)] = entry
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.entries)}
@@ -0,0 +1,247 @@
+import heapq
+from collections import OrderedDict, deque
+
+from gu_graph import UNKNOWN_INGREDIENT
+
+# -------------------------------
+# PATH COSTS
+# -------------------------------
+STEP_COST = 1.0      # Cost of one fusion step, on top of its extra ingredients
+UNKNOWN_COST = 5.0   # Default cost of a "???" ingredient, so known recipes are preferred
+
+def default_ingredient_cost(name):
+    return UNKNOWN_COST if name == UNKNOWN_INGREDIENT else 1.0
+
+class FusionPath:
+    """
+    One way to get from a Gu to another: the Gu fused along the way, the total
+    cost, and for each step the extra ingredients needed besides the previous Gu.
+    """
+    __slots__ = ("names", "cost", "extras")
+
+    def __init__(self, names, cost, extras):
+        self.names = names
+        self.cost = cost
+        self.extras = extras   # extras[i]: ingredients for names[i + 1] other than names[i]
+
+    def __repr__(self):
+        return "FusionPath(%r, cost=%r)" % (self.names, self.cost)
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def edges(self):
+        return list(zip(self.names, self.names[1:]))
+
+    def ingredients(self):
+        """
+        Return {name: count} of every extra ingredient the whole path needs.
+        """
+        totals = {}
+        for step in self.extras:
+            for name in step:
+                totals[name] = totals.get(name, 0) + 1
+        return totals
+
+# -------------------------------
+# PATH FINDER
+# -------------------------------
+class PathFinder:
+    """
+    Fusion path queries over the graph index: fewest steps (BFS), cheapest
+    (Dijkstra) and the k cheapest alternatives (Yen's algorithm).
+
+    An edge a -> b means a is an ingredient of b or lists b in its "fusions".
+    Its cost is STEP_COST plus ingredient_cost() of every other ingredient in
+    b's recipe. Each source's BFS and Dijkstra trees are computed once over
+    the whole reachable graph and kept in an LRU, so repeated queries from the
+    same Gu only walk the parent links. Everything is dropped when the graph
+    version changes.
+    """
+    def __init__(self, graph, ingredient_cost=default_ingredient_cost, directed=True, max_sources=32):
+        self.graph = graph
+        self.ingredient_cost = ingredient_cost
+        self.directed = directed
+        self.max_sources = max_sources
+        self.version = None
+        self._successors = {}
+        self._recipe_costs = {}
+        self._trees = OrderedDict()
+        self._k_paths = OrderedDict()
+
+    def _sync(self):
+        if self.version != self.graph.version:
+            self._successors.clear()
+            self._recipe_costs.clear()
+            self._trees.clear()
+            self._k_paths.clear()
+            self.version = self.graph.version
+
+    def successors(self, name):
+        """
+        Return [(successor, step cost), ...], computed once per Gu and graph version.
+        """
+        successors = self._successors.get(name)
+        if successors is None:
+            graph = self.graph
+            if self.directed:
+                names = list(graph.used_in.get(name, ()))
+                names += sorted(graph.fusions.get(name, set()).difference(names))
+            else:
+                names = sorted(graph.related.get(name, ()))
+            successors = self._successors[name] = [(successor, self.step_cost(name, successor)) for successor in names]
+        return successors
+
+    def extras(self, ingredient, product):
+        """
+        Ingredients of `product` other than one `ingredient`.
+        """
+        data = self.graph.objects.get(product)
+        recipe = list(data.get("recipe", [])) if data is not None else []
+        if ingredient in recipe:
+            recipe.remove(ingredient)
+        return recipe
+
+    def step_cost(self, ingredient, product):
+        # The whole recipe's cost is computed once per product; the step saves one `ingredient`.
+        recipe_cost = self._recipe_costs.get(product)
+        if recipe_cost is None:
+            data = self.graph.objects.get(product)
+            recipe = data.get("recipe", []) if data is not None else []
+            recipe_cost = self._recipe_costs[product] = sum(self.ingredient_cost(name) for name in recipe)
+        if ingredient in self.graph.recipe.get(product, ()):
+            recipe_cost -= self.ingredient_cost(ingredient)
+        return STEP_COST + recipe_cost
+
+    def _remember(self, cache, key, value):
+        cache[key] = value
+        if len(cache) > self.max_sources:
+            cache.popitem(last=False)
+        return value
+
+    def _path(self, names, cost):
+        return FusionPath(names, cost, [self.extras(a, b) for a, b in zip(names, names[1:])])
+
+    # --- Trees ---
+    def _bfs_tree(self, source):
+        parents = {source: None}
+        queue = deque([source])
+        while queue:
+            name = queue.popleft()
+            for successor, _ in self.successors(name):
+                if successor not in parents:
+                    parents[successor] = name
+                    queue.append(successor)
+        return parents, None
+
+    def _dijkstra(self, source, target=None, blocked_nodes=(), blocked_edges=()):
+        """
+        Dijkstra from source. Returns (parents, costs); stops early once target is settled.
+        """
+        costs = {source: 0.0}
+        parents = {source: None}
+        heap = [(0.0, 0, source)]
+        counter = 1
+        infinity = float("inf")
+        while heap:
+            cost, _, name = heapq.heappop(heap)
+            if cost > costs[name]:
+                continue  # A stale heap entry; name was already settled cheaper.
+            if name == target:
+                break
+            for successor, step_cost in self.successors(name):
+                if blocked_nodes and successor in blocked_nodes:
+                    continue
+                if blocked_edges and (name, successor) in blocked_edges:
+                    continue
+                new_cost = cost + step_cost
+                if new_cost < costs.get(successor, infinity):
+                    costs[successor] = new_cost
+                    parents[successor] = name
+                    heapq.heappush(heap, (new_cost, counter, successor))
+                    counter += 1
+        return parents, costs
+
+    def _tree(self, kind, source):
+        self._sync()
+        key = (kind, source)
+        tree = self._trees.get(key)
+        if tree is not None:
+            self._trees.move_to_end(key)
+            return tree
+        tree = self._bfs_tree(source) if kind == "bfs" else self._dijkstra(source)
+        return self._remember(self._trees, key, tree)
+
+    @staticmethod
+    def _walk_back(parents, target):
+        if target not in parents:
+            return None
+        names = []
+        while target is not None:
+            names.append(target)
+            target = parents[target]
+        names.reverse()
+        return names
+
+    # --- Queries ---
+    def shortest_path(self, source, target):
+        """
+        Path with the fewest fusion steps, or None if target is unreachable.
+        """
+        parents, _ = self._tree("bfs", source)
+        names = self._walk_back(parents, target)
+        if names is None:
+            return None
+        return self._path(names, sum(self.step_cost(a, b) for a, b in zip(names, names[1:])))
+
+    def cheapest_path(self, source, target):
+        """
+        Path with the lowest total cost, or None if target is unreachable.
+        """
+        parents, costs = self._tree("dijkstra", source)
+        names = self._walk_back(parents, target)
+        if names is None:
+            return None
+        return self._path(names, costs[target])
+
+    def k_cheapest_paths(self, source, target, k=3):
+        """
+        Up to k loop-free paths from source to target, cheapest first.
+        """
+        self._sync()
+        key = (source, target, k)
+        paths = self._k_paths.get(key)
+        if paths is not None:
+            self._k_paths.move_to_end(key)
+            return paths
+
+        first = self.cheapest_path(source, target)
+        paths = [first] if first is not None else []
+        candidates = []
+        seen = {tuple(first.names)} if first is not None else set()
+        counter = 0
+        while paths and len(paths) < k:
+            previous = paths[-1].names
+            for i in range(len(previous) - 1):
+                spur, root = previous[i], previous[:i + 1]
+                # Block the next edge of every accepted path sharing this root,
+                # and the root itself, so the spur path is a new, loop-free detour.
+                blocked_edges = {(path.names[i], path.names[i + 1]) for path in paths
+                                 if path.names[:i + 1] == root and len(path.names) > i + 1}
+                parents, costs = self._dijkstra(spur, target, set(root[:-1]), blocked_edges)
+                spur_names = self._walk_back(parents, target)
+                if spur_names is None:
+                    continue
+                names = root[:-1] + spur_names
+                if tuple(names) in seen:
+                    continue
+                seen.add(tuple(names))
+                cost = sum(self.step_cost(a, b) for a, b in zip(root, root[1:])) + costs[target]
+                heapq.heappush(candidates, (cost, counter, names))
+                counter += 1
+            if not candidates:
+                break
+            cost, _, names = heapq.heappop(candidates)
+            paths.append(self._path(names, cost))
+        return self._remember(self._k_paths, key, paths)
@@ -0,0 +1,168 @@
+from gu_graph import UNKNOWN_INGREDIENT
+
+# -------------------------------
+# RECIPE RESOLUTION
+# -------------------------------
+class Resolution:
+    """
+    Everything needed to craft one Gu from scratch, with quantities.
+
+      - base:    Gu with no recipe of their own (the level-1 Gu) -> count.
+      - raw:     materials that are not Gu, such as "Spicy Wine" -> count.
+      - unknown: number of "???" slots met along the way; each one hides
+                 ingredients nobody knows yet, so the totals are a lower bound.
+      - cycles:  Gu left unexpanded because their recipe leads back to themselves.
+
+    Resolutions are shared by the resolver's cache; treat them as read-only.
+    """
+    __slots__ = ("name", "base", "raw", "unknown", "cycles")
+
+    def __init__(self, name=None, base=None, raw=None, unknown=0, cycles=frozenset()):
+        self.name = name
+        self.base = base if base is not None else {}
+        self.raw = raw if raw is not None else {}
+        self.unknown = unknown
+        self.cycles = cycles
+
+    def __repr__(self):
+        return "Resolution(%r, base=%r, raw=%r, unknown=%r)" % (self.name, self.base, self.raw, self.unknown)
+
+    @property
+    def complete(self):
+        """
+        True if the recipe is fully known down to base Gu and raw materials.
+        """
+        return self.unknown == 0 and not self.cycles
+
+    def add(self, other, count=1):
+        """
+        Add `count` copies of another resolution into this one.
+        """
+        for target, source in ((self.base, other.base), (self.raw, other.raw)):
+            for name, quantity in source.items():
+                target[name] = target.get(name, 0) + quantity * count
+        self.unknown += other.unknown * count
+        if other.cycles:
+            self.cycles = self.cycles | other.cycles
+
+class RecipeResolver:
+    """
+    Expands Gu into base Gu and raw materials, memoized per Gu.
+    Each Gu's recipe is read once and its Resolution built from the cached
+    resolutions of its ingredients, so after warm-up a query is a dict lookup
+    and resolve_all() walks every recipe exactly once. The cache is dropped
+    when the graph version changes; after graph.update(names), update(names)
+    drops only the entries that depend on those Gu.
+    """
+    def __init__(self, graph):
+        self.graph = graph
+        self.version = graph.version
+        self.cache = {}
+
+    def _recipe(self, name):
+        data = self.graph.objects.get(name)
+        return data.get("recipe", []) if data is not None else []
+
+    def _sync(self):
+        if self.version != self.graph.version:
+            self.cache.clear()
+            self.version = self.graph.version
+
+    def update(self, names):
+        """
+        Drop cached resolutions of the given Gu and of every Gu made from them,
+        after a single graph.update(names).
+        """
+        if self.version != self.graph.version - 1:
+            self._sync()
+            return
+        for name in names:
+            # A removed Gu has left graph.used_in; the Gu still naming it are in graph.missing.
+            for start in [name, *self.graph.missing.get(name, ())]:
+                self.cache.pop(start, None)
+                for level in self.graph.product_levels(start):
+                    for product in level:
+                        self.cache.pop(product, None)
+        self.version = self.graph.version
+
+    def resolve(self, name):
+        """
+        Return the Resolution of Gu `name`. A name that is not a Gu resolves to itself as a raw material.
+        """
+        self._sync()
+        resolution = self.cache.get(name)
+        if resolution is not None:
+            return resolution
+        objects = self.graph.objects
+        if name not in objects:
+            return Resolution(name, raw={name: 1})
+        if not self._recipe(name):
+            # A Gu without a recipe is its own base ingredient.
+            resolution = self.cache[name] = Resolution(name, base={name: 1})
+            return resolution
+
+        # Iterative post-order walk, so long recipe chains cannot hit the recursion limit.
+        # Resolutions that cut a cycle depend on where the walk started, so they are
+        # kept for this query only.
+        uncached = {}
+        on_path = set()
+        stack = [(name, False)]
+        while stack:
+            current, expanded = stack.pop()
+            if not expanded:
+                if current in self.cache or current in uncached:
+                    continue
+                on_path.add(current)
+                stack.append((current, True))
+                for ingredient in self._recipe(current):
+                    if (ingredient in objects and ingredient not in on_path
+                            and ingredient not in self.cache and self._recipe(ingredient)):
+                        stack.append((ingredient, False))
+                continue
+
+            on_path.discard(current)
+            resolution = Resolution(current)
+            for ingredient in self._recipe(current):
+                if ingredient == UNKNOWN_INGREDIENT:
+                    resolution.unknown += 1
+                elif ingredient not in objects:
+                    resolution.raw[ingredient] = resolution.raw.get(ingredient, 0) + 1
+                elif not self._recipe(ingredient):
+                    resolution.base[ingredient] = resolution.base.get(ingredient, 0) + 1
+                else:
+                    known = self.cache.get(ingredient) or uncached.get(ingredient)
+                    if known is None:
+                        # The ingredient is still being expanded higher up: a cycle.
+                        resolution.base[ingredient] = resolution.base.get(ingredient, 0) + 1
+                        resolution.cycles = resolution.cycles | {ingredient}
+                    else:
+                        resolution.add(known)
+            if resolution.cycles:
+                uncached[current] = resolution
+            else:
+                self.cache[current] = resolution
+
+        return self.cache.get(name) or uncached[name]
+
+    def resolve_all(self, names=None):
+        """
+        Return {name: Resolution} for the given Gu, or for the whole catalog.
+        """
+        if names is None:
+            names = self.graph.objects
+        return {name: self.resolve(name) for name in names}
+
+    def requirements(self, wanted):
+        """
+        Total base Gu and raw materials for a shopping list: a {name: count} dict
+        or an iterable of names (one of each).
+        """
+        if not hasattr(wanted, "items"):
+            counts = {}
+            for name in wanted:
+                counts[name] = counts.get(name, 0) + 1
+            wanted = counts
+        total = Resolution()
+        for name, count in wanted.items():
+            total.add(self.resolve(name), count)
+        return total
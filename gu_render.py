@@ -0,0 +1,207 @@
+import argparse
+import os
+import re
+import sys
+from multiprocessing import Pool
+from xml.sax.saxutils import escape
+
+# Render off-screen: no window is ever opened, even on machines without a display.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+import pygame
+
+import main as viewer  # Box, arrow and colour drawing shared with the interactive viewer
+from gu_catalog import GuCatalog
+from gu_graph import GuGraph
+from gu_ingest import iter_records
+from gu_layout import calculate_positions, get_fusion_line_elements, calculate_fusion_line_positions
+from gu_snapshot import load_snapshot
+
+# -------------------------------
+# EXPORT SETTINGS
+# -------------------------------
+RENDER_MARGIN = 40         # Empty border around the drawn Gu (in pixels)
+MAX_IMAGE_SIDE = 8192      # Larger views are scaled down so one image stays within memory
+TASKS_PER_WORKER = 200     # Worker processes are replaced after this many images
+FORMATS = ("png", "svg")
+
+# -------------------------------
+# CATALOG LOADING
+# -------------------------------
+def load_objects(catalog_paths=()):
+    """
+    Return the Gu database: the given JSONL/CSV/JSON catalogs, or the gu_data.py
+    snapshot when no paths are given. Invalid catalog records are reported and skipped.
+    """
+    if not catalog_paths:
+        snapshot = load_snapshot()
+        return GuCatalog.from_snapshot(snapshot)
+    objects = GuCatalog()
+    for path in catalog_paths:
+        errors = []
+        for key, data in iter_records(path, errors):
+            objects.upsert(key, data)
+        for error in errors:
+            print(f"Skipped catalog record: {error}", file=sys.stderr)
+    return objects
+
+def unique_filenames(names):
+    """
+    Map each Gu name to a file-system safe stem, numbering stems that collide.
+    """
+    stems = {}
+    used = set()
+    for name in names:
+        stem = re.sub(r"[^A-Za-z0-9._-]+", "_", name).strip("._") or "gu"
+        candidate = stem
+        counter = 2
+        while candidate.lower() in used:
+            candidate = "%s_%d" % (stem, counter)
+            counter += 1
+        used.add(candidate.lower())
+        stems[name] = candidate
+    return stems
+
+# -------------------------------
+# FRAMING AND DRAWING
+# -------------------------------
+def fit_view(object_positions, scale):
+    """
+    Return (scale, offset_x, offset_y, (width, height)) so every Gu box of
+    object_positions is drawn inside the image with RENDER_MARGIN around it.
+    The scale is reduced when the image would be larger than MAX_IMAGE_SIDE.
+    """
+    if not object_positions:
+        return scale, 0, 0, (2 * RENDER_MARGIN, 2 * RENDER_MARGIN)
+    for _ in range(2):
+        screen_positions = viewer.camera.screen_positions(object_positions, scale, 0, 0)
+        rects = [viewer.calculate_box_rect(*screen_positions[name], name, scale) for name in object_positions]
+        bounds = rects[0].unionall(rects[1:])
+        side = max(bounds.width, bounds.height) + 2 * RENDER_MARGIN
+        if side <= MAX_IMAGE_SIDE:
+            break
+        scale *= MAX_IMAGE_SIDE / side
+    # Boxes never shrink below the minimum font size, so clip whatever still overflows.
+    size = (min(bounds.width + 2 * RENDER_MARGIN, MAX_IMAGE_SIDE),
+            min(bounds.height + 2 * RENDER_MARGIN, MAX_IMAGE_SIDE))
+    return scale, RENDER_MARGIN - bounds.left, RENDER_MARGIN - bounds.top, size
+
+def render_png(path, objects, graph, object_positions, scale):
+    scale, offset_x, offset_y, size = fit_view(object_positions, scale)
+    surface = pygame.Surface(size)
+    surface.fill(viewer.BG_COLOR)
+    viewer.draw_graph(surface, objects, object_positions, offset_x, offset_y, scale, graph)
+    pygame.image.save(surface, path)
+
+def render_svg(path, objects, graph, object_positions, scale):
+    """
+    Write the same picture as render_png() as vector shapes: one line and head
+    per recipe arrow, one rounded rect and one text element per word per Gu.
+    """
+    scale, offset_x, offset_y, (width, height) = fit_view(object_positions, scale)
+    text_cache = viewer.text_cache
+    font_size = text_cache.font_size(scale)
+    ascent = text_cache.font(font_size).get_ascent()
+    arrow_color = "rgb(240,240,240)"
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<svg xmlns="http://www.w3.org/2000/svg" width="%d" height="%d" viewBox="0 0 %d %d">\n'
+                % (width, height, width, height))
+        f.write('<rect width="100%%" height="100%%" fill="rgb%s"/>\n' % (viewer.BG_COLOR,))
+
+        batch = viewer.edge_cache.get(graph, object_positions, scale)
+        f.write('<g stroke="%s" stroke-width="%d" fill="%s">\n' % (arrow_color, max(1, int(2 * scale)), arrow_color))
+        for start, end, point1, point2 in batch.translated(offset_x, offset_y):
+            f.write('<line x1="%.1f" y1="%.1f" x2="%.1f" y2="%.1f"/>' % (start + end))
+            f.write('<polygon stroke="none" points="%.1f,%.1f %.1f,%.1f %.1f,%.1f"/>\n' % (end + point1 + point2))
+        f.write('</g>\n')
+
+        # pygame's default font is FreeSansBold, drawn at 0.6875 of the requested size.
+        f.write('<g font-family="FreeSans, Arial, sans-serif" font-weight="bold" font-size="%.1f" fill="black">\n'
+                % (font_size * 0.6875))
+        screen_positions = viewer.camera.screen_positions(object_positions, scale, offset_x, offset_y)
+        for name in object_positions:
+            box_rect = viewer.calculate_box_rect(*screen_positions[name], name, scale)
+            f.write('<rect x="%d" y="%d" width="%d" height="%d" rx="%d" fill="rgb%s"/>'
+                    % (box_rect.x, box_rect.y, box_rect.width, box_rect.height, int(10 * scale),
+                       tuple(viewer.gu_rgb(objects, name))))
+            label = text_cache.label(name, scale)
+            for word, (surface, (dx, dy)) in zip(name.split(), label.lines):
+                f.write('<text x="%.1f" y="%d" text-anchor="middle">%s</text>'
+                        % (box_rect.x + dx + surface.get_width() / 2, box_rect.y + dy + ascent, escape(word)))
+            f.write('\n')
+        f.write('</g>\n</svg>\n')
+
+RENDERERS = {"png": render_png, "svg": render_svg}
+
+# -------------------------------
+# WORKERS
+# -------------------------------
+_worker = {}  # Per-process catalog, graph and overview layout, set up by _init_worker()
+
+def _init_worker(catalog_paths, out_dir, fmt, scale):
+    pygame.font.init()
+    objects = load_objects(catalog_paths)
+    _worker.update(objects=objects, graph=GuGraph(objects), out_dir=out_dir, fmt=fmt, scale=scale)
+
+def render_task(task):
+    """
+    Render one image: (None, stem) is the ring overview, (name, stem) the fusion
+    line of Gu `name`. Returns the written path.
+    """
+    name, stem = task
+    objects, graph = _worker["objects"], _worker["graph"]
+    if name is None:
+        object_positions = calculate_positions(objects, graph, viewer.center_x, viewer.center_y)
+    else:
+        elements = get_fusion_line_elements(objects, name, graph)
+        object_positions = calculate_fusion_line_positions(elements, viewer.center_x, viewer.center_y, graph)
+    path = os.path.join(_worker["out_dir"], "%s.%s" % (stem, _worker["fmt"]))
+    RENDERERS[_worker["fmt"]](path, objects, graph, object_positions, _worker["scale"])
+    return path
+
+def export(catalog_paths=(), out_dir="renders", fmt="png", scale=1.0, jobs=None, overview=True):
+    """
+    Render the ring overview and the fusion line of every Gu into out_dir.
+    Images are rendered by a pool of `jobs` worker processes (in this process
+    when jobs is 1); each worker writes its own files and only returns the
+    path, and workers are recycled every TASKS_PER_WORKER images, so memory
+    stays flat however many Gu are exported. Returns the number of images.
+    """
+    if fmt not in RENDERERS:
+        raise ValueError("unsupported format: %s" % fmt)
+    names = list(load_objects(catalog_paths))
+    os.makedirs(os.path.join(out_dir, "fusion_lines"), exist_ok=True)
+    stems = unique_filenames(names)
+    tasks = [(name, os.path.join("fusion_lines", stems[name])) for name in names]
+    if overview:
+        tasks.insert(0, (None, "overview"))
+
+    initargs = (tuple(catalog_paths), out_dir, fmt, scale)
+    jobs = jobs or os.cpu_count() or 1
+    count = 0
+    if jobs == 1:
+        _init_worker(*initargs)
+        for task in tasks:
+            render_task(task)
+            count += 1
+    else:
+        with Pool(jobs, _init_worker, initargs, maxtasksperchild=TASKS_PER_WORKER) as pool:
+            for _ in pool.imap_unordered(render_task, tasks, chunksize=8):
+                count += 1
+    return count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render the Gu overview and every fusion line to image files.")
+    parser.add_argument("catalogs", nargs="*", help="JSONL/CSV/JSON catalogs (default: gu_data.py)")
+    parser.add_argument("-o", "--out", default="renders", help="output directory")
+    parser.add_argument("-f", "--format", choices=FORMATS, default="png")
+    parser.add_argument("-s", "--scale", type=float, default=1.0, help="zoom level to render at")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--no-overview", action="store_true", help="only render fusion lines")
+    args = parser.parse_args(argv)
+    count = export(args.catalogs, args.out, args.format, args.scale, args.jobs, not args.no_overview)
+    print(f"Rendered {count} images to {args.out}")
+
+if __name__ == "__main__":
+    main()
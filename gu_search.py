@@ -0,0 +1,189 @@
+import heapq
+import re
+from collections import Counter
+from itertools import chain, islice
+
+SEARCH_FIELDS = ("name", "effect", "affinity", "family")
+TOKEN = re.compile(r"\w+")
+MIN_FUZZY_SCORE = 0.4  # Share of the query's trigrams a fuzzy match must contain
+RANK_LIMIT = 500       # Broad queries only rank this many name hits, so typing stays sub-millisecond
+
+def tokenize(text):
+    return TOKEN.findall(text.lower())
+
+def trigrams(text):
+    """
+    Trigrams of each word, padded so word starts and ends count (" mo", "moo", ..., "on ").
+    """
+    grams = set()
+    for token in tokenize(text):
+        padded = " " + token + " "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+# -------------------------------
+# PREFIX TRIE
+# -------------------------------
+class PrefixTrie:
+    """
+    Prefix trie over word tokens, stored flat: each trie node is keyed by its
+    path (the prefix itself) and keeps the Gu whose tokens pass through it, so
+    a prefix lookup is a single dict access, independent of catalog size.
+    """
+    def __init__(self):
+        self.nodes = {}   # prefix -> {Gu name: number of its tokens with that prefix}
+
+    def add(self, token, name):
+        nodes = self.nodes
+        for end in range(1, len(token) + 1):
+            names = nodes.get(token[:end])
+            if names is None:
+                names = nodes[token[:end]] = {}
+            names[name] = names.get(name, 0) + 1
+
+    def remove(self, token, name):
+        nodes = self.nodes
+        for end in range(1, len(token) + 1):
+            names = nodes.get(token[:end])
+            if names is None or name not in names:
+                continue
+            if names[name] > 1:
+                names[name] -= 1
+            else:
+                del names[name]
+                if not names:
+                    del nodes[token[:end]]
+
+    def names_with_prefix(self, prefix):
+        return self.nodes.get(prefix, {})
+
+# -------------------------------
+# SEARCH INDEX
+# -------------------------------
+class SearchIndex:
+    """
+    Search-as-you-type over the name, effect, affinity and family of every Gu.
+
+    Each query word must be the prefix of a word in one of those fields (trie
+    lookups, intersected). If nothing matches, trigram overlap gives fuzzy,
+    typo-tolerant results. Matches in the name rank above matches in the other
+    fields. After graph.update(names), update(names) re-indexes just those Gu;
+    any other graph change rebuilds the index on the next search.
+    """
+    def __init__(self, graph):
+        self.graph = graph
+        self.version = None
+        self.rebuild()
+
+    def rebuild(self):
+        self.name_trie = PrefixTrie()
+        self.field_trie = PrefixTrie()
+        self.trigram_index = {}   # trigram -> set of Gu names
+        self.entries = {}         # Gu name -> (name tokens, other field tokens, trigrams)
+        for name in self.graph.objects:
+            self._add(name)
+        self.version = self.graph.version
+
+    def _fields(self, name):
+        data = self.graph.objects[name]
+        name_text = " ".join((name, data.get("name") or ""))
+        other_text = " ".join(data.get(field) or "" for field in SEARCH_FIELDS[1:])
+        return name_text, other_text
+
+    def _add(self, name):
+        name_text, other_text = self._fields(name)
+        name_tokens = set(tokenize(name_text))
+        other_tokens = set(tokenize(other_text))
+        grams = trigrams(name_text) | trigrams(other_text)
+        for token in name_tokens:
+            self.name_trie.add(token, name)
+        for token in other_tokens:
+            self.field_trie.add(token, name)
+        for gram in grams:
+            self.trigram_index.setdefault(gram, set()).add(name)
+        self.entries[name] = (name_tokens, other_tokens, grams)
+
+    def _remove(self, name):
+        entry = self.entries.pop(name, None)
+        if entry is None:
+            return
+        name_tokens, other_tokens, grams = entry
+        for token in name_tokens:
+            self.name_trie.remove(token, name)
+        for token in other_tokens:
+            self.field_trie.remove(token, name)
+        for gram in grams:
+            names = self.trigram_index.get(gram)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del self.trigram_index[gram]
+
+    def update(self, names):
+        """
+        Re-index the given Gu after a single graph.update(names).
+        """
+        if self.version != self.graph.version - 1:
+            self.rebuild()
+            return
+        for name in names:
+            self._remove(name)
+            if name in self.graph.objects:
+                self._add(name)
+        self.version = self.graph.version
+
+    def search(self, query, limit=10):
+        """
+        Return up to `limit` (name, field) pairs, best first; field is "name"
+        for name matches, "details" for effect/affinity/family matches and
+        "fuzzy" for trigram matches.
+        """
+        if self.version != self.graph.version:
+            self.rebuild()
+        words = tokenize(query)
+        if not words:
+            return []
+
+        query_text = query.strip().lower()
+        def rank(name):
+            # Exact name, then names starting with the query, then shorter names.
+            lower = name.lower()
+            return (lower != query_text, not lower.startswith(query_text), len(name), name)
+
+        # Gu with a name word starting with every query word.
+        in_name = sorted((self.name_trie.names_with_prefix(word) for word in words), key=len)
+        name_hits = in_name[0].keys()
+        for names in in_name[1:]:
+            name_hits = name_hits & names.keys()
+        candidates = list(islice(name_hits, RANK_LIMIT))
+        exact = query.strip()
+        if exact in name_hits and exact not in candidates:
+            candidates.append(exact)
+        results = [(name, "name") for name in heapq.nsmallest(limit, candidates, key=rank)]
+
+        # Then Gu matching every word in any field, in catalog order.
+        if len(results) < limit:
+            in_any = sorted(((self.name_trie.names_with_prefix(word), self.field_trie.names_with_prefix(word))
+                             for word in words), key=lambda pair: len(pair[0]) + len(pair[1]))
+            first_names, first_fields = in_any[0]
+            seen = set()
+            for name in chain(first_names, first_fields):
+                if name in seen or name in name_hits:
+                    continue
+                seen.add(name)
+                if all(name in names or name in fields for names, fields in in_any[1:]):
+                    results.append((name, "details"))
+                    if len(results) >= limit:
+                        break
+        if results:
+            return results
+
+        # No prefix matches: fall back to trigram overlap, which tolerates typos.
+        grams = trigrams(query)
+        scores = Counter()
+        for gram in grams:
+            scores.update(self.trigram_index.get(gram, ()))
+        threshold = MIN_FUZZY_SCORE * len(grams)
+        best = [(name, score) for name, score in scores.most_common(4 * limit) if score >= threshold]
+        best.sort(key=lambda item: (-item[1], len(item[0]), item[0]))
+        return [(name, "fuzzy") for name, _ in best[:limit]]
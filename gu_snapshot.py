@@ -0,0 +1,257 @@
+import hashlib
+import mmap
+import os
+import runpy
+import struct
+import sys
+from array import array
+
+# -------------------------------
+# SNAPSHOT FORMAT
+# -------------------------------
+# A snapshot is a compact, memory-mappable copy of the Gu database:
+#
+#   header          magic, format version, byte order, SHA-256 of the source file, counts
+#   string_offsets  uint32[strings + 1]  offsets into the string blob
+#   display_name    int32[gu]            string id of the "name" field
+#   color           uint32[gu]           0xRRGGBB, or NO_COLOR if missing
+#   level           int32[gu]
+#   effect          int32[gu]            string ids (MISSING if absent)
+#   affinity        int32[gu]
+#   family          int32[gu]
+#   recipe_indptr   uint32[gu + 1]       CSR adjacency: recipe of Gu i is
+#   recipe_indices  uint32[recipe_nnz]   recipe_indices[recipe_indptr[i]:recipe_indptr[i + 1]]
+#   fusion_indptr   uint32[gu + 1]
+#   fusion_indices  uint32[fusion_nnz]
+#   strings         utf-8 blob
+#
+# Every string is interned once. The Gu keys are interned first, so Gu i has
+# string id i; ids >= gu_count are raw materials ("Spicy Wine"), "???", unknown
+# fusion targets and free text. Recipes keep duplicates so quantities survive.
+MAGIC = b"GUSNAP01"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sII32sIIIII")
+MISSING = -1
+NO_COLOR = 0xFFFFFFFF
+DEFAULT_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gu_data.py")
+
+def source_digest(source_path):
+    with open(source_path, "rb") as f:
+        return hashlib.sha256(f.read()).digest()
+
+def parse_color(hex_color):
+    if not hex_color:
+        return NO_COLOR
+    return int(hex_color.lstrip('#')[:6], 16)
+
+# -------------------------------
+# COMPILER
+# -------------------------------
+def compile_snapshot(objects, snapshot_path, digest=b"\0" * 32):
+    """
+    Write `objects` to snapshot_path in the binary format above.
+    The file is written next to its destination and renamed into place, so a
+    reader never sees a half-written snapshot.
+    """
+    strings = []
+    string_ids = {}
+
+    def intern(text):
+        string_id = string_ids.get(text)
+        if string_id is None:
+            string_id = len(strings)
+            string_ids[text] = string_id
+            strings.append(text)
+        return string_id
+
+    def optional(data, field):
+        value = data.get(field)
+        return MISSING if value is None else intern(value)
+
+    for name in objects:
+        intern(name)
+
+    display_name, color, level = array('i'), array('I'), array('i')
+    effect, affinity, family = array('i'), array('i'), array('i')
+    recipe_indptr, recipe_indices = array('I', [0]), array('I')
+    fusion_indptr, fusion_indices = array('I', [0]), array('I')
+    for name, data in objects.items():
+        display_name.append(intern(data.get("name", name)))
+        color.append(parse_color(data.get("color")))
+        level.append(data.get("level", 1))
+        effect.append(optional(data, "effect"))
+        affinity.append(optional(data, "affinity"))
+        family.append(optional(data, "family"))
+        recipe_indices.extend(intern(ingredient) for ingredient in data.get("recipe", []))
+        recipe_indptr.append(len(recipe_indices))
+        fusion_indices.extend(intern(fusion) for fusion in data.get("fusions", []))
+        fusion_indptr.append(len(fusion_indices))
+
+    blob = bytearray()
+    string_offsets = array('I', [0])
+    for text in strings:
+        blob += text.encode("utf-8")
+        string_offsets.append(len(blob))
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, sys.byteorder == "little", digest,
+                         len(objects), len(strings), len(recipe_indices), len(fusion_indices), len(blob))
+    tmp_path = snapshot_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        for column in (string_offsets, display_name, color, level, effect, affinity, family,
+                       recipe_indptr, recipe_indices, fusion_indptr, fusion_indices):
+            f.write(column.tobytes())
+        f.write(blob)
+    os.replace(tmp_path, snapshot_path)
+
+# -------------------------------
+# MEMORY-MAPPED READER
+# -------------------------------
+class Snapshot:
+    """
+    Read-only view of a snapshot file. The file is memory-mapped and every column
+    is a memoryview into the mapping, so opening it costs no parsing and the
+    columns are only paged in when read. Raises ValueError for files that are not
+    a compatible snapshot.
+    """
+    def __init__(self, snapshot_path):
+        with open(snapshot_path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._open()
+        except (ValueError, TypeError, struct.error):
+            self.close()
+            raise
+
+    def _open(self):
+        # The columns are slices of `buf`; releasing it leaves them valid but
+        # frees the mapping for close() if validation fails part way.
+        with memoryview(self._mmap) as buf:
+            self._read_columns(buf)
+
+    def _read_columns(self, buf):
+        if len(buf) < HEADER.size:
+            raise ValueError("truncated snapshot")
+        (magic, fmt, little_endian, self.digest, self.gu_count, self.string_count,
+         recipe_nnz, fusion_nnz, blob_size) = HEADER.unpack_from(buf)
+        if magic != MAGIC or fmt != FORMAT_VERSION or bool(little_endian) != (sys.byteorder == "little"):
+            raise ValueError("incompatible snapshot")
+
+        offset = HEADER.size
+        def column(typecode, count):
+            nonlocal offset
+            size = count * 4
+            if offset + size > len(buf):
+                raise ValueError("truncated snapshot")
+            view = buf[offset:offset + size].cast(typecode)
+            offset += size
+            return view
+
+        n = self.gu_count
+        self.string_offsets = column('I', self.string_count + 1)
+        self.display_name = column('i', n)
+        self.color = column('I', n)
+        self.level = column('i', n)
+        self.effect = column('i', n)
+        self.affinity = column('i', n)
+        self.family = column('i', n)
+        self.recipe_indptr = column('I', n + 1)
+        self.recipe_indices = column('I', recipe_nnz)
+        self.fusion_indptr = column('I', n + 1)
+        self.fusion_indices = column('I', fusion_nnz)
+        if offset + blob_size != len(buf):
+            raise ValueError("truncated snapshot")
+        self.strings = buf[offset:offset + blob_size]
+        self._ids = None
+
+    def close(self):
+        for name in ("string_offsets", "display_name", "color", "level", "effect", "affinity",
+                     "family", "recipe_indptr", "recipe_indices", "fusion_indptr", "fusion_indices",
+                     "strings"):
+            view = self.__dict__.pop(name, None)
+            if view is not None:
+                view.release()
+        self._mmap.close()
+
+    def __len__(self):
+        return self.gu_count
+
+    def string(self, string_id):
+        if string_id == MISSING:
+            return None
+        return str(self.strings[self.string_offsets[string_id]:self.string_offsets[string_id + 1]], "utf-8")
+
+    def all_strings(self, count=None):
+        """
+        Decode the first `count` strings (all by default) at once, as a list
+        indexed by string id. all_strings(len(snapshot)) gives the Gu names.
+        """
+        if count is None:
+            count = self.string_count
+        offsets = self.string_offsets[:count + 1].tolist()
+        blob = bytes(self.strings[:offsets[-1]])
+        return [str(blob[start:end], "utf-8") for start, end in zip(offsets, offsets[1:])]
+
+    def name(self, gu_id):
+        return self.string(gu_id)
+
+    def id_of(self, name):
+        """
+        Return the Gu id for a key, or None. The name -> id table is built on first use.
+        """
+        if self._ids is None:
+            self._ids = {self.string(i): i for i in range(self.gu_count)}
+        return self._ids.get(name)
+
+    def recipe_ids(self, gu_id):
+        return self.recipe_indices[self.recipe_indptr[gu_id]:self.recipe_indptr[gu_id + 1]]
+
+    def fusion_ids(self, gu_id):
+        return self.fusion_indices[self.fusion_indptr[gu_id]:self.fusion_indptr[gu_id + 1]]
+
+    def record(self, gu_id):
+        """
+        Rebuild the dict entry for Gu gu_id, in the same shape as gu_data.objects.
+        """
+        data = {"name": self.string(self.display_name[gu_id])}
+        if self.color[gu_id] != NO_COLOR:
+            data["color"] = "#%06x" % self.color[gu_id]
+        data["level"] = self.level[gu_id]
+        if self.effect[gu_id] != MISSING:
+            data["effect"] = self.string(self.effect[gu_id])
+        data["recipe"] = [self.string(i) for i in self.recipe_ids(gu_id)]
+        data["fusions"] = [self.string(i) for i in self.fusion_ids(gu_id)]
+        if self.affinity[gu_id] != MISSING:
+            data["affinity"] = self.string(self.affinity[gu_id])
+        if self.family[gu_id] != MISSING:
+            data["family"] = self.string(self.family[gu_id])
+        return data
+
+    def to_objects(self):
+        return {self.name(i): self.record(i) for i in range(self.gu_count)}
+
+# -------------------------------
+# LOADER
+# -------------------------------
+def load_snapshot(source_path=DEFAULT_SOURCE, snapshot_path=None):
+    """
+    Open the snapshot for source_path (a Python file defining `objects`),
+    recompiling it first if it is missing, unreadable or was built from a
+    different version of the source. The source is only executed on a rebuild.
+    """
+    if snapshot_path is None:
+        snapshot_path = os.path.splitext(source_path)[0] + ".gusnap"
+    digest = source_digest(source_path)
+    if os.path.exists(snapshot_path):
+        try:
+            snapshot = Snapshot(snapshot_path)
+        except (OSError, ValueError):
+            snapshot = None
+        if snapshot is not None:
+            if snapshot.digest == digest:
+                return snapshot
+            snapshot.close()
+
+    objects = runpy.run_path(source_path)["objects"]
+    compile_snapshot(objects, snapshot_path, digest)
+    return Snapshot(snapshot_path)
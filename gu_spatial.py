@@ -0,0 +1,91 @@
+# -------------------------------
+# SPATIAL INDEX
+# -------------------------------
+class SpatialGrid:
+    """
+    Uniform grid over axis-aligned rectangles, used for click hit-testing and
+    marquee selection. Rectangles are (left, top, width, height) tuples (or
+    pygame.Rect objects) and are bucketed into every cell they overlap, so a
+    point query only looks at one cell and a rectangle query only at the cells
+    it covers.
+
+    Items can be inserted, moved and removed one at a time, so the grid can be
+    kept up to date incrementally instead of being rebuilt.
+    """
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self.rects = {}   # key -> (left, top, right, bottom)
+        self.order = {}   # key -> insertion counter; later items are drawn on top
+        self.cells = {}   # (cell_x, cell_y) -> set of keys
+        self._counter = 0
+
+    def __len__(self):
+        return len(self.rects)
+
+    def _cell_range(self, left, top, right, bottom):
+        size = self.cell_size
+        return (int(left // size), int(top // size), int(right // size), int(bottom // size))
+
+    def insert(self, key, rect):
+        if key in self.rects:
+            self.remove(key)
+        left, top, width, height = rect
+        bounds = (left, top, left + width, top + height)
+        self.rects[key] = bounds
+        self.order[key] = self._counter
+        self._counter += 1
+        x0, y0, x1, y1 = self._cell_range(*bounds)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                self.cells.setdefault((cx, cy), set()).add(key)
+
+    def remove(self, key):
+        bounds = self.rects.pop(key, None)
+        if bounds is None:
+            return
+        del self.order[key]
+        x0, y0, x1, y1 = self._cell_range(*bounds)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = self.cells.get((cx, cy))
+                if bucket:
+                    bucket.discard(key)
+                    if not bucket:
+                        del self.cells[(cx, cy)]
+
+    def clear(self):
+        self.rects.clear()
+        self.order.clear()
+        self.cells.clear()
+
+    def query_point(self, x, y):
+        """
+        Return the topmost key whose rectangle contains (x, y), or None.
+        """
+        size = self.cell_size
+        best = None
+        for key in self.cells.get((int(x // size), int(y // size)), ()):
+            left, top, right, bottom = self.rects[key]
+            if left <= x < right and top <= y < bottom:
+                if best is None or self.order[key] > self.order[best]:
+                    best = key
+        return best
+
+    def query_rect(self, rect):
+        """
+        Return every key whose rectangle intersects rect, in drawing order.
+        """
+        left, top, width, height = rect
+        q_right, q_bottom = left + width, top + height
+        found = set()
+        x0, y0, x1, y1 = self._cell_range(left, top, q_right, q_bottom)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                found.update(self.cells.get((cx, cy), ()))
+        hits = []
+        for key in found:
+            r_left, r_top, r_right, r_bottom = self.rects[key]
+            if r_left < q_right and left < r_right and r_top < q_bottom and top < r_bottom:
+                hits.append(key)
+        hits.sort(key=self.order.__getitem__)
+        return hits
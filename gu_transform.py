@@ -0,0 +1,123 @@
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; fall back to array('d') and plain loops.
+    np = None
+
+# -------------------------------
+# NODE POSITION ARRAYS
+# -------------------------------
+class NodeArray:
+    """
+    World-space positions of a layout packed into one contiguous buffer
+    (an (N, 2) float64 NumPy array, or a flat array('d') without NumPy),
+    with a name -> row index map.
+    """
+    def __init__(self, object_positions):
+        self.names = list(object_positions)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        coords = [c for pos in object_positions.values() for c in pos]
+        if np is not None:
+            self.world = np.array(coords, dtype=np.float64).reshape(-1, 2)
+        else:
+            self.world = array('d', coords)
+
+    def __len__(self):
+        return len(self.names)
+
+    def to_screen(self, center_x, center_y, scale, offset_x, offset_y):
+        """
+        Apply the camera transform to every node in one batch:
+        screen = center + (world - center) * scale + offset.
+        """
+        shift_x = center_x * (1 - scale) + offset_x
+        shift_y = center_y * (1 - scale) + offset_y
+        if np is not None:
+            screen = self.world * scale
+            screen[:, 0] += shift_x
+            screen[:, 1] += shift_y
+            xs = screen[:, 0].tolist()
+            ys = screen[:, 1].tolist()
+        else:
+            world = self.world
+            screen = None
+            xs = [x * scale + shift_x for x in world[0::2]]
+            ys = [y * scale + shift_y for y in world[1::2]]
+        return ScreenPositions(self.names, self.index, xs, ys, screen)
+
+class ScreenPositions:
+    """
+    Read-only, dict-like view of transformed node positions (name -> (x, y)).
+    `array` is the same positions as an (N, 2) NumPy array, when available.
+    """
+    __slots__ = ("names", "index", "xs", "ys", "array")
+
+    def __init__(self, names, index, xs, ys, array=None):
+        self.names = names
+        self.index = index
+        self.xs = xs
+        self.ys = ys
+        self.array = array
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __getitem__(self, name):
+        i = self.index[name]
+        return self.xs[i], self.ys[i]
+
+    def get(self, name, default=None):
+        i = self.index.get(name)
+        if i is None:
+            return default
+        return self.xs[i], self.ys[i]
+
+    def items(self):
+        return zip(self.names, zip(self.xs, self.ys))
+
+    def inside(self, left, top, right, bottom):
+        """
+        Names whose position lies in the rectangle, in layout order.
+        """
+        if self.array is not None:
+            x, y = self.array[:, 0], self.array[:, 1]
+            names = self.names
+            return [names[i] for i in np.flatnonzero((x >= left) & (x < right) & (y >= top) & (y < bottom)).tolist()]
+        return [name for name, x, y in zip(self.names, self.xs, self.ys)
+                if left <= x < right and top <= y < bottom]
+
+# -------------------------------
+# CAMERA TRANSFORM
+# -------------------------------
+class CameraTransform:
+    """
+    Shared world-to-screen transform.
+    The NodeArray is rebuilt only when a different positions dict is passed in,
+    and the last few transformed results are kept, so every consumer in a frame
+    (box rects, arrows, drawing, hit-testing) reads the same batch.
+    """
+    def __init__(self, center_x, center_y, max_results=4):
+        self.center_x = center_x
+        self.center_y = center_y
+        self.max_results = max_results
+        self.positions = None
+        self.nodes = None
+        self.results = {}
+
+    def screen_positions(self, object_positions, scale, offset_x, offset_y):
+        if object_positions is not self.positions:
+            self.positions = object_positions
+            self.nodes = NodeArray(object_positions)
+            self.results = {}
+        key = (scale, offset_x, offset_y)
+        result = self.results.get(key)
+        if result is None:
+            if len(self.results) >= self.max_results:
+                del self.results[next(iter(self.results))]
+            result = self.nodes.to_screen(self.center_x, self.center_y, scale, offset_x, offset_y)
+            self.results[key] = result
+        return result
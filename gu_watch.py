@@ -0,0 +1,137 @@
+import os
+import queue
+import runpy
+import threading
+
+from gu_ingest import iter_records
+
+# -------------------------------
+# CATALOG DIFFS
+# -------------------------------
+class CatalogDiff:
+    """
+    Gu added, changed or removed between two reads of a catalog file.
+    added/changed map keys to their new data; removed is a list of keys.
+    errors holds records skipped as invalid, or the reason the file could
+    not be read at all.
+    """
+    __slots__ = ("path", "added", "changed", "removed", "errors")
+
+    def __init__(self, path, added=None, changed=None, removed=None, errors=None):
+        self.path = path
+        self.added = added or {}
+        self.changed = changed or {}
+        self.removed = removed or []
+        self.errors = errors or []
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed)
+
+    @property
+    def names(self):
+        return list(self.added) + list(self.changed) + list(self.removed)
+
+def read_catalog(path, errors=None):
+    """
+    Read a whole catalog into {key: data}: a Python file defining `objects`
+    (like gu_data.py) or a .jsonl/.csv/.json file read through gu_ingest.
+    """
+    if path.endswith(".py"):
+        return dict(runpy.run_path(path)["objects"])
+    return dict(iter_records(path, errors))
+
+def diff_catalogs(path, old, new):
+    added = {key: data for key, data in new.items() if key not in old}
+    changed = {key: data for key, data in new.items() if key in old and old[key] != data}
+    removed = [key for key in old if key not in new]
+    return CatalogDiff(path, added, changed, removed)
+
+def apply_diff(objects, graph, diff):
+    """
+    Apply a CatalogDiff to `objects` (a dict or GuCatalog) and re-index only
+    the Gu it names in the graph.
+    """
+    upsert = getattr(objects, "upsert", None)
+    remove = getattr(objects, "remove", None)
+    for key in diff.removed:
+        if key in objects:
+            if remove is not None:
+                remove(key)
+            else:
+                del objects[key]
+    for key, data in list(diff.added.items()) + list(diff.changed.items()):
+        if upsert is not None:
+            upsert(key, data)
+        else:
+            objects[key] = data
+    graph.update(diff.names)
+
+# -------------------------------
+# FILE WATCHER
+# -------------------------------
+class CatalogWatcher:
+    """
+    Polls a catalog file from a background thread and queues a CatalogDiff
+    each time its contents change. Reading, parsing and diffing all happen on
+    that thread; the render loop only calls poll() and applies the (usually
+    tiny) diffs with apply_diff(). The first read is the baseline, so the
+    file as it was at start-up produces no diff.
+    """
+    def __init__(self, path, interval=1.0):
+        self.path = path
+        self.interval = interval
+        self._diffs = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="gu-watch", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def poll(self):
+        """
+        Return the diffs queued since the last call, oldest first, without blocking.
+        """
+        diffs = []
+        while True:
+            try:
+                diffs.append(self._diffs.get_nowait())
+            except queue.Empty:
+                return diffs
+
+    def _signature(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read(self):
+        errors = []
+        try:
+            return read_catalog(self.path, errors), errors
+        except Exception as e:  # A half-saved or broken file; wait for the next save.
+            return None, [e]
+
+    def _run(self):
+        signature = self._signature()
+        current, _ = self._read()
+        if current is None:
+            current = {}
+        while not self._stop.wait(self.interval):
+            new_signature = self._signature()
+            if new_signature is None or new_signature == signature:
+                continue
+            signature = new_signature
+            new, errors = self._read()
+            if new is None:
+                self._diffs.put(CatalogDiff(self.path, errors=errors))
+                continue
+            diff = diff_catalogs(self.path, current, new)
+            diff.errors = errors
+            current = new
+            if diff or errors:
+                self._diffs.put(diff)
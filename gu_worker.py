@@ -0,0 +1,94 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from gu_layered import LayoutCancelled
+
+LAYOUT_WORKERS = 2  # A ring and a fusion-line layout can run side by side
+
+# -------------------------------
+# LAYOUT JOBS
+# -------------------------------
+class LayoutJob:
+    """
+    One background layout: the target it is for, the cache key and graph
+    version it was started with, and its future. cancel() drops it if it is
+    still queued and otherwise makes it stop at its next cancellation check.
+    """
+    __slots__ = ("target", "key", "version", "future", "_cancel")
+
+    def __init__(self, target, key, version):
+        self.target = target
+        self.key = key
+        self.version = version
+        self.future = None
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+        self.future.cancel()
+
+    def cancelled(self):
+        return self._cancel.is_set()
+
+class LayoutWorker:
+    """
+    Runs layout computations (GuLayout.compute(), FusionLineCache.compute())
+    on a thread pool, so the render loop never waits for them.
+
+    Each job is for a target such as ("ring", view key) or ("fusion", name),
+    with at most one job per target. Submitting a job for a new target cancels
+    all others, e.g. when another Gu is picked before its line is laid out.
+    A job is not cancelled because the graph changed while it ran, so while a
+    catalog streams in, every finished layout is still shown before the next
+    one starts. Finished jobs are handed back by poll() on the caller's thread,
+    the only one that touches the layout caches.
+    """
+    def __init__(self, max_workers=LAYOUT_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix="gu-layout")
+        self.jobs = {}  # target -> LayoutJob
+
+    def busy(self, target=None):
+        """
+        True if a job for target (or any job, if target is None) is still pending.
+        """
+        return bool(self.jobs) if target is None else target in self.jobs
+
+    def submit(self, target, key, version, function, *args):
+        """
+        Start function(*args, cancelled=...) in the background for target and
+        cancel the jobs of every other target. `key` is what the caller needs
+        to store the result, `version` the graph version it is computed from.
+        If a job for target is already pending, it is kept and returned instead.
+        """
+        for other in [other for other in self.jobs if other != target]:
+            self.jobs.pop(other).cancel()
+        job = self.jobs.get(target)
+        if job is None:
+            job = self.jobs[target] = LayoutJob(target, key, version)
+            job.future = self.executor.submit(function, *args, cancelled=job.cancelled)
+        return job
+
+    def cancel(self):
+        for job in self.jobs.values():
+            job.cancel()
+        self.jobs.clear()
+
+    def poll(self):
+        """
+        Return the jobs finished since the last call as (job, result, error)
+        triples, without blocking; error is the exception the job raised, if any.
+        """
+        finished = []
+        for target, job in list(self.jobs.items()):
+            if not job.future.done():
+                continue
+            del self.jobs[target]
+            error = job.future.exception()
+            if isinstance(error, LayoutCancelled):
+                continue
+            finished.append((job, None if error else job.future.result(), error))
+        return finished
+
+    def shutdown(self):
+        self.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
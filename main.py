@@ -2,32 +2,35 @@ import pygame
 import math
 import sys
 import pygame.gfxdraw
-from collections import defaultdict
-from gu_data import objects  # Import the Gu database
-
-# Override radius values based on desired distances:
-distance_mapping = {4: 100, 3: 220, 2: 340, 1: 460}
-for obj in objects.values():
-    level = obj.get("level", 1)
-    obj["radius"] = distance_mapping.get(level, obj.get("radius", 0))
+from collections import OrderedDict
+from gu_snapshot import load_snapshot, DEFAULT_SOURCE  # Compiled copy of the Gu database in gu_data.py
+from gu_catalog import GuCatalog
+from gu_graph import GuGraph
+from gu_ingest import CatalogLoader
+from gu_watch import CatalogWatcher, apply_diff
+from gu_layout import GuLayout, FusionLineCache
+from gu_spatial import SpatialGrid
+from gu_transform import CameraTransform
+from gu_edges import ArrowBatch, EdgeBundles
+from gu_paths import PathFinder
+from gu_search import SearchIndex
+from gu_filters import FacetIndex, FacetFilter
+from gu_worker import LayoutWorker
 
 # Helper function: convert hex color to RGB tuple.
 def hex_to_rgb(hex_color):
     hex_color = hex_color.lstrip('#')
     return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
 
-# Initialize Pygame and font module.
-pygame.init()
-pygame.font.init()
-
 # -------------------------------
 # DISPLAY SETTINGS (Enhanced Resolution & Colors)
 # -------------------------------
 display_width = 1280    # Increased width for higher resolution
 display_height = 720    # Increased height for higher resolution
-screen = pygame.display.set_mode((display_width, display_height))
+screen = None           # Created by create_app(), never at import time
 center_x = display_width // 2
 center_y = display_height // 2
+camera = CameraTransform(center_x, center_y)  # Batched world-to-screen transform shared by all consumers.
 
 # Define Colors.
 BG_COLOR = (30, 30, 30)           # A muted dark gray background
@@ -36,467 +39,951 @@ WHITE = (255, 255, 255)
 WINDOW_COLOR = (50, 50, 50)
 TEXT_COLOR = (240, 240, 240)
 FRAME_COLOR = (190, 190, 190)
+PATH_COLOR = (255, 200, 40)       # Highlighted fusion path
+HINT_COLOR = (150, 150, 150)      # Secondary text, e.g. where a search result matched
 display_width = 1280   # or your chosen width
 display_height = 720   # or your chosen height
 
 FUSION_LINE_MODE = False  # Track if we're in fusion line view
 DOUBLE_CLICK_TIME = 300   # Maximum time between clicks for double click (in milliseconds)
-VERTICAL_SPACING = 150    # Vertical space between Gu levels in fusion line view
-HORIZONTAL_SPACING = 200  # Horizontal space between Gu in the same level
-
-def get_fusion_line_elements(objects, selected_gu):
-    """
-    Get all Gu related to the selected one in the fusion hierarchy.
-    Returns a dict with levels (negative for ingredients, positive for products).
-    """
-    elements = defaultdict(list)
-    elements[0] = [selected_gu]  # Center level
-
-    # Get ingredients (upward)
-    def add_ingredients(gu_name, level):
-        if gu_name in objects:
-            recipe = objects[gu_name].get("recipe", [])
-            ingredients = [ing for ing in recipe if ing != "???" and ing in objects]
-            if ingredients:
-                elements[level].extend(ingredients)
-                for ing in ingredients:
-                    add_ingredients(ing, level - 1)
-
-    # Get products (downward)
-    def add_products(gu_name, level):
-        products = []
-        for name, data in objects.items():
-            if gu_name in data.get("recipe", []):
-                products.append(name)
-        if products:
-            elements[level].extend(products)
-            for prod in products:
-                add_products(prod, level + 1)
-
-    add_ingredients(selected_gu, -1)
-    add_products(selected_gu, 1)
-    return elements
-
-def calculate_fusion_line_positions(elements, center_x, center_y):
-    """
-    Calculate positions for Gu in fusion view.
-    This version groups duplicate Gu (so if an ingredient is used in multiple fusions,
-    it appears only once) and uses a reduced horizontal spacing so that items are
-    positioned closer to the selected Gu.
-    """
-    positions = {}
-    for level, gu_list in elements.items():
-        if not gu_list:
-            continue
+IDLE_WAIT_TIME = 100      # How long an idle frame blocks waiting for input (in milliseconds)
+OVERVIEW_SETTLE_TIME = 250  # How long the zoom must stay unchanged before the overview is cached (in milliseconds)
+OVERVIEW_CACHE_BYTES = 64 * 1024 * 1024  # Memory budget for cached overview textures
+SEARCH_RESULTS = 8        # Results listed under the search box
+NODE_ANIMATION_TIME = 400  # How long Gu glide to their places in a new layout (in milliseconds)
+MAX_ANIMATED_GU = 5000     # Larger layouts are swapped in without animation
+
+# Level of detail (LOD): how much of each Gu is drawn, from far out to close in.
+LOD_DOTS = 0      # A coloured dot, no text
+LOD_LABELS = 1    # A one-line box with the abbreviated name
+LOD_BOXES = 2     # The full box, one word of the name per line
+LOD_DOT_SCALE = 0.65       # Zoomed out further than this, Gu are drawn as dots
+LOD_LABEL_SCALE = 0.95     # Zoomed out further than this, Gu get abbreviated labels
+MAX_VISIBLE_BOXES = 300    # With more Gu on screen, abbreviated labels are drawn instead of boxes
+MAX_VISIBLE_LABELS = 1500  # With more Gu on screen, dots are drawn instead of labels
+SHORT_LABEL_CHARS = 14     # Longest abbreviated label
+HIT_AREA_SCREENS = 1       # Box rects are kept for this many screens around the viewport
+HIT_BOX_REACH = 200        # Furthest a Gu box reaches from its centre at zoom 1 (in pixels)
+LABEL_ARROW_SIZE = 8       # Arrow head size between abbreviated labels
+BUNDLE_CELL_SIZE = 32      # Far out, arrows between the same two screen cells are drawn as one line
+MAX_BUNDLE_WIDTH = 6
+BUNDLE_COLOR = (140, 140, 140)
+
+# -------------------------------
+# TEXT CACHE
+# -------------------------------
+def abbreviate(name, max_chars=SHORT_LABEL_CHARS):
+    """
+    One-line short form of a Gu name: the trailing "Gu" is dropped, whole words
+    are kept while they fit in max_chars and the first word that does not fit
+    is cut to its initial ("Seven Fragrances Liquor Worm Gu" -> "Seven F.").
+    """
+    words = name.split()
+    if len(words) > 1 and words[-1] == "Gu":
+        words.pop()
+    short = ""
+    for word in words:
+        if len(short) + len(word) + bool(short) > max_chars:
+            return short + " " + word[0] + "." if short else word[:max_chars - 1] + "."
+        short = short + " " + word if short else word
+    return short
+
+class GuLabel:
+    """
+    Pre-rendered name label of a Gu at one zoom level: the box size it needs and
+    one rendered surface per word, with each word's offset from the box's top-left.
+    """
+    __slots__ = ("width", "height", "lines")
 
-        # Remove duplicates while preserving order.
-        unique_gu = []
-        for gu in gu_list:
-            if gu not in unique_gu:
-                unique_gu.append(gu)
-        
-        n = len(unique_gu)
-        # Vertical position remains based on level:
-        y = center_y + (level * VERTICAL_SPACING)
-        
-        # If only one unique Gu, center it.
-        if n == 1:
-            positions[unique_gu[0]] = (center_x, y)
+    def __init__(self, width, height, lines):
+        self.width = width
+        self.height = height
+        self.lines = lines
+
+class TextCache:
+    """
+    Caches fonts by size and Gu name labels by (name, quantized scale, short).
+    Scale is snapped to `scale_step` so zooming between min_scale and max_scale
+    only ever produces a handful of distinct labels per Gu, and the least recently
+    used labels are evicted once `max_labels` is reached. Box sizes are also
+    cached on their own, measured without rendering and evicted the same way
+    past `max_sizes`, so sizing many boxes (hit rects, arrow tips) does not
+    evict the labels on screen.
+    """
+    def __init__(self, max_labels=2048, scale_step=0.05, max_sizes=262144):
+        self.max_labels = max_labels
+        self.scale_step = scale_step
+        self.max_sizes = max_sizes
+        self.fonts = {}
+        self.labels = OrderedDict()
+        self.sizes = OrderedDict()
+
+    def font(self, size):
+        font = self.fonts.get(size)
+        if font is None:
+            font = pygame.font.Font(None, size)
+            self.fonts[size] = font
+        return font
+
+    def quantize(self, scale):
+        return round(round(scale / self.scale_step) * self.scale_step, 4)
+
+    def font_size(self, scale):
+        return max(int(24 * self.quantize(scale)), 12)
+
+    def box_size(self, name, scale, short=False):
+        """
+        (width, height) of the box label() draws, from font metrics alone.
+        """
+        key = (name, self.quantize(scale), short)
+        size = self.sizes.get(key)
+        if size is not None:
+            self.sizes.move_to_end(key)
         else:
-            # Use a reduced horizontal spacing in fusion view.
-            effective_spacing = HORIZONTAL_SPACING * 0.8  # 80% of normal spacing
-            total_width = (n - 1) * effective_spacing
-            start_x = center_x - (total_width / 2)
-            for i, gu in enumerate(unique_gu):
-                x = start_x + i * effective_spacing
-                positions[gu] = (x, y)
-    return positions
+            scale = key[1]
+            padding = 5 * scale
+            font = self.font(self.font_size(scale))
+            words = [abbreviate(name)] if short else name.split()
+            word_sizes = [font.size(word) for word in words]
+            max_line_width = max((width for width, _ in word_sizes), default=0)
+            total_text_height = sum(height for _, height in word_sizes)
+            size = (int(max(60 * scale, max_line_width + 2 * padding)), int(total_text_height + 2 * padding))
+            self.sizes[key] = size
+            if len(self.sizes) > self.max_sizes:
+                self.sizes.popitem(last=False)
+        return size
+
+    def label(self, name, scale, short=False):
+        """
+        The full label, one word per line, or with short=True the abbreviated
+        one-line label of the mid-range zoom levels.
+        """
+        key = (name, self.quantize(scale), short)
+        label = self.labels.get(key)
+        if label is not None:
+            self.labels.move_to_end(key)
+            return label
+
+        scale = key[1]
+        padding = 5 * scale
+        font = self.font(self.font_size(scale))
+        words = [abbreviate(name)] if short else name.split()
+        surfaces = [font.render(word, True, BLACK) for word in words]
+        max_line_width = max((surface.get_width() for surface in surfaces), default=0)
+        total_text_height = sum(surface.get_height() for surface in surfaces)
+
+        box_width = int(max(60 * scale, max_line_width + 2 * padding))
+        box_height = int(total_text_height + 2 * padding)
+
+        lines = []
+        current_y = padding
+        for surface in surfaces:
+            lines.append((surface, ((box_width - surface.get_width()) // 2, int(current_y))))
+            current_y += font.get_height()
+
+        label = GuLabel(box_width, box_height, lines)
+        self.labels[key] = label
+        if len(self.labels) > self.max_labels:
+            self.labels.popitem(last=False)
+        return label
+
+text_cache = TextCache()
 
 # -------------------------------
 # BOX DRAWING AND RECTANGLE CALCULATION
 # -------------------------------
-def draw_square(screen, x, y, color, name, scale):
+def detail_level(scale, visible_count):
+    """
+    LOD tier for drawing visible_count Gu at this zoom: the lower of the tier
+    the zoom asks for and the tier the number of Gu on screen allows.
+    """
+    if scale < LOD_DOT_SCALE or visible_count > MAX_VISIBLE_LABELS:
+        return LOD_DOTS
+    if scale < LOD_LABEL_SCALE or visible_count > MAX_VISIBLE_BOXES:
+        return LOD_LABELS
+    return LOD_BOXES
+
+def dot_radius(scale):
+    return max(2, int(8 * scale))
+
+class DotSprites:
+    """
+    One small pre-drawn dot surface per (colour, radius), so the dots of a whole
+    frame are drawn by a single Surface.blits() call.
+    """
+    def __init__(self, max_sprites=4096):
+        self.max_sprites = max_sprites
+        self.sprites = {}
+
+    def get(self, color, radius):
+        key = (tuple(color), radius)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            if len(self.sprites) >= self.max_sprites:
+                self.sprites.clear()
+            sprite = pygame.Surface((2 * radius + 1, 2 * radius + 1), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, color, (radius, radius), radius)
+            self.sprites[key] = sprite
+        return sprite
+
+dot_sprites = DotSprites()
+
+def draw_square(screen, x, y, color, name, scale, lod=LOD_BOXES):
     """
     Draw a box (Gu) with the given color and name at (x,y) and return its rectangle.
-    The box is drawn with slightly rounded corners.
-    """
-    padding = 5 * scale
-    font_size = max(int(24 * scale), 12)
-    font = pygame.font.Font(None, font_size)
-    lines = name.split()
-    max_line_width = 0
-    total_text_height = 0
-    for line in lines:
-        line_width, line_height = font.size(line)
-        max_line_width = max(max_line_width, line_width)
-        total_text_height += line_height
-
-    box_width = max(60 * scale, max_line_width + 2 * padding)
-    box_height = total_text_height + 2 * padding
-
-    box_rect = pygame.Rect(0, 0, box_width, box_height)
-    box_rect.center = (x, y)
+    The box is drawn with slightly rounded corners; `lod` picks a full box, an
+    abbreviated one-line label or just a dot.
+    """
+    box_rect = calculate_box_rect(x, y, name, scale, lod)
+    if lod == LOD_DOTS:
+        screen.blit(dot_sprites.get(color, box_rect.width // 2), box_rect)
+        return box_rect
+
+    label = text_cache.label(name, scale, lod == LOD_LABELS)
     # Draw rectangle with rounded corners.
     pygame.draw.rect(screen, color, box_rect, border_radius=int(10 * scale))
 
-    current_y = box_rect.top + padding
-    for line in lines:
-        text_surface = font.render(line, True, BLACK)
-        text_rect = text_surface.get_rect(centerx=box_rect.centerx, top=current_y)
-        screen.blit(text_surface, text_rect)
-        current_y += font.get_height()
+    left, top = box_rect.topleft
+    screen.blits([(surface, (left + dx, top + dy)) for surface, (dx, dy) in label.lines], doreturn=False)
 
     return box_rect  # Return the rectangle for collision detection
 
-def calculate_box_rect(x, y, name, scale):
+def calculate_box_rect(x, y, name, scale, lod=LOD_BOXES):
     """
     Calculate and return the rectangle for a Gu box (using the same geometry as draw_square)
     without drawing it. This is used for arrow positioning.
     """
-    padding = 5 * scale
-    font_size = max(int(24 * scale), 12)
-    font = pygame.font.Font(None, font_size)
-    lines = name.split()
-    max_line_width = 0
-    total_text_height = 0
-    for line in lines:
-        line_width, line_height = font.size(line)
-        max_line_width = max(max_line_width, line_width)
-        total_text_height += line_height
-
-    box_width = max(60 * scale, max_line_width + 2 * padding)
-    box_height = total_text_height + 2 * padding
-
-    box_rect = pygame.Rect(0, 0, box_width, box_height)
+    if lod == LOD_DOTS:
+        radius = dot_radius(scale)
+        return pygame.Rect(int(x) - radius, int(y) - radius, 2 * radius + 1, 2 * radius + 1)
+    box_rect = pygame.Rect((0, 0), text_cache.box_size(name, scale, lod == LOD_LABELS))
     box_rect.center = (x, y)
     return box_rect
 
+def draw_dots(surface, objects, names, screen_positions, scale):
+    """
+    Draw the given Gu as dots in one batched blit and return their rects by name.
+    """
+    radius = dot_radius(scale)
+    size = 2 * radius + 1
+    sprite = dot_sprites.get
+    gu_boxes = {}
+    blits = []
+    for name in names:
+        x, y = screen_positions[name]
+        box_rect = gu_boxes[name] = pygame.Rect(int(x) - radius, int(y) - radius, size, size)
+        blits.append((sprite(gu_rgb(objects, name), radius), box_rect))
+    surface.blits(blits, doreturn=False)
+    return gu_boxes
+
 # -------------------------------
-# POSITION CALCULATION
+# APPLICATION SETUP
 # -------------------------------
-def calculate_positions(objects):
-    # First, group objects by level
-    grouped_objects = {}
-    for name, data in objects.items():
-        level = data.get("level", 1)
-        grouped_objects.setdefault(level, []).append(name)
-
-    # Build relationship graph
-    relationships = {}
-    for name, data in objects.items():
-        relationships[name] = set()
-        # Add recipe relationships
-        for ingredient in data.get("recipe", []):
-            if ingredient != "???" and ingredient in objects:
-                relationships[name].add(ingredient)
-                relationships.setdefault(ingredient, set()).add(name)
-        # Add fusion relationships
-        for fusion in data.get("fusions", []):
-            if fusion in objects:
-                relationships[name].add(fusion)
-                relationships.setdefault(fusion, set()).add(name)
-
-    object_positions = {}
-
-    # Process each level
-    for level, names in sorted(grouped_objects.items(), reverse=True):
-        radius = objects[names[0]].get("radius", 0)
-        count = len(names)
-
-        if count == 1:
-            # Single object at this level - place at top
-            x = center_x
-            y = center_y - radius
-            object_positions[names[0]] = (x, y)
-        else:
-            # Sort objects based on their relationships
-            def get_relationship_score(name):
-                score = 0
-                related = relationships.get(name, set())
-                for rel in related:
-                    if rel in object_positions:  # If related object is already placed
-                        score += 1
-                return score
-
-            # Sort names by relationship score
-            sorted_names = sorted(names, key=get_relationship_score, reverse=True)
-
-            # Calculate positions around the circle
-            angle_step = 360 / count
-            best_start_angle = -90  # Default start from top
-
-            # Try different starting angles to find best arrangement
-            if count > 2:
-                min_distance = 0
-                for test_angle in range(-90, 270, 45):
-                    total_distance = 0
-                    test_positions = {}
-                    # Calculate test positions
-                    for i, name in enumerate(sorted_names):
-                        angle = test_angle + i * angle_step
-                        angle_rad = math.radians(angle)
-                        x = center_x + radius * math.cos(angle_rad)
-                        y = center_y + radius * math.sin(angle_rad)
-                        test_positions[name] = (x, y)
-                    # Calculate total distance to related objects
-                    for name, pos in test_positions.items():
-                        for related in relationships.get(name, set()):
-                            if related in object_positions:
-                                rel_pos = object_positions[related]
-                                dist = math.hypot(pos[0] - rel_pos[0], pos[1] - rel_pos[1])
-                                total_distance += dist
-                    # Update best angle if this arrangement is better
-                    if min_distance == 0 or total_distance < min_distance:
-                        min_distance = total_distance
-                        best_start_angle = test_angle
-
-            # Place objects using best starting angle
-            for i, name in enumerate(sorted_names):
-                angle = best_start_angle + i * angle_step
-                angle_rad = math.radians(angle)
-                x = center_x + radius * math.cos(angle_rad)
-                y = center_y + radius * math.sin(angle_rad)
-                object_positions[name] = (x, y)
-
-    return object_positions
+graph = None  # Recipe index shared by layout, fusion-line and arrow code; built by create_app().
+
+def create_app(gu_objects=None):
+    """
+    Application factory: initialize pygame, the font module and the window, and
+    build the graph index for the Gu database. Importing this module does none of
+    this, so the layout and graph code can be reused without opening a window.
+    Without gu_objects, the database is read from the gu_data.py snapshot, which
+    is only recompiled when gu_data.py changes.
+    Returns (screen, graph).
+    """
+    global screen, graph
+    pygame.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((display_width, display_height))
+    if gu_objects is None:
+        snapshot = load_snapshot()
+        gu_objects = GuCatalog.from_snapshot(snapshot)
+    graph = GuGraph(gu_objects)
+    return screen, graph
 
 # -------------------------------
 # ARROW CALCULATION AND DRAWING
 # -------------------------------
-def calculate_arrow_points(start_x, start_y, end_x, end_y, box_width, box_height):
+class EdgeCache:
     """
-    Calculate points for drawing an arrow from one Gu to another so that
-    the arrow tip touches the target box edge.
+    Arrow geometry for the recipe edges of one layout at one zoom level.
+    Edges come deduplicated from the graph index and are computed in a single
+    ArrowBatch (an EdgeBundles for the dot tier); panning is a pure translation
+    of that batch, so it is only recomputed when the positions, graph version,
+    scale or LOD tier change.
     """
-    # Calculate the angle between start and end points.
-    angle = math.atan2(end_y - start_y, end_x - start_x)
-
-    # Compute half-dimensions of the target box.
-    half_width = box_width / 2
-    half_height = box_height / 2
-
-    # Determine the intersection with the box edge.
-    if abs(math.cos(angle)) * half_height > abs(math.sin(angle)) * half_width:
-        # Intersects with left/right edge.
-        if end_x > start_x:
-            actual_end_x = end_x - half_width
-        else:
-            actual_end_x = end_x + half_width
-        actual_end_y = start_y + (actual_end_x - start_x) * math.tan(angle)
-    else:
-        # Intersects with top/bottom edge.
-        if end_y > start_y:
-            actual_end_y = end_y - half_height
+    def __init__(self):
+        self.positions = None
+        self.key = None
+        self.batch = None
+
+    def get(self, graph, object_positions, scale, edges=None, lod=LOD_BOXES):
+        """
+        `edges` is a pre-filtered edge list (e.g. FilteredView.edges); by default
+        every recipe edge in the graph is considered.
+        """
+        key = (graph.version, scale, lod)
+        if object_positions is self.positions and key == self.key:
+            return self.batch
+
+        origin = camera.screen_positions(object_positions, scale, 0, 0)
+        starts, ends, box_sizes = [], [], []
+        for ingredient, product in (graph.edges() if edges is None else edges):
+            if ingredient in object_positions and product in object_positions:
+                starts.append(origin[ingredient])
+                ends.append(origin[product])
+                if lod != LOD_DOTS:
+                    box_sizes.append(text_cache.box_size(product, scale, lod == LOD_LABELS))
+        if lod == LOD_DOTS:
+            # Bundled on the unpanned screen grid, so panning still only translates them.
+            self.batch = EdgeBundles(starts, ends, BUNDLE_CELL_SIZE)
+        elif lod == LOD_LABELS:
+            self.batch = ArrowBatch(starts, ends, box_sizes, LABEL_ARROW_SIZE)
         else:
-            actual_end_y = end_y + half_height
-        actual_end_x = start_x + (actual_end_y - start_y) / math.tan(angle) if math.tan(angle) != 0 else end_x
+            self.batch = ArrowBatch(starts, ends, box_sizes)
+        self.positions = object_positions
+        self.key = key
+        return self.batch
 
-    # Arrow head parameters.
-    arrow_size = 15
-    arrow_angle = math.pi / 6  # 30 degrees.
+edge_cache = EdgeCache()
 
-    # Calculate arrow head points.
-    point1_x = actual_end_x - arrow_size * math.cos(angle - arrow_angle)
-    point1_y = actual_end_y - arrow_size * math.sin(angle - arrow_angle)
-    point2_x = actual_end_x - arrow_size * math.cos(angle + arrow_angle)
-    point2_y = actual_end_y - arrow_size * math.sin(angle + arrow_angle)
-
-    return (start_x, start_y), (actual_end_x, actual_end_y), (point1_x, point1_y), (point2_x, point2_y)
-
-def draw_arrows(screen, objects, object_positions, camera_offset_x, camera_offset_y, scale, gu_boxes):
+def draw_arrows(screen, objects, object_positions, camera_offset_x, camera_offset_y, scale, graph=None, lod=LOD_BOXES):
     """
     Draw arrows between related Gu objects so that the arrow tip meets the target
-    box at its edge.
+    box at its edge. Arrows whose segment does not cross the screen are skipped.
+    Further out they thin out: between abbreviated labels the arrows are thin
+    with small heads, between dots they are merged into bundles drawn thicker
+    the more edges they carry, and in both tiers only those with an end on
+    screen are drawn.
     """
     ARROW_COLOR = (240, 240, 240)  # Brighter (near-white) color for clarity.
-    ARROW_WIDTH = max(1, int(2 * scale))
-    
-    # For each fusion relationship (using the "recipe" key):
-    for source_name, source_data in objects.items():
-        if "recipe" in source_data and source_data["recipe"]:
-            for ingredient in source_data["recipe"]:
-                if ingredient in object_positions and source_name in object_positions:
-                    # Ingredient: start point.
-                    start_pos = object_positions[ingredient]
-                    start_x = center_x + (start_pos[0] - center_x) * scale + camera_offset_x
-                    start_y = center_y + (start_pos[1] - center_y) * scale + camera_offset_y
-
-                    # Result: end point.
-                    end_pos = object_positions[source_name]
-                    end_x = center_x + (end_pos[0] - center_x) * scale + camera_offset_x
-                    end_y = center_y + (end_pos[1] - center_y) * scale + camera_offset_y
-
-                    # Get the target box dimensions from gu_boxes.
-                    target_box = gu_boxes.get(source_name)
-                    if target_box:
-                        box_width = target_box.width
-                        box_height = target_box.height
-                        start, end, point1, point2 = calculate_arrow_points(
-                            start_x, start_y, end_x, end_y, box_width, box_height
-                        )
-                        # Use anti-aliased line if ARROW_WIDTH is 1, otherwise use normal line.
-                        if ARROW_WIDTH == 1:
-                            pygame.draw.aaline(screen, ARROW_COLOR, (int(start[0]), int(start[1])), (int(end[0]), int(end[1])))
-                        else:
-                            pygame.draw.line(screen, ARROW_COLOR, start, end, ARROW_WIDTH)
-                        pygame.draw.polygon(screen, ARROW_COLOR, [end, point1, point2])
+    ARROW_WIDTH = max(1, int(2 * scale)) if lod == LOD_BOXES else 1
+    if graph is None:
+        graph = GuGraph(objects)
+    # Grow the viewport by the arrow head size so heads just off-screen still show.
+    viewport = screen.get_rect().inflate(40, 40)
+
+    # For each fusion relationship (recipe edges from the graph index):
+    batch = edge_cache.get(graph, object_positions, scale, getattr(objects, "edges", None), lod)
+    clip = (viewport.left, viewport.top, viewport.right, viewport.bottom)
+    if lod == LOD_DOTS:
+        for start, end, count in batch.translated(camera_offset_x, camera_offset_y, clip, anchored=True):
+            if viewport.clipline(start, end):
+                pygame.draw.line(screen, BUNDLE_COLOR, start, end, min(count.bit_length(), MAX_BUNDLE_WIDTH))
+        return
+    for start, end, point1, point2 in batch.translated(camera_offset_x, camera_offset_y, clip, lod == LOD_LABELS):
+        if not viewport.clipline(start, end):
+            continue
+        # Use anti-aliased line if ARROW_WIDTH is 1 next to full boxes, otherwise use normal line.
+        if ARROW_WIDTH == 1 and lod == LOD_BOXES:
+            pygame.draw.aaline(screen, ARROW_COLOR, (int(start[0]), int(start[1])), (int(end[0]), int(end[1])))
+        else:
+            pygame.draw.line(screen, ARROW_COLOR, start, end, ARROW_WIDTH)
+        pygame.draw.polygon(screen, ARROW_COLOR, [end, point1, point2])
+
+def draw_graph(surface, objects, object_positions, camera_offset_x, camera_offset_y, scale, graph, visible=None,
+               lod=LOD_BOXES):
+    """
+    Draw the recipe arrows and Gu boxes onto surface and return the drawn box rectangles by name.
+    `visible` is the culled list of Gu names to draw (all of object_positions if None);
+    `lod` is the LOD tier to draw them at (see detail_level()).
+    """
+    if visible is None:
+        visible = list(object_positions)
+    draw_arrows(surface, objects, object_positions, camera_offset_x, camera_offset_y, scale, graph, lod)
+
+    screen_positions = camera.screen_positions(object_positions, scale, camera_offset_x, camera_offset_y)
+    if lod == LOD_DOTS:
+        return draw_dots(surface, objects, visible, screen_positions, scale)
+    gu_boxes = {}
+    for name in visible:
+        transformed_x, transformed_y = screen_positions[name]
+        box_rect = draw_square(surface, transformed_x, transformed_y, gu_rgb(objects, name), name, scale, lod)
+        gu_boxes[name] = box_rect
+    return gu_boxes
+
+def gu_rgb(objects, name):
+    # A GuCatalog keeps colours pre-parsed; plain dicts are parsed per Gu.
+    catalog_rgb = getattr(objects, "rgb", None)
+    if catalog_rgb is not None:
+        return catalog_rgb(name)
+    return hex_to_rgb(objects[name].get("color", "#FFFFFF"))
+
+def draw_path_highlight(surface, objects, path_names, object_positions, camera_offset_x, camera_offset_y, scale,
+                        lod=LOD_BOXES):
+    """
+    Join consecutive steps of a fusion path with a thick line, then redraw the
+    path's Gu on top with an outline. Gu that are not part of the current view
+    are skipped.
+    """
+    screen_positions = camera.screen_positions(object_positions, scale, camera_offset_x, camera_offset_y)
+    width = max(2, int(4 * scale))
+    for start, end in zip(path_names, path_names[1:]):
+        if start in object_positions and end in object_positions:
+            pygame.draw.line(surface, PATH_COLOR, screen_positions[start], screen_positions[end], width)
+    for name in path_names:
+        if name in object_positions:
+            box_rect = draw_square(surface, *screen_positions[name], gu_rgb(objects, name), name, scale, lod)
+            pygame.draw.rect(surface, PATH_COLOR, box_rect.inflate(width * 2, width * 2), width,
+                             border_radius=int(10 * scale) + width)
 
 # -------------------------------
-# INFO WINDOW DRAWING
+# HIT TESTING
 # -------------------------------
-def draw_info_window(screen, gu_box_rect, gu_name, scale):
+class HitIndex:
     """
-    Draws an info window for the selected Gu that displays:
-      - The Gu's name (header), wrapped if too long.
-      - The Gu's level.
-      - The Gu's effect.
-      - Its recipe (if any).
-      - Its fusions (if any).
+    Spatial index over the Gu box rects around the viewport, used by the click
+    handlers and for culling. Rects are stored without the camera offset, so
+    panning only shifts the query. Only Gu within HIT_AREA_SCREENS screens of
+    the viewport are measured; the grid is rebuilt when the positions, the zoom
+    or the LOD tier (and with it the box shapes) change, or when a query leaves
+    the covered area, so a zoom step costs the Gu near the screen, not the catalog.
+    """
+    def __init__(self):
+        self.grid = SpatialGrid()
+        self.positions = None
+        self.scale = None
+        self.lod = None
+        self.area = None   # (left, top, right, bottom) covered by the grid, without camera offset
+
+    def update(self, object_positions, scale, lod, left, top, right, bottom):
+        area = self.area
+        if (object_positions is self.positions and scale == self.scale and lod == self.lod
+                and area[0] <= left and area[1] <= top and right <= area[2] and bottom <= area[3]):
+            return
+        margin_x = HIT_AREA_SCREENS * display_width
+        margin_y = HIT_AREA_SCREENS * display_height
+        area = (left - margin_x, top - margin_y, right + margin_x, bottom + margin_y)
+        # Boxes whose centre lies just outside the area may still reach into it.
+        reach = HIT_BOX_REACH * scale
+        screen_positions = camera.screen_positions(object_positions, scale, 0, 0)
+        self.grid.clear()
+        for name in screen_positions.inside(area[0] - reach, area[1] - reach, area[2] + reach, area[3] + reach):
+            self.grid.insert(name, calculate_box_rect(*screen_positions[name], name, scale, lod))
+        self.positions = object_positions
+        self.scale = scale
+        self.lod = lod
+        self.area = area
+
+    def gu_at(self, object_positions, scale, camera_offset_x, camera_offset_y, mouse_pos, lod=LOD_BOXES):
+        """
+        Return the name of the Gu whose box contains mouse_pos, or None.
+        """
+        x, y = mouse_pos[0] - camera_offset_x, mouse_pos[1] - camera_offset_y
+        self.update(object_positions, scale, lod, -camera_offset_x, -camera_offset_y,
+                    display_width - camera_offset_x, display_height - camera_offset_y)
+        return self.grid.query_point(x, y)
+
+    def gu_in_rect(self, object_positions, scale, camera_offset_x, camera_offset_y, rect, lod=LOD_BOXES):
+        """
+        Return the names of all Gu whose boxes intersect the screen rect (e.g. a marquee).
+        """
+        left, top, width, height = rect
+        left -= camera_offset_x
+        top -= camera_offset_y
+        self.update(object_positions, scale, lod, left, top, left + width, top + height)
+        return self.grid.query_rect((left, top, width, height))
 
-    The entire info window (dimensions and text) is scaled 20% larger than before.
+# -------------------------------
+# RETAINED SCENE
+# -------------------------------
+class Scene:
     """
-    # --- Info window fixed scaling factor: 20% larger
-    info_scale_factor = 1.2
+    Retained copy of what is on screen, split into two layers:
 
-    # --- Fixed parameters for the info window (independent of global zoom) ---
-    info_window_width = int(300 * info_scale_factor)      # New width: 300 * 1.2 = 360 px
-    base_padding = int(20 * info_scale_factor)            # New padding: 20 * 1.2 = 24 px
-    spacing_between_sections = int(10 * info_scale_factor)  # New spacing: 10 * 1.2 = 12 px
+      - graph layer: arrows and Gu boxes, re-rendered only when the view key
+        (mode, layout version, zoom or camera offset) changes.
+      - overlay: the info window, composited on top; when only the overlay
+        changes, the graph layer is restored under its old rect and just the
+        old and new rects are pushed with pygame.display.update(rects).
 
-    # --- Fixed font sizes for the info window (so they remain readable) ---
-    header_font_size = int(28 * info_scale_factor)  # New header font size: 28 * 1.2 ≈ 34
-    content_font_size = int(20 * info_scale_factor)  # New content font size: 20 * 1.2 = 24
+    render() returns False when nothing changed, so the caller can idle.
+    """
+    def __init__(self, screen):
+        self.screen = screen
+        self.graph_layer = pygame.Surface(screen.get_size())
+        self.view_key = None
+        self.overlay_key = None
+        self.overlay_rect = None
+        self.gu_boxes = {}
+
+    def invalidate(self):
+        self.view_key = None
+
+    def render(self, view_key, draw_graph_layer, overlay_key, draw_overlay):
+        dirty_rects = []
+
+        if view_key != self.view_key:
+            self.graph_layer.fill(BG_COLOR)
+            self.gu_boxes = draw_graph_layer(self.graph_layer)
+            self.screen.blit(self.graph_layer, (0, 0))
+            self.view_key = view_key
+            self.overlay_key = None
+            self.overlay_rect = None
+            dirty_rects.append(self.screen.get_rect())
+        elif overlay_key == self.overlay_key:
+            return False  # Idle: nothing to redraw.
+
+        if overlay_key != self.overlay_key:
+            if self.overlay_rect:
+                self.screen.blit(self.graph_layer, self.overlay_rect, self.overlay_rect)
+                dirty_rects.append(self.overlay_rect)
+            self.overlay_rect = draw_overlay(self.screen, self.gu_boxes) if overlay_key else None
+            if self.overlay_rect:
+                dirty_rects.append(self.overlay_rect)
+            self.overlay_key = overlay_key
+
+        if dirty_rects:
+            pygame.display.update(dirty_rects)
+        return True
 
-    header_font = pygame.font.Font(None, header_font_size)
-    content_font = pygame.font.Font(None, content_font_size)
+# -------------------------------
+# NODE ANIMATION
+# -------------------------------
+class NodeAnimation:
+    """
+    The Gu positions actually drawn. When the layout changes, Gu already on
+    screen glide from where they were drawn to their new place over
+    NODE_ANIMATION_TIME; Gu new to the screen appear in place. Mid-animation
+    each frame gets a new dict; once it ends the layout's own dict is shown
+    again, so the caches keyed on it stay warm. Layouts of more than
+    MAX_ANIMATED_GU Gu are swapped in at once.
+    """
+    def __init__(self, duration=NODE_ANIMATION_TIME, max_gu=MAX_ANIMATED_GU):
+        self.duration = duration
+        self.max_gu = max_gu
+        self.target = {}
+        self.shown = {}
+        self.start = None   # What was drawn when the target changed; None when not animating.
+        self.started = 0
+        self.frame = 0      # Bumped whenever `shown` changes.
+
+    @property
+    def animating(self):
+        return self.start is not None
+
+    def set_target(self, object_positions, now):
+        if object_positions is self.target:
+            return
+        shown = self.shown
+        moving = (len(object_positions) <= self.max_gu
+                  and any(name in shown for name in object_positions))
+        self.target = object_positions
+        self.started = now
+        self.start = shown if moving else None
+        if not moving:
+            self.shown = object_positions
+            self.frame += 1
+
+    def positions(self, now):
+        if self.start is not None:
+            progress = (now - self.started) / self.duration
+            if progress >= 1:
+                self.start = None
+                self.shown = self.target
+            else:
+                ease = 1 - (1 - progress) ** 3  # Ease out: fast start, gentle landing.
+                start = self.start
+                shown = {}
+                for name, (x, y) in self.target.items():
+                    old = start.get(name)
+                    shown[name] = (x, y) if old is None else (old[0] + (x - old[0]) * ease,
+                                                              old[1] + (y - old[1]) * ease)
+                self.shown = shown
+            self.frame += 1
+        return self.shown
+
+    def discard(self, names):
+        """
+        Stop drawing Gu that were removed from the catalog.
+        """
+        names = set(names)
+        if self.target.keys() & names:
+            self.target = {name: pos for name, pos in self.target.items() if name not in names}
+        if self.start is not None:
+            self.start = {name: pos for name, pos in self.start.items() if name not in names}
+        if self.shown.keys() & names:
+            self.shown = {name: pos for name, pos in self.shown.items() if name not in names}
+            self.frame += 1
 
-    max_text_width = info_window_width - 2 * base_padding
+# -------------------------------
+# OVERVIEW TEXTURE CACHE
+# -------------------------------
+class OverviewCache:
+    """
+    Off-screen renders of the whole ring overview, one per zoom level and LOD tier.
+    Each texture covers every Gu box at that scale, so panning is a single blit
+    at the camera offset. Textures are kept in LRU order and evicted once their
+    total size exceeds max_bytes; an overview too large for the budget is never
+    cached and is drawn directly instead.
+    """
+    def __init__(self, max_bytes=OVERVIEW_CACHE_BYTES, margin=20):
+        self.max_bytes = max_bytes
+        self.margin = margin
+        self.textures = OrderedDict()  # (scale, lod) -> (surface, origin_x, origin_y)
+        self.used_bytes = 0
+        self.positions = None
+        self.version = None
+
+    def _evict(self, key):
+        surface = self.textures.pop(key)[0]
+        self.used_bytes -= surface.get_bytesize() * surface.get_width() * surface.get_height()
+
+    def clear(self):
+        while self.textures:
+            self._evict(next(iter(self.textures)))
+
+    def get(self, graph, object_positions, scale, lod=LOD_BOXES):
+        """
+        Return the cached (surface, origin_x, origin_y) for this scale and tier, or None.
+        """
+        if object_positions is not self.positions or graph.version != self.version:
+            self.clear()
+            self.positions = object_positions
+            self.version = graph.version
+        entry = self.textures.get((scale, lod))
+        if entry is not None:
+            self.textures.move_to_end((scale, lod))
+        return entry
+
+    def render(self, objects, graph, object_positions, scale, lod=LOD_BOXES):
+        """
+        Render the full overview at this scale and tier into a new texture and cache it.
+        Returns None if the texture would not fit in the memory budget.
+        """
+        origin = camera.screen_positions(object_positions, scale, 0, 0)
+        left = top = right = bottom = None
+        for name, (x, y) in origin.items():
+            box_rect = calculate_box_rect(x, y, name, scale, lod)
+            left = box_rect.left if left is None else min(left, box_rect.left)
+            top = box_rect.top if top is None else min(top, box_rect.top)
+            right = box_rect.right if right is None else max(right, box_rect.right)
+            bottom = box_rect.bottom if bottom is None else max(bottom, box_rect.bottom)
+        if left is None:
+            return None
+
+        origin_x = int(left) - self.margin
+        origin_y = int(top) - self.margin
+        width = int(right) - origin_x + self.margin
+        height = int(bottom) - origin_y + self.margin
+        size = width * height * 4
+        if size > self.max_bytes:
+            return None
+        while self.textures and self.used_bytes + size > self.max_bytes:
+            self._evict(next(iter(self.textures)))
+
+        surface = pygame.Surface((width, height)).convert()
+        surface.fill(BG_COLOR)
+        draw_graph(surface, objects, object_positions, -origin_x, -origin_y, scale, graph, lod=lod)
+        self.used_bytes += surface.get_bytesize() * width * height
+        entry = (surface, origin_x, origin_y)
+        self.textures[(scale, lod)] = entry
+        return entry
+
+    def draw(self, surface, objects, graph, object_positions, camera_offset_x, camera_offset_y, scale, settled,
+             lod=LOD_BOXES):
+        """
+        Blit the cached overview for this scale and tier at the camera offset,
+        rendering it first if the zoom has settled. Returns False if nothing was
+        drawn, in which case the caller should draw the graph directly.
+        """
+        entry = self.get(graph, object_positions, scale, lod)
+        if entry is None and settled:
+            entry = self.render(objects, graph, object_positions, scale, lod)
+        if entry is None:
+            return False
+        texture, origin_x, origin_y = entry
+        surface.blit(texture, (origin_x + camera_offset_x, origin_y + camera_offset_y))
+        return True
 
-    # --- Helper function for wrapping text ---
-    def wrap_text(text, font, max_width):
-        words = text.split()
-        lines = []
-        current_line = ""
-        for word in words:
-            test_line = word if current_line == "" else current_line + " " + word
-            if font.size(test_line)[0] <= max_width:
-                current_line = test_line
-            else:
-                if current_line:
-                    lines.append(current_line)
-                current_line = word
-        if current_line:
-            lines.append(current_line)
-        return lines
-
-    # --- Retrieve the Gu's data from objects ---
-    gu_data = objects.get(gu_name, {})
-    level_text = "Level: " + str(gu_data.get("level", "N/A"))
-    effect_text = gu_data.get("effect", "No effect")
-    recipe_list = gu_data.get("recipe", [])
-    fusions_list = gu_data.get("fusions", [])
-
-    # --- Wrap text for each section ---
-    header_lines = wrap_text(gu_name, header_font, max_text_width)
-    level_lines = wrap_text(level_text, content_font, max_text_width)
-    effect_lines = wrap_text(effect_text, content_font, max_text_width)
-    recipe_lines = wrap_text("Recipe: " + ", ".join(recipe_list), content_font, max_text_width) if recipe_list else []
-    fusions_lines = wrap_text("Fusions: " + ", ".join(fusions_list), content_font, max_text_width) if fusions_list else []
-
-    # --- Compute total content height ---
-    header_height = len(header_lines) * header_font.get_linesize()
-    level_height = len(level_lines) * content_font.get_linesize()
-    effect_height = len(effect_lines) * content_font.get_linesize()
-    recipe_height = len(recipe_lines) * content_font.get_linesize()
-    fusions_height = len(fusions_lines) * content_font.get_linesize()
-
-    # Count how many sections will be rendered
-    sections = []
-    if header_lines: sections.append(header_height)
-    if level_lines: sections.append(level_height)
-    if effect_lines: sections.append(effect_height)
-    if recipe_lines: sections.append(recipe_height)
-    if fusions_lines: sections.append(fusions_height)
-    total_spacing = spacing_between_sections * (len(sections) - 1 if len(sections) > 1 else 0)
-
-    content_height = header_height + level_height + effect_height + recipe_height + fusions_height + total_spacing
-
-    # --- Compute window height ---
-    info_window_height = content_height + 2 * base_padding
+# -------------------------------
+# INFO WINDOW DRAWING
+# -------------------------------
+# The info window has a fixed size, independent of the zoom, 20% larger than
+# the original 300 px design so it stays readable.
+INFO_SCALE_FACTOR = 1.2
+INFO_WINDOW_WIDTH = int(300 * INFO_SCALE_FACTOR)      # 360 px
+INFO_PADDING = int(20 * INFO_SCALE_FACTOR)            # 24 px
+INFO_SECTION_SPACING = int(10 * INFO_SCALE_FACTOR)    # 12 px
+INFO_HEADER_FONT_SIZE = int(28 * INFO_SCALE_FACTOR)   # ~34
+INFO_CONTENT_FONT_SIZE = int(20 * INFO_SCALE_FACTOR)  # 24
+INFO_TRANSPARENT = (255, 0, 255)  # Colorkey for the panel's rounded-off corners
+
+def wrap_text(text, font, max_width, word_widths=None):
+    """
+    Greedily wrap text into lines no wider than max_width; a longer word gets a
+    line of its own. Each word is measured once (and remembered in word_widths,
+    if given) and line widths are running sums of word and space widths, so
+    wrapping is linear in the length of the text.
+    """
+    if word_widths is None:
+        word_widths = {}
+    space_width = font.size(" ")[0]
+    lines = []
+    line = []
+    line_width = 0
+    for word in text.split():
+        width = word_widths.get(word)
+        if width is None:
+            width = word_widths[word] = font.size(word)[0]
+        if line and line_width + space_width + width > max_width:
+            lines.append(" ".join(line))
+            line = []
+            line_width = 0
+        line_width += width + (space_width if line else 0)
+        line.append(word)
+    if line:
+        lines.append(" ".join(line))
+    return lines
+
+class InfoPanelCache:
+    """
+    Pre-rendered info windows, one per Gu. The first time a Gu's window is
+    shown its text is wrapped and composited onto one surface, so every frame
+    after that is a single blit. Each panel remembers the data it shows and is
+    rendered again only when that Gu's level, effect, recipe or fusions change.
+    The least recently shown panels are evicted beyond max_panels.
+    """
+    def __init__(self, max_panels=64):
+        self.max_panels = max_panels
+        self.panels = OrderedDict()  # Gu name -> (shown data, surface)
+        self.word_widths = {}        # font size -> {word: width}
+
+    @staticmethod
+    def shown_data(data):
+        return (data.get("level", "N/A"), data.get("effect", "No effect"),
+                tuple(data.get("recipe", [])), tuple(data.get("fusions", [])))
+
+    def panel(self, gu_name, data):
+        shown = self.shown_data(data)
+        entry = self.panels.get(gu_name)
+        if entry is None or entry[0] != shown:
+            entry = self.panels[gu_name] = (shown, self.render(gu_name, *shown))
+            if len(self.panels) > self.max_panels:
+                self.panels.popitem(last=False)
+        self.panels.move_to_end(gu_name)
+        return entry[1]
+
+    def render(self, gu_name, level, effect, recipe, fusions):
+        max_text_width = INFO_WINDOW_WIDTH - 2 * INFO_PADDING
+        header_font = text_cache.font(INFO_HEADER_FONT_SIZE)
+        content_font = text_cache.font(INFO_CONTENT_FONT_SIZE)
+
+        def wrap(text, font, size):
+            return wrap_text(text, font, max_text_width, self.word_widths.setdefault(size, {}))
+
+        # Sections, top to bottom: name (header), level, effect, recipe and fusions (if any).
+        sections = [(header_font, wrap(gu_name, header_font, INFO_HEADER_FONT_SIZE))]
+        texts = ["Level: " + str(level), effect]
+        if recipe:
+            texts.append("Recipe: " + ", ".join(recipe))
+        if fusions:
+            texts.append("Fusions: " + ", ".join(fusions))
+        sections.extend((content_font, wrap(text, content_font, INFO_CONTENT_FONT_SIZE)) for text in texts)
+        sections = [(font, lines) for font, lines in sections if lines]
+
+        content_height = sum(len(lines) * font.get_linesize() for font, lines in sections)
+        content_height += INFO_SECTION_SPACING * max(len(sections) - 1, 0)
+        height = content_height + 2 * INFO_PADDING
+
+        surface = pygame.Surface((INFO_WINDOW_WIDTH, height)).convert()
+        surface.fill(INFO_TRANSPARENT)
+        surface.set_colorkey(INFO_TRANSPARENT)
+        window_rect = surface.get_rect()
+        pygame.draw.rect(surface, WINDOW_COLOR, window_rect, border_radius=10)
+        pygame.draw.rect(surface, FRAME_COLOR, window_rect, 2, border_radius=10)
+
+        current_y = INFO_PADDING
+        for font, lines in sections:
+            for line in lines:
+                line_surface = font.render(line, True, TEXT_COLOR)
+                surface.blit(line_surface, line_surface.get_rect(centerx=window_rect.centerx, top=current_y))
+                current_y += font.get_linesize()
+            current_y += INFO_SECTION_SPACING
+        return surface
+
+info_panels = InfoPanelCache()
+
+def draw_info_window(screen, gu_box_rect, gu_name, scale):
+    """
+    Draw the info window of the selected Gu next to its box: its name (header),
+    level, effect, and its recipe and fusions if any. The window itself comes
+    pre-rendered from info_panels. Returns its rect.
+    """
+    panel = info_panels.panel(gu_name, graph.objects.get(gu_name, {}))
+    info_window_width, info_window_height = panel.get_size()
 
     # --- Position the window relative to the Gu box ---
-    window_x = gu_box_rect.right + base_padding
+    window_x = gu_box_rect.right + INFO_PADDING
     window_y = gu_box_rect.centery - info_window_height // 2
 
     # If the window goes off the right edge, place it to the left of the box.
     if window_x + info_window_width > display_width:
-        window_x = gu_box_rect.left - info_window_width - base_padding
+        window_x = gu_box_rect.left - info_window_width - INFO_PADDING
     # Keep the window fully on-screen vertically.
     window_y = max(0, min(display_height - info_window_height, window_y))
 
     window_rect = pygame.Rect(window_x, window_y, info_window_width, info_window_height)
+    screen.blit(panel, window_rect)
+    return window_rect
 
-    # --- Draw the window with rounded corners and a frame ---
+# -------------------------------
+# SEARCH BOX DRAWING
+# -------------------------------
+def draw_search_box(screen, query, results, choice):
+    """
+    Draw the search box in the top-left corner: the query being typed and the
+    matching Gu below it, with the chosen result highlighted. Returns its rect.
+    """
+    padding = 10
+    width = 420
+    font = text_cache.font(26)
+    hint_font = text_cache.font(20)
+    line_height = font.get_linesize()
+    height = 2 * padding + line_height * (1 + len(results))
+    window_rect = pygame.Rect(20, 20, width, height)
     pygame.draw.rect(screen, WINDOW_COLOR, window_rect, border_radius=10)
     pygame.draw.rect(screen, FRAME_COLOR, window_rect, 2, border_radius=10)
 
-    # --- Render the text ---
-    current_y = window_rect.top + base_padding
-
-    # Render header (possibly multiple lines)
-    for line in header_lines:
-        line_surface = header_font.render(line, True, TEXT_COLOR)
-        line_rect = line_surface.get_rect(centerx=window_rect.centerx, top=current_y)
-        screen.blit(line_surface, line_rect)
-        current_y += header_font.get_linesize()
-    if header_lines:
-        current_y += spacing_between_sections
-
-    # Render level
-    for line in level_lines:
-        line_surface = content_font.render(line, True, TEXT_COLOR)
-        line_rect = line_surface.get_rect(centerx=window_rect.centerx, top=current_y)
-        screen.blit(line_surface, line_rect)
-        current_y += content_font.get_linesize()
-    if level_lines:
-        current_y += spacing_between_sections
-
-    # Render effect
-    for line in effect_lines:
-        line_surface = content_font.render(line, True, TEXT_COLOR)
-        line_rect = line_surface.get_rect(centerx=window_rect.centerx, top=current_y)
-        screen.blit(line_surface, line_rect)
-        current_y += content_font.get_linesize()
-    if effect_lines:
-        current_y += spacing_between_sections
-
-    # Render recipe if available
-    if recipe_lines:
-        for line in recipe_lines:
-            line_surface = content_font.render(line, True, TEXT_COLOR)
-            line_rect = line_surface.get_rect(centerx=window_rect.centerx, top=current_y)
-            screen.blit(line_surface, line_rect)
-            current_y += content_font.get_linesize()
-        current_y += spacing_between_sections
-
-    # Render fusions if available
-    if fusions_lines:
-        for line in fusions_lines:
-            line_surface = content_font.render(line, True, TEXT_COLOR)
-            line_rect = line_surface.get_rect(centerx=window_rect.centerx, top=current_y)
-            screen.blit(line_surface, line_rect)
-            current_y += content_font.get_linesize()
+    x = window_rect.left + padding
+    y = window_rect.top + padding
+    screen.blit(font.render("Search: " + query + "_", True, TEXT_COLOR), (x, y))
+    for i, (name, field) in enumerate(results):
+        y += line_height
+        if i == choice:
+            pygame.draw.rect(screen, FRAME_COLOR, (x - 4, y - 2, width - 2 * padding + 8, line_height), 1, border_radius=4)
+        screen.blit(font.render(name, True, TEXT_COLOR), (x, y))
+        if field != "name":
+            hint = hint_font.render(field, True, HINT_COLOR)
+            screen.blit(hint, (window_rect.right - padding - hint.get_width(), y + 2))
+    return window_rect
+
+# -------------------------------
+# FILTER STATUS DRAWING
+# -------------------------------
+def draw_filter_status(screen, facet_filter, shown):
+    """
+    Draw the active filters and how many Gu they leave in the bottom-left corner. Returns its rect.
+    """
+    parts = []
+    if facet_filter.levels:
+        parts.append("Level " + ", ".join(str(level) for level in sorted(facet_filter.levels)))
+    parts.extend(sorted(facet_filter.affinities))
+    parts.extend(sorted(facet_filter.families))
+    text = "Filter: %s  (%d Gu)  [0 clears]" % (" / ".join(parts), shown)
+    text_surface = text_cache.font(24).render(text, True, TEXT_COLOR)
+    window_rect = text_surface.get_rect(bottomleft=(20, display_height - 20)).inflate(20, 12)
+    pygame.draw.rect(screen, WINDOW_COLOR, window_rect, border_radius=8)
+    pygame.draw.rect(screen, FRAME_COLOR, window_rect, 2, border_radius=8)
+    screen.blit(text_surface, text_surface.get_rect(center=window_rect.center))
+    return window_rect
+
+# -------------------------------
+# PATH STATUS DRAWING
+# -------------------------------
+def fusion_path_status(start, end, path):
+    """
+    Describe a shift-click path query as text lines for draw_path_status().
+    """
+    if not path:
+        return ("No fusion path from %s to %s" % (start, end),)
+    extras = path.ingredients()
+    extra_text = ", ".join("%s x%d" % (name, count) if count > 1 else name for name, count in extras.items())
+    return ("Fusion path: " + " -> ".join(path.names),
+            "Extra ingredients: " + (extra_text or "none") + "  [Esc clears]")
+
+def draw_path_status(screen, lines):
+    """
+    Draw the fusion path found by a shift-click at the bottom centre of the screen. Returns its rect.
+    """
+    font = text_cache.font(24)
+    surfaces = [font.render(line, True, TEXT_COLOR) for line in lines]
+    line_height = font.get_linesize()
+    width = max(surface.get_width() for surface in surfaces)
+    window_rect = pygame.Rect(0, 0, width + 20, line_height * len(surfaces) + 12)
+    window_rect.midbottom = (display_width // 2, display_height - 20)
+    pygame.draw.rect(screen, WINDOW_COLOR, window_rect, border_radius=8)
+    pygame.draw.rect(screen, FRAME_COLOR, window_rect, 2, border_radius=8)
+    for i, surface in enumerate(surfaces):
+        screen.blit(surface, (window_rect.left + 10, window_rect.top + 6 + i * line_height))
+    return window_rect
 
+# -------------------------------
+# LAYOUT STATUS DRAWING
+# -------------------------------
+def draw_layout_status(screen):
+    """
+    Tell the user a layout is being computed, in the bottom-right corner. Returns its rect.
+    """
+    text_surface = text_cache.font(24).render("Laying out...", True, HINT_COLOR)
+    window_rect = text_surface.get_rect(bottomright=(display_width - 20, display_height - 20)).inflate(20, 12)
+    pygame.draw.rect(screen, WINDOW_COLOR, window_rect, border_radius=8)
+    pygame.draw.rect(screen, FRAME_COLOR, window_rect, 2, border_radius=8)
+    screen.blit(text_surface, text_surface.get_rect(center=window_rect.center))
     return window_rect
 
+def next_facet_value(values, current):
+    """
+    Cycle through a facet's values: off -> first -> ... -> last -> off.
+    """
+    values = sorted(values)
+    if current not in values:
+        return values[0] if values else None
+    index = values.index(current) + 1
+    return values[index] if index < len(values) else None
+
 # -------------------------------
 # MAIN GAME LOOP
 # -------------------------------
-def main():
+def main(catalog_paths=()):
+    """
+    Run the viewer. With catalog_paths (JSONL/CSV/JSON files), the viewer starts
+    from an empty catalog and streams those files in, drawing Gu as they load.
+    The catalog files (or gu_data.py) are watched, and saved edits are applied
+    live without moving the camera or dropping the selection.
+    """
     try:
+        if screen is None:
+            create_app(GuCatalog() if catalog_paths else None)
+        loaders = [CatalogLoader(path, graph.objects, graph) for path in catalog_paths]
+        watchers = [CatalogWatcher(path).start() for path in (catalog_paths or [DEFAULT_SOURCE])]
         running = True
         clock = pygame.time.Clock()
 
+        # Ring layout, recomputed when the graph version changes (see graph.update()).
+        layout = GuLayout(graph, center_x, center_y)
+        # Recently viewed fusion lines, so flipping between them is instant.
+        fusion_cache = FusionLineCache(graph, center_x, center_y)
+        # Both layouts are computed in the background; until one is ready the
+        # last frame stays on screen, then the Gu glide to their new places.
+        layout_worker = LayoutWorker()
+        node_animation = NodeAnimation()
+        interim_positions = {}  # layout target -> finished layout of an older catalog version
+        object_positions = {}
+        focus_gu = None  # Gu the camera flies to once the ring layout is ready
+        # Last rendered frame; only changed regions are redrawn.
+        scene = Scene(screen)
+        # Box rects for click hit-testing.
+        hit_index = HitIndex()
+        # LOD tier of the last drawn frame, so clicks hit the shapes on screen.
+        lod = LOD_BOXES
+        # Pre-rendered ring overview textures, one per settled zoom level.
+        overview_cache = OverviewCache()
+        # Fusion path queries; shift-click a Gu to highlight the path from the selected one.
+        path_finder = PathFinder(graph)
+        highlight_path = None
+        path_status = None   # Text lines describing the highlighted path, or why there is none
+        # Search box ("/" or Ctrl+F); the index is built the first time it opens.
+        search_index = None
+        search_active = False
+        search_query = ""
+        search_results = []
+        search_choice = 0
+        # Facet filters: 1-9 toggle levels, A cycles affinities, F cycles families, 0 clears.
+        facets = None
+        facet_filter = FacetFilter()
+        facet_view = None
+        scale_changed_time = 0
+
         # Camera and interaction states.
         camera_offset_x = 0
         camera_offset_y = 0
@@ -512,7 +999,6 @@ def main():
         # Selection and window states.
         selected_gu = None
         show_info_window = False
-        info_window_rect = None
         drag_threshold = 5
         click_candidate = False
 
@@ -535,10 +1021,63 @@ def main():
                 if event.type == pygame.QUIT:
                     running = False
 
+                elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                    scene.invalidate()
+
+                elif event.type == pygame.KEYDOWN and search_active:
+                    if event.key == pygame.K_ESCAPE:
+                        search_active = False
+                    elif event.key in (pygame.K_UP, pygame.K_DOWN):
+                        step = 1 if event.key == pygame.K_DOWN else -1
+                        search_choice = (search_choice + step) % max(1, len(search_results))
+                    elif event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
+                        if search_results:
+                            # Fly to the chosen Gu on the ring view with the usual camera animation.
+                            name = search_results[search_choice][0]
+                            FUSION_LINE_MODE = False
+                            selected_fusion_gu = None
+                            if facet_view is not None and name not in facet_view:
+                                # The result is hidden by the filters; show every Gu again.
+                                facet_filter = FacetFilter()
+                            selected_gu = name
+                            focus_gu = name
+                            show_info_window = True
+                            search_active = False
+                    else:
+                        if event.key == pygame.K_BACKSPACE:
+                            search_query = search_query[:-1]
+                        elif event.unicode and event.unicode.isprintable() and not event.mod & pygame.KMOD_CTRL:
+                            search_query += event.unicode
+                        search_results = search_index.search(search_query, SEARCH_RESULTS)
+                        search_choice = 0
+
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE and FUSION_LINE_MODE:
                         FUSION_LINE_MODE = False
                         selected_fusion_gu = None
+                    elif event.key == pygame.K_ESCAPE:
+                        highlight_path = None
+                        path_status = None
+                    elif event.key == pygame.K_SLASH or (event.key == pygame.K_f and event.mod & pygame.KMOD_CTRL):
+                        if search_index is None:
+                            search_index = SearchIndex(graph)
+                        search_active = True
+                        search_query = ""
+                        search_results = []
+                        search_choice = 0
+                    elif event.unicode in ("a", "f", "0") or (event.unicode and event.unicode in "123456789"):
+                        if facets is None:
+                            facets = FacetIndex(graph)
+                        if event.unicode == "0":
+                            facet_filter = FacetFilter()
+                        elif event.unicode == "a":
+                            current = next(iter(facet_filter.affinities), None)
+                            facet_filter = facet_filter.with_affinity(next_facet_value(facets.affinities, current))
+                        elif event.unicode == "f":
+                            current = next(iter(facet_filter.families), None)
+                            facet_filter = facet_filter.with_family(next_facet_value(facets.families, current))
+                        else:
+                            facet_filter = facet_filter.toggle_level(int(event.unicode))
 
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     if event.button == 1:  # Left click.
@@ -549,82 +1088,60 @@ def main():
 
                         current_time = pygame.time.get_ticks()
                         mouse_pos = event.pos
-                        clicked_gu = None
+                        positions_for_click = object_positions  # As drawn, even mid-animation.
 
-                        if FUSION_LINE_MODE and selected_fusion_gu:
-                            positions_for_click = calculate_fusion_line_positions(
-                                get_fusion_line_elements(objects, selected_fusion_gu),
-                                center_x, center_y
-                            )
-                        else:
-                            positions_for_click = calculate_positions(objects)
-
-                        for name, pos in positions_for_click.items():
-                            transformed_x = center_x + (pos[0] - center_x) * scale + camera_offset_x
-                            transformed_y = center_y + (pos[1] - center_y) * scale + camera_offset_y
-                            distance = math.hypot(mouse_pos[0] - transformed_x, mouse_pos[1] - transformed_y)
-                            if distance < 30 * scale:
-                                clicked_gu = name
-                                break
+                        clicked_gu = hit_index.gu_at(positions_for_click, scale, camera_offset_x, camera_offset_y, mouse_pos, lod)
 
                         if (clicked_gu and clicked_gu == last_clicked_gu and 
                             current_time - last_click_time < DOUBLE_CLICK_TIME):
                             FUSION_LINE_MODE = True
                             selected_fusion_gu = clicked_gu
-                            camera_offset_x = 0
-                            camera_offset_y = 0
+                            selected_gu = clicked_gu
+                            camera_offset_x = target_offset_x = 0
+                            camera_offset_y = target_offset_y = 0
+                            camera_moving = False
                             show_info_window = False
+                            # The ring is still on screen until the fusion line is laid out,
+                            # so the release of this click must not select or pan to a ring Gu.
+                            click_candidate = False
 
                         last_click_time = current_time
                         last_clicked_gu = clicked_gu
 
                     elif event.button == 3:  # Right click.
                         mouse_pos = event.pos
-                        if FUSION_LINE_MODE and selected_fusion_gu:
-                            positions_for_click = calculate_fusion_line_positions(
-                                get_fusion_line_elements(objects, selected_fusion_gu),
-                                center_x, center_y
-                            )
-                        else:
-                            positions_for_click = calculate_positions(objects)
-                        for name, pos in positions_for_click.items():
-                            transformed_x = center_x + (pos[0] - center_x) * scale + camera_offset_x
-                            transformed_y = center_y + (pos[1] - center_y) * scale + camera_offset_y
-                            distance = math.hypot(mouse_pos[0] - transformed_x, mouse_pos[1] - transformed_y)
-                            if distance < 30 * scale:
-                                selected_gu = name
-                                target_offset_x = -(pos[0] - center_x) * scale
-                                target_offset_y = -(pos[1] - center_y) * scale
-                                camera_moving = True
-                                show_info_window = True
-                                break
+                        positions_for_click = object_positions  # As drawn, even mid-animation.
+                        name = hit_index.gu_at(positions_for_click, scale, camera_offset_x, camera_offset_y, mouse_pos, lod)
+                        if name:
+                            pos = positions_for_click[name]
+                            selected_gu = name
+                            target_offset_x = -(pos[0] - center_x) * scale
+                            target_offset_y = -(pos[1] - center_y) * scale
+                            camera_moving = True
+                            show_info_window = True
 
                     elif event.button in (4, 5):  # Scroll.
                         scale = min(max(scale + (0.1 if event.button == 4 else -0.1), min_scale), max_scale)
+                        scale_changed_time = pygame.time.get_ticks()
 
                 elif event.type == pygame.MOUSEBUTTONUP:
                     if event.button == 1:  # Left click release.
                         dragging = False
                         if click_candidate:
                             mouse_pos = event.pos
-                            if FUSION_LINE_MODE and selected_fusion_gu:
-                                positions_for_click = calculate_fusion_line_positions(
-                                    get_fusion_line_elements(objects, selected_fusion_gu),
-                                    center_x, center_y
-                                )
-                            else:
-                                positions_for_click = calculate_positions(objects)
-                            for name, pos in positions_for_click.items():
-                                transformed_x = center_x + (pos[0] - center_x) * scale + camera_offset_x
-                                transformed_y = center_y + (pos[1] - center_y) * scale + camera_offset_y
-                                distance = math.hypot(mouse_pos[0] - transformed_x, mouse_pos[1] - transformed_y)
-                                if distance < 30 * scale:
-                                    selected_gu = name
-                                    show_info_window = False
-                                    target_offset_x = -(pos[0] - center_x) * scale
-                                    target_offset_y = -(pos[1] - center_y) * scale
-                                    camera_moving = True
-                                    break
+                            positions_for_click = object_positions
+                            name = hit_index.gu_at(positions_for_click, scale, camera_offset_x, camera_offset_y, mouse_pos, lod)
+                            if name and selected_gu and name != selected_gu and pygame.key.get_mods() & pygame.KMOD_SHIFT:
+                                path = path_finder.cheapest_path(selected_gu, name)
+                                highlight_path = tuple(path.names) if path else None
+                                path_status = fusion_path_status(selected_gu, name, path)
+                            elif name:
+                                pos = positions_for_click[name]
+                                selected_gu = name
+                                show_info_window = False
+                                target_offset_x = -(pos[0] - center_x) * scale
+                                target_offset_y = -(pos[1] - center_y) * scale
+                                camera_moving = True
                         click_candidate = False
 
                 elif event.type == pygame.MOUSEMOTION and dragging:
@@ -636,6 +1153,56 @@ def main():
                     camera_offset_y = offset_start[1] + dy
                     camera_moving = False
 
+            # Stream the next batches of any catalog still loading. Each batch bumps
+            # the graph version, so the indexes are updated batch by batch rather than
+            # rebuilt; the ring layout is recomputed by the layout worker.
+            if loaders:
+                loaded = []
+
+                def index_batch(names):
+                    fusion_cache.update(names)
+                    if facets is not None:
+                        facets.update(names)
+                    if search_index is not None:
+                        search_index.update(names)
+                    loaded.extend(names)
+
+                more = loaders[0].step(on_batch=index_batch)
+                if loaded and search_active:
+                    search_results = search_index.search(search_query, SEARCH_RESULTS)
+                    search_choice = min(search_choice, max(0, len(search_results) - 1))
+                if not more:
+                    for error in loaders[0].errors:
+                        print(f"Skipped catalog record: {error}")
+                    loaders.pop(0)
+
+            # Apply catalog edits diffed by the file watchers; only the rings or
+            # fusion lines holding the edited Gu are laid out again.
+            for watcher in watchers:
+                for diff in watcher.poll():
+                    for error in diff.errors:
+                        print(f"Skipped catalog record: {error}")
+                    if not diff:
+                        continue
+                    apply_diff(graph.objects, graph, diff)
+                    if diff.removed:
+                        node_animation.discard(diff.removed)
+                    layout.update(diff.names)
+                    fusion_cache.update(diff.names)
+                    if facets is not None:
+                        facets.update(diff.names)
+                    if search_index is not None:
+                        search_index.update(diff.names)
+                        if search_active:
+                            search_results = search_index.search(search_query, SEARCH_RESULTS)
+                            search_choice = min(search_choice, max(0, len(search_results) - 1))
+                    if selected_gu is not None and selected_gu not in graph.objects:
+                        selected_gu = None
+                        show_info_window = False
+                    if selected_fusion_gu is not None and selected_fusion_gu not in graph.objects:
+                        FUSION_LINE_MODE = False
+                        selected_fusion_gu = None
+
             if camera_moving:
                 dx = target_offset_x - camera_offset_x
                 dy = target_offset_y - camera_offset_y
@@ -647,38 +1214,120 @@ def main():
                     camera_offset_x += dx * animation_speed
                     camera_offset_y += dy * animation_speed
 
-            screen.fill(BG_COLOR)
+            # Only the Gu left by the facet filters are laid out and drawn.
+            facet_view = facets.view(facet_filter) if facets is not None else None
+            layout.set_view(facet_view)
+            fusion_cache.set_view(facet_view)
+            view_objects = facet_view if facet_view is not None else graph.objects
+
+            # Collect finished background layouts. Results for the current catalog
+            # version go into the caches; older ones are shown until theirs arrive.
+            for job, result, error in layout_worker.poll():
+                if error is not None:
+                    if job.version == graph.version:
+                        raise error
+                    continue  # The catalog changed under the job; it is laid out again below.
+                if job.target[0] == "ring":
+                    stored, positions = layout.store(job.key, result), result[0]
+                else:
+                    stored, positions = fusion_cache.store(job.key, result), result[1]
+                if stored:
+                    interim_positions.pop(job.target, None)
+                else:
+                    interim_positions[job.target] = {name: pos for name, pos in positions.items()
+                                                     if name in graph.objects}
 
+            now = pygame.time.get_ticks()
             if FUSION_LINE_MODE and selected_fusion_gu:
-                elements = get_fusion_line_elements(objects, selected_fusion_gu)
-                object_positions = calculate_fusion_line_positions(elements, center_x, center_y)
+                layout_target = ("fusion", selected_fusion_gu, facet_filter.key)
+                entry = fusion_cache.cached(selected_fusion_gu)
+                target_positions = entry[1] if entry is not None else None
+                if target_positions is None:
+                    layout_worker.submit(layout_target, fusion_cache.key(selected_fusion_gu), graph.version,
+                                         fusion_cache.compute, selected_fusion_gu, facet_view)
+                view_mode = selected_fusion_gu
             else:
-                object_positions = calculate_positions(objects)
-
-            gu_boxes = {}
-            for name, pos in object_positions.items():
-                transformed_x = center_x + (pos[0] - center_x) * scale + camera_offset_x
-                transformed_y = center_y + (pos[1] - center_y) * scale + camera_offset_y
-                box_rect = calculate_box_rect(transformed_x, transformed_y, name, scale)
-                gu_boxes[name] = box_rect
-
-            draw_arrows(screen, objects, object_positions, camera_offset_x, camera_offset_y, scale, gu_boxes)
-
-            for name, pos in object_positions.items():
-                transformed_x = center_x + (pos[0] - center_x) * scale + camera_offset_x
-                transformed_y = center_y + (pos[1] - center_y) * scale + camera_offset_y
-                gu_color_hex = objects[name].get("color", "#FFFFFF")
-                gu_color_rgb = hex_to_rgb(gu_color_hex)
-                box_rect = draw_square(screen, transformed_x, transformed_y, gu_color_rgb, name, scale)
-                gu_boxes[name] = box_rect
-
-            if show_info_window and selected_gu and not camera_moving:
+                layout_target = ("ring", facet_filter.key)
+                target_positions = layout.cached()
+                if target_positions is None:
+                    layout_worker.submit(layout_target, layout.key, graph.version, layout.compute, facet_view)
+                elif focus_gu in target_positions:
+                    pos = target_positions[focus_gu]
+                    target_offset_x = -(pos[0] - center_x) * scale
+                    target_offset_y = -(pos[1] - center_y) * scale
+                    camera_moving = True
+                    focus_gu = None
+                view_mode = None
+            if target_positions is None:
+                target_positions = interim_positions.get(layout_target)
+            if target_positions is not None:
+                node_animation.set_target(target_positions, now)
+            object_positions = node_animation.positions(now)
+            laying_out = layout_worker.busy(layout_target)
+
+            settled = (view_mode is None and not node_animation.animating
+                       and now - scale_changed_time >= OVERVIEW_SETTLE_TIME)
+
+            def draw_graph_layer(surface):
+                nonlocal lod
+                # The LOD tier follows the zoom and the number of Gu on screen. Dots
+                # are culled by their centres; boxes and labels by their rects, so
+                # only those overlapping the screen are measured and drawn.
+                screen_positions = camera.screen_positions(object_positions, scale, camera_offset_x, camera_offset_y)
+                radius = dot_radius(scale)
+                on_screen = screen_positions.inside(-radius, -radius, surface.get_width() + radius,
+                                                    surface.get_height() + radius)
+                lod = detail_level(scale, len(on_screen))
+                if lod == LOD_DOTS:
+                    visible = on_screen
+                else:
+                    visible = hit_index.gu_in_rect(object_positions, scale, camera_offset_x, camera_offset_y,
+                                                   surface.get_rect(), lod)
+                if view_mode is None and overview_cache.draw(surface, view_objects, graph, object_positions,
+                                                             camera_offset_x, camera_offset_y, scale, settled, lod):
+                    gu_boxes = {name: calculate_box_rect(*screen_positions[name], name, scale, lod) for name in visible}
+                else:
+                    gu_boxes = draw_graph(surface, view_objects, object_positions, camera_offset_x, camera_offset_y, scale,
+                                          graph, visible, lod)
+                if highlight_path:
+                    draw_path_highlight(surface, graph.objects, highlight_path, object_positions, camera_offset_x,
+                                        camera_offset_y, scale, lod)
+                return gu_boxes
+
+            info_key = selected_gu if show_info_window and selected_gu and not camera_moving else None
+            search_key = (search_query, tuple(search_results), search_choice) if search_active else None
+            filter_key = (facet_filter.key, len(facet_view)) if facet_view is not None else None
+
+            def draw_overlay(surface, gu_boxes):
+                overlay_rects = []
                 selected_box_rect = gu_boxes.get(selected_gu)
-                if selected_box_rect:
-                    info_window_rect = draw_info_window(screen, selected_box_rect, selected_gu, scale)
-
-            pygame.display.flip()
-            clock.tick(60)
+                if info_key and selected_box_rect:
+                    overlay_rects.append(draw_info_window(surface, selected_box_rect, selected_gu, scale))
+                if search_key:
+                    overlay_rects.append(draw_search_box(surface, search_query, search_results, search_choice))
+                if filter_key:
+                    overlay_rects.append(draw_filter_status(surface, facet_filter, len(facet_view)))
+                if path_status:
+                    overlay_rects.append(draw_path_status(surface, path_status))
+                if laying_out:
+                    overlay_rects.append(draw_layout_status(surface))
+                return overlay_rects[0].unionall(overlay_rects[1:]) if overlay_rects else None
+
+            view_key = (view_mode, graph.version, scale, camera_offset_x, camera_offset_y, settled, highlight_path,
+                        facet_filter.key, node_animation.frame)
+            overlay_key = ((info_key, search_key, filter_key, path_status, laying_out)
+                           if info_key or search_key or filter_key or path_status or laying_out else None)
+            if scene.render(view_key, draw_graph_layer, overlay_key, draw_overlay):
+                clock.tick(60)
+            elif laying_out:
+                clock.tick(60)  # Check for the finished layout next frame instead of idling.
+            elif not dragging and not loaders:
+                # Idle: block until the next input instead of redrawing at 60 FPS.
+                event = pygame.event.wait(IDLE_WAIT_TIME)
+                if event.type != pygame.NOEVENT:
+                    pygame.event.post(event)
+
+        layout_worker.shutdown()
 
     except Exception as e:
         print(f"An error occurred: {e}")
@@ -687,7 +1336,7 @@ def main():
 
 if __name__ == "__main__":
     try:
-        main()
+        main(sys.argv[1:])
     except Exception as e:
         print(f"Error occurred: {e}")
         import traceback
@@ -0,0 +1,50 @@
+import pytest
+
+from gu_catalog import NO_COLOR, GuCatalog
+from gu_data import objects as GU_DATA
+from gu_layout import ring_radius
+
+@pytest.fixture
+def catalog():
+    return GuCatalog.from_objects(GU_DATA)
+
+def test_records_match_gu_data(catalog):
+    assert list(catalog) == list(GU_DATA)
+    for name, data in GU_DATA.items():
+        expected = {field: value for field, value in data.items() if value is not None}
+        assert dict(catalog[name]) == expected
+
+def test_records_have_no_stored_radius(catalog):
+    for name, data in GU_DATA.items():
+        record = catalog[name]
+        assert "radius" not in record
+        assert ring_radius(record) == ring_radius(data)
+
+def test_colours_are_parsed_once(catalog):
+    name = next(name for name, data in GU_DATA.items() if data.get("color"))
+    digits = GU_DATA[name]["color"].lstrip('#')
+    assert catalog.rgb(name) == tuple(int(digits[i:i+2], 16) for i in (0, 2, 4))
+
+def test_upsert_keeps_id(catalog):
+    name = next(iter(GU_DATA))
+    gu_id = catalog.id_of(name)
+    assert catalog.upsert(name, {"name": name, "level": 3, "recipe": ["???"], "fusions": []}) == gu_id
+    assert catalog[name]["level"] == 3
+    assert catalog[name]["recipe"] == ["???"]
+    assert "color" not in catalog[name]
+    assert catalog.rgb(name) == NO_COLOR
+
+def test_remove_clears_columns(catalog):
+    name = next(name for name, data in GU_DATA.items() if data.get("color") and data.get("effect"))
+    gu_id = catalog.id_of(name)
+    catalog.remove(name)
+    assert name not in catalog
+    assert catalog.get(name) is None
+    assert catalog.names[gu_id] is None
+    assert catalog.levels[gu_id] == 0
+    assert catalog.rgb_of(gu_id) == NO_COLOR
+    for column in (catalog.hex_colors, catalog.display_names, catalog.effects,
+                   catalog.affinities, catalog.families):
+        assert column[gu_id] is None
+    assert catalog.recipes[gu_id] == () and catalog.fusions[gu_id] == ()
+    assert catalog.upsert(name, GU_DATA[name]) != gu_id
@@ -0,0 +1,88 @@
+import math
+import random
+
+import pytest
+
+import gu_edges
+from gu_edges import ARROW_SIZE, ArrowBatch, EdgeBundles, calculate_arrow_points
+
+CLIP = (0, 0, 1280, 720)
+
+@pytest.fixture
+def edges():
+    rng = random.Random(9)
+    starts = [(rng.uniform(-500, 1800), rng.uniform(-400, 1100)) for _ in range(400)]
+    ends = [(rng.uniform(-500, 1800), rng.uniform(-400, 1100)) for _ in range(400)]
+    # Straight horizontal and vertical edges take the special cases in calculate_arrow_points().
+    starts += [(100.0, 100.0), (300.0, 50.0), (640.0, 600.0)]
+    ends += [(400.0, 100.0), (300.0, 250.0), (640.0, 200.0)]
+    box_sizes = [(rng.uniform(40, 160), rng.uniform(20, 60)) for _ in starts]
+    return starts, ends, box_sizes
+
+@pytest.fixture(params=["numpy", "fallback"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(gu_edges, "np", None)
+    return request.param
+
+def flatten(arrows):
+    return [c for arrow in arrows for point in arrow for c in point]
+
+def test_arrow_tip_touches_the_target_box():
+    start, tip, point1, point2 = calculate_arrow_points(0, 0, 200, 0, 100, 40)
+    assert start == (0, 0) and tip == pytest.approx((150, 0))
+    assert calculate_arrow_points(300, 50, 300, 250, 100, 40)[1] == pytest.approx((300, 230))
+    for point in (point1, point2):
+        assert math.hypot(point[0] - tip[0], point[1] - tip[1]) == pytest.approx(ARROW_SIZE)
+        assert point[0] < 150
+
+def test_arrow_batch_matches_calculate_arrow_points(backend, edges):
+    starts, ends, box_sizes = edges
+    batch = ArrowBatch(starts, ends, box_sizes)
+    assert len(batch) == len(starts)
+    expected = [calculate_arrow_points(sx, sy, ex, ey, w, h)
+                for (sx, sy), (ex, ey), (w, h) in zip(starts, ends, box_sizes)]
+    assert flatten(batch.translated(0, 0)) == pytest.approx(flatten(expected))
+
+@pytest.mark.parametrize("anchored", [False, True])
+def test_arrow_batch_clip_matches_a_plain_filter(backend, edges, anchored):
+    batch = ArrowBatch(*edges)
+    left, top, right, bottom = CLIP
+    moved = batch.translated(35, -20)
+    if anchored:
+        expected = [arrow for arrow in moved
+                    if any(left <= x <= right and top <= y <= bottom for x, y in arrow[:2])]
+    else:
+        expected = [arrow for arrow in moved
+                    if min(arrow[0][0], arrow[1][0]) <= right and max(arrow[0][0], arrow[1][0]) >= left
+                    and min(arrow[0][1], arrow[1][1]) <= bottom and max(arrow[0][1], arrow[1][1]) >= top]
+    assert 0 < len(expected) < len(moved)
+    assert flatten(batch.translated(35, -20, CLIP, anchored)) == pytest.approx(flatten(expected))
+
+def test_edge_bundles_merge_both_directions(backend):
+    bundles = EdgeBundles([(10, 10), (130, 30), (20, 20), (50, 50)],
+                          [(110, 20), (30, 10), (240, 10), (60, 60)], cell_size=100)
+    # The last edge stays inside one cell and is dropped.
+    assert len(bundles) == 2
+    (start, end, count), (other_start, other_end, other_count) = bundles.translated(0, 0)
+    assert count == 2 and start == pytest.approx((20, 10)) and end == pytest.approx((120, 25))
+    assert other_count == 1 and other_start == pytest.approx((20, 20)) and other_end == pytest.approx((240, 10))
+
+def test_empty_batches(backend):
+    assert len(ArrowBatch([], [], [])) == 0 and ArrowBatch([], [], []).translated(5, 5, CLIP) == []
+    assert len(EdgeBundles([], [], 100)) == 0
+    assert EdgeBundles([(10, 10)], [(20, 20)], 100).translated(0, 0) == []
+
+def test_numpy_and_fallback_agree(edges, monkeypatch):
+    pytest.importorskip("numpy")
+    starts, ends, box_sizes = edges
+    arrows = ArrowBatch(starts, ends, box_sizes).translated(-60, 45, CLIP)
+    bundles = EdgeBundles(starts, ends, 150).translated(-60, 45, CLIP, anchored=True)
+    monkeypatch.setattr(gu_edges, "np", None)
+    assert flatten(ArrowBatch(starts, ends, box_sizes).translated(-60, 45, CLIP)) == pytest.approx(flatten(arrows))
+    plain = EdgeBundles(starts, ends, 150).translated(-60, 45, CLIP, anchored=True)
+    assert [count for _, _, count in plain] == [count for _, _, count in bundles]
+    assert flatten((start, end) for start, end, _ in plain) == \
+        pytest.approx(flatten((start, end) for start, end, _ in bundles))
@@ -0,0 +1,68 @@
+import copy
+
+import pytest
+
+from gu_data import objects as GU_DATA
+from gu_filters import FacetFilter, FacetIndex, affinity_tokens
+from gu_graph import GuGraph
+
+FILTERS = [
+    FacetFilter(levels={1}),
+    FacetFilter(levels={2, 3}),
+    FacetFilter(affinities={"Moon"}),
+    FacetFilter(levels={1}, affinities={"Light"}),
+    FacetFilter(families={"Moon Gu"}),
+]
+
+@pytest.fixture
+def facets():
+    return FacetIndex(GuGraph(copy.deepcopy(GU_DATA)))
+
+def expected(objects, facet_filter):
+    return [name for name, data in objects.items()
+            if (not facet_filter.levels or data.get("level", 1) in facet_filter.levels)
+            and (not facet_filter.affinities
+                 or facet_filter.affinities & set(affinity_tokens(data.get("affinity"))))
+            and (not facet_filter.families or data.get("family") in facet_filter.families)]
+
+def test_affinity_tokens_split_combined_affinities():
+    assert affinity_tokens("Water, Light & Earth") == ["Water", "Light", "Earth"]
+    assert affinity_tokens(None) == []
+
+def test_empty_filter_shows_everything(facets):
+    assert not FacetFilter()
+    assert facets.view(FacetFilter()) is None
+
+@pytest.mark.parametrize("facet_filter", FILTERS)
+def test_view_matches_a_plain_scan(facets, facet_filter):
+    view = facets.view(facet_filter)
+    assert list(view) == expected(facets.graph.objects, facet_filter)
+    assert facets.view(facet_filter) is view
+    for ingredient, product in view.edges:
+        assert ingredient in view and product in view
+
+def test_update_matches_rebuild(facets):
+    graph = facets.graph
+    objects = graph.objects
+    moved = next(name for name, data in objects.items() if data.get("level") == 1)
+    removed = next(name for name, data in objects.items() if "Moon" in affinity_tokens(data.get("affinity")))
+    objects[moved] = dict(objects[moved], level=2, affinity="Wind & Moon")
+    objects["Starlight Gu"] = {"name": "Starlight Gu", "level": 1, "affinity": "Light", "family": "Moon Gu",
+                               "recipe": [], "fusions": []}
+    del objects[removed]
+    names = [moved, "Starlight Gu", removed]
+    graph.update(names)
+    facets.update(names)
+    assert facets.version == graph.version
+    rebuilt = FacetIndex(graph)
+    for facet_filter in FILTERS:
+        assert sorted(facets.view(facet_filter)) == sorted(rebuilt.view(facet_filter))
+        assert sorted(facets.view(facet_filter)) == sorted(expected(objects, facet_filter))
+    assert set(facets.affinities) == set(rebuilt.affinities)
+    assert set(facets.levels) == set(rebuilt.levels)
+
+def test_missed_graph_change_rebuilds(facets):
+    graph = facets.graph
+    graph.objects["Starlight Gu"] = {"name": "Starlight Gu", "level": 1, "recipe": [], "fusions": []}
+    graph.rebuild()
+    assert "Starlight Gu" in facets.view(FacetFilter(levels={1}))
@@ -0,0 +1,89 @@
+import copy
+
+import pytest
+
+from gu_data import objects as GU_DATA
+from gu_graph import GuGraph
+
+def gu(name, recipe=(), fusions=(), level=1):
+    return {"name": name, "level": level, "recipe": list(recipe), "fusions": list(fusions)}
+
+def index(graph):
+    """
+    The graph's indexes in a form that does not depend on insertion order.
+    """
+    return {
+        "recipe": graph.recipe,
+        "used_in": {name: sorted(products) for name, products in graph.used_in.items()},
+        "fusions": graph.fusions,
+        "fused_from": graph.fused_from,
+        "related": graph.related,
+        "missing": graph.missing,
+        "missing_of": graph.missing_of,
+    }
+
+def assert_matches_rebuild(graph):
+    assert index(graph) == index(GuGraph(graph.objects))
+
+@pytest.fixture
+def cyclic():
+    return GuGraph({
+        "A": gu("A", recipe=["B", "???", "Spicy Wine"]),
+        "B": gu("B", recipe=["C", "C"]),
+        "C": gu("C", recipe=["A"], fusions=["D"]),
+        "D": gu("D", recipe=["D"]),
+    })
+
+def test_edges_skip_unknown_and_raw_ingredients(cyclic):
+    assert cyclic.recipe["A"] == ["B"]
+    assert cyclic.recipe["B"] == ["C"]
+    assert cyclic.missing == {"Spicy Wine": {"A"}}
+    assert cyclic.fused_from["D"] == {"C"}
+    assert cyclic.related["C"] == {"A", "B", "D"}
+    assert sorted(cyclic.edges()) == [("A", "C"), ("B", "A"), ("C", "B"), ("D", "D")]
+
+def test_walk_levels_terminates_on_cycles(cyclic):
+    assert cyclic.ingredient_levels("A") == [["B"], ["C"]]
+    assert cyclic.product_levels("A") == [["C"], ["B"]]
+    assert cyclic.ingredient_levels("D") == []
+    assert cyclic.product_levels("Spicy Wine") == []
+
+def test_missing_reference_becomes_an_edge_once_added(cyclic):
+    version = cyclic.version
+    cyclic.objects["Spicy Wine"] = gu("Spicy Wine")
+    cyclic.update(["Spicy Wine"])
+    assert cyclic.version == version + 1
+    assert cyclic.recipe["A"] == ["B", "Spicy Wine"]
+    assert cyclic.used_in["Spicy Wine"] == ["A"]
+    assert "Spicy Wine" not in cyclic.missing
+    assert_matches_rebuild(cyclic)
+
+def test_removed_gu_is_remembered_as_missing(cyclic):
+    del cyclic.objects["B"]
+    cyclic.update(["B"])
+    assert "B" not in cyclic.recipe
+    assert cyclic.recipe["A"] == []
+    assert cyclic.missing["B"] == {"A"}
+    assert cyclic.related["C"] == {"A", "D"}
+    assert_matches_rebuild(cyclic)
+
+@pytest.mark.parametrize("edit", ["add", "change", "remove", "rename"])
+def test_update_matches_rebuild_on_gu_data(edit):
+    objects = copy.deepcopy(GU_DATA)
+    graph = GuGraph(objects)
+    used = next(name for name in objects if graph.used_in[name] and graph.fused_from[name])
+    if edit == "add":
+        objects["New Gu"] = gu("New Gu", recipe=[used, "Unknown Gu"], fusions=[used])
+        names = ["New Gu"]
+    elif edit == "change":
+        product = graph.used_in[used][0]
+        objects[product] = dict(objects[product], recipe=[], fusions=[used])
+        names = [product]
+    elif edit == "remove":
+        del objects[used]
+        names = [used]
+    else:
+        objects["Renamed Gu"] = objects.pop(used)
+        names = [used, "Renamed Gu"]
+    graph.update(names)
+    assert_matches_rebuild(graph)
@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from gu_catalog import GuCatalog
+from gu_filters import FacetFilter, FacetIndex
+from gu_graph import GuGraph
+from gu_ingest import CatalogError, CatalogLoader, iter_records, validate_record
+from gu_search import SearchIndex
+
+def write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+def test_validate_record_normalizes_csv_values():
+    key, data = validate_record({"name": " Moonlight Gu ", "level": "2", "recipe": "A; B", "fusions": ""})
+    assert key == "Moonlight Gu"
+    assert data == {"name": "Moonlight Gu", "level": 2, "recipe": ["A", "B"], "fusions": []}
+
+@pytest.mark.parametrize("record", [
+    {"level": 1},
+    {"name": "X", "color": "red"},
+    {"name": "X", "level": "high"},
+    {"name": "X", "level": 0},
+    {"name": "X", "recipe": [1, 2]},
+    ["not", "an", "object"],
+])
+def test_validate_record_rejects_malformed_fields(record):
+    with pytest.raises(CatalogError):
+        validate_record(record)
+
+def test_jsonl_malformed_line_is_collected_and_skipped(tmp_path):
+    path = write(tmp_path / "catalog.jsonl", "\n".join([
+        json.dumps({"name": "A Gu"}),
+        '{"name": "Broken Gu",',
+        json.dumps({"name": "B Gu", "level": "x"}),
+        json.dumps({"name": "C Gu"}),
+    ]))
+    errors = []
+    assert [key for key, _ in iter_records(path, errors)] == ["A Gu", "C Gu"]
+    assert [(error.source, error.line) for error in errors] == [(path, 2), (path, 3)]
+    assert "invalid JSON" in str(errors[0])
+
+def test_jsonl_malformed_line_raises_catalog_error_without_errors_list(tmp_path):
+    path = write(tmp_path / "catalog.jsonl", '{"name": "A Gu"}\nnot json\n')
+    with pytest.raises(CatalogError) as excinfo:
+        list(iter_records(path))
+    assert excinfo.value.line == 2
+
+def test_json_array_streams_until_malformed_record(tmp_path):
+    path = write(tmp_path / "catalog.json", '[{"name": "A Gu"}, {"name": "B Gu"}, {"name": ')
+    errors = []
+    assert [key for key, _ in iter_records(path, errors)] == ["A Gu", "B Gu"]
+    assert len(errors) == 1 and errors[0].line == 3
+
+def test_json_object_uses_keys(tmp_path):
+    path = write(tmp_path / "catalog.json", json.dumps({"moon": {"name": "Moonlight Gu", "level": 1}}))
+    assert list(iter_records(path)) == [("moon", {"name": "Moonlight Gu", "level": 1, "recipe": [], "fusions": []})]
+
+def test_malformed_json_document_is_collected(tmp_path):
+    errors = []
+    assert list(iter_records(write(tmp_path / "catalog.json", '{"moon": '), errors)) == []
+    assert list(iter_records(write(tmp_path / "other.json", 'nonsense'), errors)) == []
+    assert len(errors) == 2
+
+def test_csv_rows_report_their_line(tmp_path):
+    path = write(tmp_path / "catalog.csv", "name,level,recipe\nA Gu,1,\nB Gu,bad,\nC Gu,2,A Gu;B Gu\n")
+    errors = []
+    records = list(iter_records(path, errors))
+    assert [key for key, _ in records] == ["A Gu", "C Gu"]
+    assert records[1][1]["recipe"] == ["A Gu", "B Gu"]
+    assert [error.line for error in errors] == [3]
+
+def test_loader_reports_each_batch_so_indexes_update_in_step(tmp_path, monkeypatch):
+    records = [{"name": "Gu %d" % i, "level": i % 3 + 1, "affinity": "Moon" if i % 2 else "Sun",
+                "recipe": ["Gu %d" % (i - 1)] if i else []} for i in range(25)]
+    path = write(tmp_path / "catalog.jsonl", "\n".join(json.dumps(record) for record in records))
+    catalog = GuCatalog()
+    graph = GuGraph(catalog)
+    facets = FacetIndex(graph)
+    search_index = SearchIndex(graph)
+    rebuilds = []
+    for index in (facets, search_index):
+        monkeypatch.setattr(index, "rebuild", lambda: rebuilds.append(index))
+
+    batches = []
+    def index_batch(names):
+        facets.update(names)
+        search_index.update(names)
+        batches.append(names)
+
+    loader = CatalogLoader(path, catalog, graph, batch_size=10)
+    while loader.step(time_budget=0, on_batch=index_batch):
+        pass
+    assert batches == [["Gu %d" % i for i in range(start, min(start + 10, 25))] for start in (0, 10, 20)]
+    assert rebuilds == []
+    assert facets.version == search_index.version == graph.version
+
+    moon = FacetFilter(affinities={"Moon"})
+    assert list(facets.view(moon)) == list(FacetIndex(graph).view(moon))
+    assert search_index.search("gu 2") == SearchIndex(graph).search("gu 2")
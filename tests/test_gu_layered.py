@@ -0,0 +1,48 @@
+import pytest
+
+from gu_layered import (LayoutCancelled, count_crossings, dfs_postorder, layered_positions, order_layers,
+                        pack_row)
+
+def test_dfs_postorder_reports_back_edges():
+    successors = {"a": ["b"], "b": ["c"], "c": ["a", "d"], "d": []}
+    postorder, back_edges = dfs_postorder(["a"], successors.__getitem__)
+    assert postorder == ["d", "c", "b", "a"]
+    assert back_edges == {("c", "a")}
+
+def test_dfs_postorder_handles_long_chains():
+    count = 10000
+    postorder, back_edges = dfs_postorder([0], lambda i: [i + 1] if i + 1 < count else [])
+    assert postorder == list(range(count - 1, -1, -1))
+    assert not back_edges
+
+def test_count_crossings():
+    upper = {"a": 0, "b": 1}
+    lower = {"x": 0, "y": 1}
+    assert count_crossings(upper, lower, [("a", "x"), ("b", "y")]) == 0
+    assert count_crossings(upper, lower, [("a", "y"), ("b", "x")]) == 1
+
+def test_order_layers_removes_avoidable_crossing():
+    rows = [[0, 1], [2, 3]]
+    down = [[3], [2], [], []]
+    up = [[], [], [1], [0]]
+    assert order_layers(rows, up, down) in ([[0, 1], [3, 2]], [[1, 0], [2, 3]])
+
+def test_pack_row_keeps_order_and_spacing():
+    xs = pack_row([0.0, 0.0, 0.0], [100, 100, 100], [1, 1, 1])
+    assert xs == pytest.approx([-100.0, 0.0, 100.0])
+    assert pack_row([-500.0, 500.0], [100, 100], [1, 1]) == [-500.0, 500.0]
+
+def test_layered_positions_places_layers_and_anchor():
+    layers = {-1: ["ingredient"], 0: ["selected"], 1: ["product", "other"]}
+    edges = [("ingredient", "selected"), ("selected", "product"), ("ingredient", "other")]
+    positions = layered_positions(layers, edges, "selected", 640, 360, 160, 150)
+    assert set(positions) == {"ingredient", "selected", "product", "other"}
+    assert positions["selected"] == (640, 360)
+    assert positions["ingredient"][1] == 210
+    assert positions["product"][1] == positions["other"][1] == 510
+    assert abs(positions["product"][0] - positions["other"][0]) >= 160
+
+def test_layered_positions_can_be_cancelled():
+    layers = {0: ["a", "b"], 1: ["c", "d"]}
+    with pytest.raises(LayoutCancelled):
+        layered_positions(layers, [("a", "d"), ("b", "c")], "a", 0, 0, 100, 100, cancelled=lambda: True)
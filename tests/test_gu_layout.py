@@ -0,0 +1,108 @@
+import copy
+import math
+
+import pytest
+
+from gu_data import objects as GU_DATA
+from gu_graph import GuGraph
+from gu_layout import (CENTER_X, CENTER_Y, FusionLineCache, GuLayout, calculate_fusion_line_positions,
+                       calculate_positions, fusion_line_layers, get_fusion_line_elements, group_by_level, ring_radii,
+                       ring_radius)
+
+@pytest.fixture
+def graph():
+    return GuGraph(copy.deepcopy(GU_DATA))
+
+def distance(pos):
+    return math.hypot(pos[0] - CENTER_X, pos[1] - CENTER_Y)
+
+def test_ring_radius_comes_from_level():
+    assert ring_radius({"level": 4}) < ring_radius({"level": 1})
+    assert ring_radius({"level": 9, "radius": 600}) == 600
+
+def test_calculate_positions_puts_each_level_on_its_ring(graph):
+    objects = graph.objects
+    positions = calculate_positions(objects, graph)
+    assert set(positions) == set(objects)
+    for level, (radius, tracks) in ring_radii(group_by_level(objects), objects).items():
+        for name in group_by_level(objects)[level]:
+            assert radius - 1e-6 <= distance(positions[name]) <= radius + (tracks - 1) * 70 + 1e-6
+    assert calculate_positions(objects, graph) == positions
+
+def test_layout_update_relays_only_the_touched_ring(graph):
+    layout = GuLayout(graph)
+    before = layout.positions
+    name = next(name for name, data in graph.objects.items() if data["level"] == 1)
+    graph.objects[name] = dict(graph.objects[name], recipe=[], fusions=[])
+    graph.update([name])
+    layout.update([name])
+    assert layout.version == graph.version
+    after = layout.positions
+    assert all(after[other] == before[other] for other in graph.objects
+               if graph.objects[other]["level"] != 1)
+    # The outermost ring is placed last, so relaying it matches a full layout.
+    assert after == calculate_positions(graph.objects, graph)
+
+def test_fusion_line_elements_survive_cycles():
+    objects = {
+        "A": {"name": "A", "level": 1, "recipe": ["C"], "fusions": []},
+        "B": {"name": "B", "level": 2, "recipe": ["A"], "fusions": []},
+        "C": {"name": "C", "level": 3, "recipe": ["B"], "fusions": []},
+    }
+    elements = get_fusion_line_elements(objects, "B")
+    assert elements[0] == ["B"]
+    assert elements[-1] == ["A"] and elements[-2] == ["C"]
+    assert elements[1] == ["C"] and elements[2] == ["A"]
+    positions = calculate_fusion_line_positions(elements, 0, 0, GuGraph(objects))
+    assert set(positions) == {"A", "B", "C"}
+    assert positions["B"] == (0, 0)
+
+@pytest.mark.parametrize("root, recipes", [
+    ("R", {"R": ["A", "C"], "A": ["R"], "C": ["R"]}),
+    ("R", {"R": ["A"], "A": ["B"], "B": ["R", "C"], "C": ["R"], "D": ["R"]}),
+    ("G11", {"G0": ["G11"], "G11": ["G0", "X"], "X": [], "Y": ["G11", "G0"]}),
+])
+def test_fusion_line_cycle_through_selected_gu_keeps_it_centred(root, recipes):
+    objects = {name: {"name": name, "level": 1, "recipe": recipe, "fusions": []} for name, recipe in recipes.items()}
+    graph = GuGraph(objects)
+    elements = get_fusion_line_elements(objects, root, graph)
+    positions = calculate_fusion_line_positions(elements, CENTER_X, CENTER_Y, graph)
+    assert positions[root] == (CENTER_X, CENTER_Y)
+    for ingredient in graph.recipe[root]:
+        assert positions[ingredient][1] < CENTER_Y
+    _, edges = fusion_line_layers(elements, graph)
+    for ingredient, product in edges:
+        assert positions[ingredient][1] < positions[product][1]
+
+def test_fusion_line_positions_put_ingredients_above(graph):
+    selected = next(name for name in graph.objects if graph.recipe[name] and graph.used_in[name])
+    elements = get_fusion_line_elements(graph.objects, selected, graph)
+    positions = calculate_fusion_line_positions(elements, CENTER_X, CENTER_Y, graph)
+    assert positions[selected] == (CENTER_X, CENTER_Y)
+    for ingredient in graph.recipe[selected]:
+        assert positions[ingredient][1] < CENTER_Y
+    for product in graph.used_in[selected]:
+        assert positions[product][1] > CENTER_Y
+
+def test_fusion_line_cache_keeps_untouched_lines():
+    objects = {name: {"name": name, "level": 1, "recipe": list(recipe), "fusions": []}
+               for name, recipe in (("A", ()), ("B", ("A",)), ("C", ()), ("D", ("C",)))}
+    graph = GuGraph(objects)
+    cache = FusionLineCache(graph)
+    cache.get("A")
+    cache.get("C")
+    objects["B"] = dict(objects["B"], recipe=["A", "A"])
+    graph.update(["B"])
+    cache.update(["B"])
+    assert cache.cached("A") is None
+    assert cache.cached("C") is not None
+
+def test_fusion_line_cache_stats_count_each_new_lookup_once(graph):
+    cache = FusionLineCache(graph)
+    first, second = [name for name in graph.objects if graph.related[name]][:2]
+    cache.get(first)
+    for _ in range(10):
+        assert cache.cached(first) is not None   # One lookup per frame while the line is shown.
+    cache.get(second)
+    cache.get(first)
+    assert cache.stats() == {"hits": 1, "misses": 2, "size": 2}
@@ -0,0 +1,52 @@
+import pytest
+
+from gu_graph import GuGraph
+from gu_paths import STEP_COST, UNKNOWN_COST, PathFinder
+
+def gu(name, recipe=(), fusions=()):
+    return {"name": name, "level": 1, "recipe": list(recipe), "fusions": list(fusions)}
+
+@pytest.fixture
+def finder():
+    # Two routes from A to D: a short one through B that needs "???", and a
+    # longer one through C and E that needs only known materials.
+    return PathFinder(GuGraph({
+        "A": gu("A"),
+        "B": gu("B", ["A", "???"]),
+        "C": gu("C", ["A"]),
+        "E": gu("E", ["C"]),
+        "D": gu("D", ["B", "E"], fusions=["A"]),
+        "X": gu("X", ["X"]),
+    }))
+
+def test_shortest_path_has_fewest_steps(finder):
+    path = finder.shortest_path("A", "D")
+    assert path.names == ["A", "B", "D"]
+    assert path.cost == pytest.approx(2 * STEP_COST + UNKNOWN_COST + 1.0)
+
+def test_cheapest_path_avoids_unknown_ingredients(finder):
+    path = finder.cheapest_path("A", "D")
+    assert path.names == ["A", "C", "E", "D"]
+    assert path.cost == pytest.approx(3 * STEP_COST + 1.0)
+    assert path.extras == [[], [], ["B"]]
+    assert path.ingredients() == {"B": 1}
+    assert finder.cheapest_path("A", "B").cost == pytest.approx(STEP_COST + UNKNOWN_COST)
+
+def test_unreachable_and_cyclic_queries(finder):
+    assert finder.cheapest_path("D", "X") is None
+    assert finder.shortest_path("X", "A") is None
+    assert finder.cheapest_path("X", "X").names == ["X"]
+    # D lists A in its "fusions", so the walk may loop back; it must still terminate.
+    assert finder.cheapest_path("D", "B").names == ["D", "A", "B"]
+
+def test_k_cheapest_paths_are_distinct_and_ordered(finder):
+    paths = finder.k_cheapest_paths("A", "D", k=3)
+    assert [path.names for path in paths] == [["A", "C", "E", "D"], ["A", "B", "D"]]
+    assert paths[0].cost <= paths[1].cost
+
+def test_results_follow_graph_updates(finder):
+    graph = finder.graph
+    assert finder.cheapest_path("A", "D").names == ["A", "C", "E", "D"]
+    del graph.objects["E"]
+    graph.update(["E"])
+    assert finder.cheapest_path("A", "D").names == ["A", "B", "D"]
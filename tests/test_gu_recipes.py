@@ -0,0 +1,54 @@
+import copy
+
+import pytest
+
+from gu_data import objects as GU_DATA
+from gu_graph import GuGraph
+from gu_recipes import RecipeResolver
+
+def snapshot(resolver):
+    return {name: (resolution.base, resolution.raw, resolution.unknown, resolution.cycles)
+            for name, resolution in resolver.resolve_all().items()}
+
+@pytest.fixture
+def catalog():
+    objects = copy.deepcopy(GU_DATA)
+    graph = GuGraph(objects)
+    resolver = RecipeResolver(graph)
+    resolver.resolve_all()  # Warm the cache, so update() has entries to drop.
+    return objects, graph, resolver
+
+def update(objects, graph, resolver, names):
+    graph.update(names)
+    resolver.update(names)
+    assert snapshot(resolver) == snapshot(RecipeResolver(GuGraph(objects)))
+
+def test_removed_ingredient_becomes_raw(catalog):
+    objects, graph, resolver = catalog
+    products = [name for name, data in objects.items() if "Moonlight Gu" in data.get("recipe", [])]
+    assert products
+    del objects["Moonlight Gu"]
+    update(objects, graph, resolver, ["Moonlight Gu"])
+    for name in products:
+        assert "Moonlight Gu" in resolver.resolve(name).raw
+        assert "Moonlight Gu" not in resolver.resolve(name).base
+
+def test_added_ingredient_with_recipe_is_expanded(catalog):
+    objects, graph, resolver = catalog
+    product = next(name for name, data in objects.items() if data.get("recipe"))
+    objects["Spicy Wine"] = {"name": "Spicy Wine", "level": 1, "recipe": ["Liquor Worm Gu"], "fusions": []}
+    objects[product] = dict(objects[product], recipe=objects[product]["recipe"] + ["Spicy Wine"])
+    update(objects, graph, resolver, ["Spicy Wine", product])
+
+def test_changed_recipe_updates_every_product_above_it(catalog):
+    objects, graph, resolver = catalog
+    name = next(name for name in objects if graph.used_in[name] and graph.recipe[name])
+    objects[name] = dict(objects[name], recipe=["???", "Spicy Wine"])
+    update(objects, graph, resolver, [name])
+
+def test_cycle_is_cut_and_counted(catalog):
+    objects, graph, resolver = catalog
+    objects["Loop A Gu"] = {"name": "Loop A Gu", "level": 2, "recipe": ["Loop B Gu"], "fusions": []}
+    objects["Loop B Gu"] = {"name": "Loop B Gu", "level": 2, "recipe": ["Loop A Gu"], "fusions": []}
+    update(objects, graph, resolver, ["Loop A Gu", "Loop B Gu"])
+    assert not resolver.resolve("Loop A Gu").complete
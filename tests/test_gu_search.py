@@ -0,0 +1,60 @@
+import copy
+
+import pytest
+
+from gu_data import objects as GU_DATA
+from gu_graph import GuGraph
+from gu_search import PrefixTrie, SearchIndex, trigrams
+
+@pytest.fixture
+def index():
+    return SearchIndex(GuGraph(copy.deepcopy(GU_DATA)))
+
+def state(index):
+    return (index.name_trie.nodes, index.field_trie.nodes, index.trigram_index, index.entries)
+
+def test_trigrams_pad_word_edges():
+    assert trigrams("Moon") == {" mo", "moo", "oon", "on "}
+
+def test_prefix_trie_counts_repeated_tokens():
+    trie = PrefixTrie()
+    trie.add("moon", "A")
+    trie.add("moonlight", "A")
+    trie.remove("moon", "A")
+    assert trie.names_with_prefix("moo") == {"A": 1}
+    trie.remove("moonlight", "A")
+    assert trie.nodes == {}
+
+def test_name_matches_rank_first(index):
+    results = index.search("moonlight")
+    assert results[0] == ("Moonlight Gu", "name")
+    assert all(field == "name" for _, field in results[:2])
+    assert index.search("moonlight gu")[0][0] == "Moonlight Gu"
+
+def test_every_word_must_match(index):
+    for name, field in index.search("moon gu"):
+        assert "moon" in name.lower() or field == "details"
+
+def test_typos_fall_back_to_fuzzy_matches(index):
+    results = index.search("moonlihgt")
+    assert results and all(field == "fuzzy" for _, field in results)
+    assert "Moonlight Gu" in [name for name, _ in results]
+    assert index.search("   ") == []
+
+def test_update_matches_rebuild(index):
+    objects = index.graph.objects
+    objects["Starlight Gu"] = {"name": "Starlight Gu", "level": 2, "effect": "Shines in the dark.",
+                               "recipe": [], "fusions": []}
+    del objects["Moonlight Gu"]
+    names = ["Starlight Gu", "Moonlight Gu"]
+    index.graph.update(names)
+    index.update(names)
+    assert state(index) == state(SearchIndex(index.graph))
+    assert index.search("starl") == [("Starlight Gu", "name")]
+    assert "Moonlight Gu" not in [name for name, _ in index.search("moonlight")]
+
+def test_missed_graph_change_rebuilds_on_search(index):
+    objects = index.graph.objects
+    objects["Starlight Gu"] = {"name": "Starlight Gu", "level": 2, "recipe": [], "fusions": []}
+    index.graph.rebuild()
+    assert index.search("starlight") == [("Starlight Gu", "name")]
@@ -0,0 +1,92 @@
+import os
+
+import pytest
+
+from gu_catalog import GuCatalog
+from gu_data import objects as GU_DATA
+from gu_snapshot import Snapshot, compile_snapshot, load_snapshot
+
+OBJECTS = {
+    "Moonlight Gu": {"name": "Moonlight Gu", "color": "#c0d0ff", "level": 1, "effect": "A blade of moonlight.",
+                     "recipe": [], "fusions": ["Moonshadow Gu"], "affinity": "Moon"},
+    "Moonshadow Gu": {"name": "Moonshadow Gu", "level": 2,
+                      "recipe": ["Moonlight Gu", "Moonlight Gu", "Spicy Wine", "???"], "fusions": []},
+    "Key Gu": {"name": "Display Name Gu", "color": "#000000", "level": 3, "recipe": ["Moonshadow Gu"],
+               "fusions": ["Unknown Gu"], "family": "Spring"},
+}
+
+@pytest.fixture
+def snapshot(tmp_path):
+    path = str(tmp_path / "objects.gusnap")
+    compile_snapshot(OBJECTS, path)
+    snapshot = Snapshot(path)
+    yield snapshot
+    snapshot.close()
+
+def test_round_trip(snapshot):
+    assert snapshot.to_objects() == OBJECTS
+    assert snapshot.id_of("Key Gu") == 2
+    assert snapshot.id_of("Spicy Wine") is None
+
+def test_recipes_keep_duplicates(snapshot):
+    gu_id = snapshot.id_of("Moonshadow Gu")
+    assert [snapshot.string(i) for i in snapshot.recipe_ids(gu_id)] == OBJECTS["Moonshadow Gu"]["recipe"]
+
+def test_catalog_from_snapshot_matches_from_objects(snapshot):
+    expected = GuCatalog.from_objects(OBJECTS)
+    catalog = GuCatalog.from_snapshot(snapshot)
+    assert list(catalog) == list(expected)
+    assert {name: dict(record) for name, record in catalog.items()} == OBJECTS
+    assert catalog.levels == expected.levels
+    assert catalog.colors == expected.colors
+    assert list(catalog.recipes) == expected.recipes and list(catalog.fusions) == expected.fusions
+    assert catalog.snapshot is snapshot
+
+def test_catalog_from_snapshot_of_gu_data(tmp_path):
+    path = str(tmp_path / "gu_data.gusnap")
+    compile_snapshot(GU_DATA, path)
+    snapshot = Snapshot(path)
+    try:
+        catalog = GuCatalog.from_snapshot(snapshot)
+        expected = GuCatalog.from_objects(GU_DATA)
+        assert catalog.colors == expected.colors
+        assert {name: dict(record) for name, record in catalog.items()} == \
+            {name: dict(record) for name, record in expected.items()}
+    finally:
+        snapshot.close()
+
+def test_catalog_from_snapshot_supports_mutation(snapshot):
+    catalog = GuCatalog.from_snapshot(snapshot)
+    catalog.remove("Moonlight Gu")
+    gu_id = catalog.upsert("New Gu", {"name": "New Gu", "level": 4, "recipe": ["Key Gu"], "fusions": []})
+    assert gu_id == len(OBJECTS)
+    assert catalog["New Gu"]["recipe"] == ["Key Gu"]
+    assert "Moonlight Gu" not in catalog
+    catalog.upsert("Moonlight Gu", {"name": "Moonlight Gu", "level": 2, "color": "#102030", "fusions": []})
+    assert dict(catalog["Moonlight Gu"]) == {"name": "Moonlight Gu", "level": 2, "color": "#102030",
+                                             "recipe": [], "fusions": []}
+    assert catalog.rgb("Moonlight Gu") == (0x10, 0x20, 0x30)
+    untouched = {name: dict(record) for name, record in catalog.items() if name in OBJECTS and name != "Moonlight Gu"}
+    assert untouched == {name: data for name, data in OBJECTS.items() if name != "Moonlight Gu"}
+
+def test_load_snapshot_recompiles_when_source_changes(tmp_path):
+    source = tmp_path / "objects.py"
+    source.write_text("objects = %r\n" % OBJECTS)
+    snapshot = load_snapshot(str(source))
+    assert snapshot.to_objects() == OBJECTS
+    snapshot.close()
+    assert os.path.exists(str(tmp_path / "objects.gusnap"))
+
+    changed = dict(OBJECTS, **{"Extra Gu": {"name": "Extra Gu", "level": 1, "recipe": [], "fusions": []}})
+    source.write_text("objects = %r\n" % changed)
+    snapshot = load_snapshot(str(source))
+    assert snapshot.to_objects() == changed
+    snapshot.close()
+
+def test_load_snapshot_replaces_corrupt_file(tmp_path):
+    source = tmp_path / "objects.py"
+    source.write_text("objects = %r\n" % OBJECTS)
+    (tmp_path / "objects.gusnap").write_bytes(b"not a snapshot")
+    snapshot = load_snapshot(str(source))
+    assert snapshot.to_objects() == OBJECTS
+    snapshot.close()
@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+import gu_transform
+from gu_transform import CameraTransform, NodeArray
+
+CENTER = (640, 360)
+CAMERAS = [(1.0, 0, 0), (0.25, -120.5, 40), (3.5, 700, -260.25)]
+
+@pytest.fixture
+def positions():
+    rng = random.Random(8)
+    return {"Gu %d" % i: (rng.uniform(-2000, 3000), rng.uniform(-1500, 2500)) for i in range(300)}
+
+@pytest.fixture(params=["numpy", "fallback"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(gu_transform, "np", None)
+    return request.param
+
+def expected(positions, scale, offset_x, offset_y):
+    center_x, center_y = CENTER
+    return {name: (center_x + (x - center_x) * scale + offset_x, center_y + (y - center_y) * scale + offset_y)
+            for name, (x, y) in positions.items()}
+
+@pytest.mark.parametrize("camera", CAMERAS)
+def test_to_screen_matches_the_camera_formula(backend, positions, camera):
+    screen = NodeArray(positions).to_screen(*CENTER, *camera)
+    assert (screen.array is None) == (backend == "fallback")
+    assert len(screen) == len(positions)
+    for name, (x, y) in expected(positions, *camera).items():
+        assert screen[name] == pytest.approx((x, y))
+    assert [name for name, _ in screen.items()] == list(positions)
+    assert screen.get("Unknown Gu") is None and "Unknown Gu" not in screen
+
+@pytest.mark.parametrize("camera", CAMERAS)
+def test_inside_matches_a_plain_scan(backend, positions, camera):
+    screen = NodeArray(positions).to_screen(*CENTER, *camera)
+    rect = (0, 0, 1280, 720)
+    assert screen.inside(*rect) == [name for name, (x, y) in screen.items()
+                                   if rect[0] <= x < rect[2] and rect[1] <= y < rect[3]]
+
+def test_numpy_and_fallback_agree(positions, monkeypatch):
+    pytest.importorskip("numpy")
+    batched = [NodeArray(positions).to_screen(*CENTER, *camera) for camera in CAMERAS]
+    visible = [screen.inside(0, 0, 1280, 720) for screen in batched]
+    monkeypatch.setattr(gu_transform, "np", None)
+    for camera, screen, names in zip(CAMERAS, batched, visible):
+        plain = NodeArray(positions).to_screen(*CENTER, *camera)
+        assert plain.names == screen.names
+        assert plain.xs == pytest.approx(screen.xs) and plain.ys == pytest.approx(screen.ys)
+        assert plain.inside(0, 0, 1280, 720) == names
+
+def test_empty_layout(backend):
+    screen = NodeArray({}).to_screen(*CENTER, 2.0, 5, 5)
+    assert len(screen) == 0 and screen.inside(0, 0, 1280, 720) == []
+
+def test_camera_transform_reuses_results(backend, positions):
+    camera = CameraTransform(*CENTER, max_results=2)
+    first = camera.screen_positions(positions, 0.5, 10, 20)
+    assert camera.screen_positions(positions, 0.5, 10, 20) is first
+    nodes = camera.nodes
+    camera.screen_positions(positions, 1.0, 0, 0)
+    camera.screen_positions(positions, 2.0, 0, 0)
+    assert camera.nodes is nodes and len(camera.results) == 2
+    assert camera.screen_positions(positions, 0.5, 10, 20) is not first
+    moved = dict(positions, **{"Gu 0": (0.0, 0.0)})
+    assert camera.screen_positions(moved, 1.0, 0, 0)["Gu 0"] == pytest.approx(expected(moved, 1.0, 0, 0)["Gu 0"])
+    assert camera.nodes is not nodes
@@ -0,0 +1,102 @@
+import threading
+import time
+
+import pytest
+
+from gu_layered import LayoutCancelled, check_cancelled
+from gu_worker import LayoutWorker
+
+TIMEOUT = 5.0
+
+@pytest.fixture
+def worker():
+    worker = LayoutWorker()
+    yield worker
+    worker.shutdown()
+
+def wait_for_results(worker):
+    deadline = time.monotonic() + TIMEOUT
+    while time.monotonic() < deadline:
+        finished = worker.poll()
+        if finished:
+            return finished
+        time.sleep(0.005)
+    raise AssertionError("no layout finished in time")
+
+def layout_until_cancelled(started, result="stale", cancelled=None):
+    """
+    Stand-in for a long layout: spins until the worker cancels it.
+    """
+    started.set()
+    deadline = time.monotonic() + TIMEOUT
+    while time.monotonic() < deadline:
+        check_cancelled(cancelled)
+        time.sleep(0.001)
+    return result
+
+def layout_after(release, result, cancelled=None):
+    """
+    Stand-in for a layout that never checks for cancellation.
+    """
+    release.wait(TIMEOUT)
+    return result
+
+def layout(result, cancelled=None):
+    return result
+
+def test_poll_returns_finished_jobs_once(worker):
+    job = worker.submit(("fusion", "A"), "A", 3, layout, {"A": (0, 0)})
+    assert worker.busy(("fusion", "A"))
+    assert wait_for_results(worker) == [(job, {"A": (0, 0)}, None)]
+    assert (job.key, job.version) == ("A", 3)
+    assert worker.poll() == [] and not worker.busy()
+
+def test_resubmitting_a_pending_target_keeps_its_job(worker):
+    release = threading.Event()
+    job = worker.submit(("ring", 1), 1, 1, layout_after, release, "first")
+    assert worker.submit(("ring", 1), 1, 2, layout_after, release, "second") is job
+    release.set()
+    assert wait_for_results(worker) == [(job, "first", None)]
+
+def test_new_target_stops_a_running_job(worker):
+    started = threading.Event()
+    stale = worker.submit(("fusion", "A"), "A", 1, layout_until_cancelled, started)
+    assert started.wait(TIMEOUT)
+    current = worker.submit(("fusion", "B"), "B", 1, layout, "current")
+    assert stale.cancelled()
+    assert wait_for_results(worker) == [(current, "current", None)]
+    # The stale layout stopped at its next check.
+    assert isinstance(stale.future.exception(TIMEOUT), LayoutCancelled)
+    assert worker.poll() == [] and not worker.busy()
+
+def test_superseded_jobs_are_never_polled():
+    worker = LayoutWorker(max_workers=1)
+    try:
+        release = threading.Event()
+        running = worker.submit(("fusion", "A"), "A", 1, layout_after, release, "stale")
+        queued = worker.submit(("fusion", "B"), "B", 1, layout, "stale")
+        current = worker.submit(("fusion", "C"), "C", 1, layout, "current")
+        assert running.cancelled() and queued.cancelled()
+        assert queued.future.cancelled()  # Dropped before it started.
+        release.set()
+        assert running.future.result(TIMEOUT) == "stale"  # Finished, but no longer wanted.
+        assert wait_for_results(worker) == [(current, "current", None)]
+        assert worker.poll() == []
+    finally:
+        worker.shutdown()
+
+def test_errors_are_handed_back(worker):
+    def failing_layout(cancelled=None):
+        raise ValueError("bad layout")
+    job = worker.submit(("ring", 1), 1, 1, failing_layout)
+    [(finished, result, error)] = wait_for_results(worker)
+    assert finished is job and result is None and isinstance(error, ValueError)
+
+def test_cancel_drops_every_job(worker):
+    started = threading.Event()
+    job = worker.submit(("ring", 1), 1, 1, layout_until_cancelled, started)
+    assert started.wait(TIMEOUT)
+    worker.cancel()
+    assert job.cancelled() and not worker.busy()
+    assert isinstance(job.future.exception(TIMEOUT), LayoutCancelled)
+    assert worker.poll() == []